@@ -2,12 +2,16 @@ import sys
 import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+import time
 from flask import Flask
 from flask_cors import CORS
-from backend.models import db
+from backend.models import db, ensure_schema
 from backend.config import Config
+from backend.utils.rate_limit import limiter
 
 def create_app(config_name='default'):
+    phases = {}
+    started = time.perf_counter()
     app = Flask(__name__)
     
     if config_name == 'testing':
@@ -16,7 +20,12 @@ def create_app(config_name='default'):
     else:
         app.config.from_object(Config)
     
+    if Config.SESSION_TOKEN_MODE == 'signed' and Config.SECRET_KEY == Config.DEV_SECRET_KEY:
+        raise RuntimeError('SESSION_TOKEN_MODE=signed needs SECRET_KEY set; the development default lets anyone forge sessions')
+    
     db.init_app(app)
+    limiter.init_app(app)
+    phases['flask_and_db'] = time.perf_counter() - started
     
     CORS(app, resources={
         r"/api/*": {
@@ -26,11 +35,13 @@ def create_app(config_name='default'):
         }
     })
     
+    mark = time.perf_counter()
     from backend.blueprints.api import api_bp
     from backend.blueprints.frontend import frontend_bp
     
     app.register_blueprint(api_bp)
     app.register_blueprint(frontend_bp)
+    phases['blueprints'] = time.perf_counter() - mark
     
     # Serve service-worker.js from static folder
     @app.route('/service-worker.js')
@@ -38,19 +49,60 @@ def create_app(config_name='default'):
         from flask import send_from_directory
         return send_from_directory('static', 'service-worker.js', mimetype='application/javascript')
     
+    if Config.SESSION_REAPER_ENABLED and not app.testing:
+        @app.before_request
+        def start_session_reaper():
+            from backend.services.session_reaper import get_session_reaper
+            get_session_reaper(app).ensure_started()
+    
+    if Config.JOB_WORKERS > 0 and not app.testing:
+        # Started per worker process, so jobs queued before a restart are drained without a new submit
+        @app.before_request
+        def start_job_workers():
+            from backend.services.job_queue import get_worker_pool
+            get_worker_pool().ensure_started()
+    
+    @app.teardown_request
+    def flush_gemini_usage(exception):
+        from backend.services.usage_service import get_usage_meter
+        get_usage_meter().maybe_flush()
+    
     @app.errorhandler(404)
     def not_found(error):
         return {'error': 'Not found'}, 404
     
+    @app.errorhandler(429)
+    def rate_limited(error):
+        return {'error': 'Rate limit exceeded'}, 429
+    
     @app.errorhandler(500)
     def internal_error(error):
         return {'error': 'Internal server error'}, 500
     
+    mark = time.perf_counter()
     with app.app_context():
-        db.create_all()
+        ensure_schema()
+    phases['schema'] = time.perf_counter() - mark
+    
+    if Config.PRELOAD_WARMUP:
+        # Under gunicorn --preload this runs once in the master and every forked worker inherits it
+        mark = time.perf_counter()
+        warm_up()
+        phases['warmup'] = time.perf_counter() - mark
     
+    phases['total'] = time.perf_counter() - started
+    app.extensions['startup_phases'] = phases
     return app
 
+def warm_up():
+    """Do the one-time work that would otherwise land on each worker's first requests"""
+    from backend.utils.crypto import get_fernet
+    
+    get_fernet()
+    # Loading these is the work: numpy and the sentiment lexicon, qrcode and Pillow
+    import backend.services.sentiment_service
+    import qrcode
+
 if __name__ == '__main__':
     app = create_app()
     app.run(debug=False, host='127.0.0.1', port=5000)
@@ -0,0 +1,46 @@
+"""Throughput of AIService.analyze_batch at increasing concurrency.
+
+Run from the repository root:
+
+    python -m backend.benchmarks.bench_ai_batch --items 64 --latency 0.05
+"""
+import argparse
+import time
+
+from backend.benchmarks.mock_gemini import start_mock_server
+from backend.config import Config
+from backend.services.ai_service import AIService
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--items', type=int, default=64)
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 2, 4, 8, 16])
+    args = parser.parse_args()
+
+    server, url = start_mock_server(latency=args.latency)
+    Config.GEMINI_API_URL = url
+    # Every level reuses the same texts; measure the network path, not the cache
+    Config.ANALYSIS_CACHE_ENABLED = False
+
+    texts = [f'Hurry! Only {i} left in stock' for i in range(args.items)]
+
+    print(f'{"concurrency":>12} {"seconds":>10} {"items/s":>10} {"speedup":>10}')
+    baseline = None
+
+    for concurrency in args.concurrency:
+        start = time.perf_counter()
+        results = AIService.analyze_batch(texts, max_concurrency=concurrency)
+        elapsed = time.perf_counter() - start
+
+        failures = sum(1 for r in results if not r.get('success'))
+        throughput = len(texts) / elapsed
+        baseline = baseline or throughput
+
+        print(f'{concurrency:>12} {elapsed:>10.3f} {throughput:>10.1f} {throughput / baseline:>9.1f}x'
+              + (f'  ({failures} failed)' if failures else ''))
+
+    server.shutdown()
+
+if __name__ == '__main__':
+    main()
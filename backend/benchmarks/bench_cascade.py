@@ -0,0 +1,95 @@
+"""Remote calls avoided, local accuracy and per-tier latency of the local/Gemini cascade.
+
+Trains the local model on a synthetic corpus, then replays labelled traffic
+(templated examples plus ambiguous product copy) through analyze_text with
+several uncertainty bands. Gemini is the mock server, treated as always
+right, so local accuracy is what the cascade trades for the avoided calls.
+The regex prefilter is disabled to isolate the classifier tier.
+
+Run from the repository root:
+
+    python -m backend.benchmarks.bench_cascade --requests 400
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from backend.benchmarks.bench_local_classifier import make_corpus
+from backend.benchmarks.mock_gemini import start_mock_server
+from backend.config import Config
+from backend.services.ai_service import AIService
+from backend.services.cascade_service import CascadeService
+from backend.services.local_classifier import NONE_LABEL, LocalClassifier
+
+VOCABULARY = ['offer', 'stock', 'price', 'today', 'delivery', 'member', 'save', 'limited', 'account',
+              'checkout', 'plan', 'discount', 'partners', 'fee', 'size', 'order']
+BANDS = [(0.1, 0.95), (0.2, 0.9), (0.3, 0.7)]
+
+def make_traffic(count, ambiguous_share, seed):
+    """Labelled texts; ambiguous ones are unlabelled copy the model has not seen"""
+    texts, labels = make_corpus(count, seed)
+    rng = random.Random(seed)
+    for i in range(int(count * ambiguous_share)):
+        texts[i] = ' '.join(rng.choice(VOCABULARY) for _ in range(rng.randint(3, 8))).capitalize()
+        labels[i] = None
+    order = list(range(count))
+    rng.shuffle(order)
+    return [texts[i] for i in order], [labels[i] for i in order]
+
+def run(texts, labels, server):
+    CascadeService.stats().reset()
+    before = server.request_count
+    correct = answered = 0
+
+    start = time.perf_counter()
+    for text, label in zip(texts, labels):
+        result = AIService.analyze_text(text)
+        if result.get('source') == 'local' and label is not None:
+            answered += 1
+            correct += result['detected'] == (label != NONE_LABEL)
+    seconds = time.perf_counter() - start
+
+    return seconds, server.request_count - before, correct / answered if answered else 1.0
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=400)
+    parser.add_argument('--ambiguous', type=float, default=0.2, help='share of unseen, unlabelled copy')
+    parser.add_argument('--latency', type=float, default=0.15)
+    args = parser.parse_args()
+
+    server, url = start_mock_server(latency=args.latency)
+    Config.GEMINI_API_URL = url
+    Config.ANALYSIS_CACHE_ENABLED = False
+    Config.AI_PREFILTER_ENABLED = False
+
+    train_texts, train_labels = make_corpus(5000, seed=1)
+    Config.LOCAL_MODEL_PATH = os.path.join(tempfile.mkdtemp(prefix='cascade-'), 'model.npz')
+    LocalClassifier.train(train_texts, train_labels).save(Config.LOCAL_MODEL_PATH)
+
+    texts, labels = make_traffic(args.requests, args.ambiguous, seed=3)
+    print(f'{"band":<14} {"wall s":>7} {"remote":>7} {"avoided":>8} {"local acc":>10} '
+          f'{"local p50/p99 ms":>17} {"remote p50/p99 ms":>18}')
+
+    Config.AI_CASCADE_ENABLED = False
+    seconds, remote, _ = run(texts, labels, server)
+    tiers = CascadeService.stats().snapshot()['tiers']
+    print(f'{"off":<14} {seconds:>7.2f} {remote:>7} {0:>8.0%} {"-":>10} {"-":>17} '
+          f'{tiers["remote"]["p50_ms"]:>8.1f}/{tiers["remote"]["p99_ms"]:<9.1f}')
+
+    Config.AI_CASCADE_ENABLED = True
+    for low, high in BANDS:
+        Config.AI_CASCADE_LOW, Config.AI_CASCADE_HIGH = low, high
+        seconds, remote, accuracy = run(texts, labels, server)
+        stats = CascadeService.stats().snapshot()
+        local, remote_tier = stats['tiers']['local'], stats['tiers']['remote']
+        print(f'{f"({low}, {high})":<14} {seconds:>7.2f} {remote:>7} {stats["avoided_fraction"]:>8.0%} '
+              f'{accuracy:>10.1%} {local["p50_ms"]:>8.2f}/{local["p99_ms"]:<8.2f} '
+              f'{remote_tier["p50_ms"]:>8.1f}/{remote_tier["p99_ms"]:<9.1f}')
+
+    server.shutdown()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+"""Where worker boot time goes: imports, create_app phases and first-request costs.
+
+Every measurement runs in a fresh interpreter against a SQLite file that
+already holds the schema, as a worker joining a running deployment would.
+Worker time is reported twice: booting on its own, and forked from a
+master that ran create_app with PRELOAD_WARMUP, as gunicorn --preload
+does. The slowest imports come from python -X importtime.
+
+Run from the repository root:
+
+    python -m backend.benchmarks.bench_cold_start --runs 5
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+
+CHILD = r'''
+import json, os, time
+started = time.perf_counter()
+from backend.app import create_app
+imported = time.perf_counter() - started
+app = create_app()
+result = dict(app.extensions['startup_phases'], imports=imported)
+
+with app.app_context():
+    from sqlalchemy import event
+    from backend.models import db, ensure_schema
+    statements = []
+    event.listen(db.engine, 'before_cursor_execute', lambda *args: statements.append(args[2]))
+    # Both timed on a warm connection; the boot-time schema phase above also pays for connecting
+    for name, step in (('schema_check', ensure_schema), ('create_all', db.create_all)):
+        statements.clear()
+        mark = time.perf_counter()
+        step()
+        result[name] = time.perf_counter() - mark
+        result[name + '_queries'] = len(statements)
+
+def first_requests():
+    """Work a worker's first login and first sentiment request would do"""
+    timings = {}
+    mark = time.perf_counter()
+    from backend.utils.crypto import decrypt_data, encrypt_data
+    decrypt_data(encrypt_data(b'passkey'))
+    timings['first_crypto'] = time.perf_counter() - mark
+    mark = time.perf_counter()
+    from backend.services.sentiment_service import SentimentService
+    SentimentService.score(['an awful, hopeless day'])
+    timings['first_sentiment'] = time.perf_counter() - mark
+    return timings
+
+if os.environ.get('FORK_WORKER'):
+    read, write = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.write(write, json.dumps(first_requests()).encode())
+        os._exit(0)
+    os.waitpid(pid, 0)
+    result.update(json.loads(os.read(read, 65536)))
+else:
+    result.update(first_requests())
+print(json.dumps(result))
+'''
+
+PHASES = ['imports', 'flask_and_db', 'blueprints', 'schema', 'warmup', 'total', 'schema_check', 'create_all',
+          'first_crypto', 'first_sentiment']
+
+def run_child(env):
+    output = subprocess.run([sys.executable, '-c', CHILD], env=env, capture_output=True, text=True, check=True)
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+def slowest_imports(env, count):
+    output = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'from backend.app import create_app'],
+                            env=env, capture_output=True, text=True, check=True)
+    rows = []
+    for line in output.stderr.splitlines():
+        match = re.match(r'import time:\s+\d+ \|\s+(\d+) \|( *)(\S+)', line)
+        # Top-level packages only, so nested modules are not counted twice
+        if match and '.' not in match.group(3):
+            rows.append((int(match.group(1)), match.group(3)))
+    return sorted(rows, reverse=True)[:count]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--imports', type=int, default=12, help='how many of the slowest imports to list')
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix='bench-cold-start-')
+    env = dict(os.environ, DATABASE_URL='sqlite:///' + os.path.join(directory, 'shieldui.db'),
+               SESSION_REAPER_ENABLED='false', PYTHONPATH=os.getcwd())
+    run_child(env)
+
+    modes = {
+        'standalone worker': dict(env, PRELOAD_WARMUP='false'),
+        'preloaded master + forked worker': dict(env, PRELOAD_WARMUP='true', FORK_WORKER='1')
+    }
+    results = {name: [run_child(mode_env) for _ in range(args.runs)] for name, mode_env in modes.items()}
+
+    print(f'{"median ms over " + str(args.runs) + " runs":<24}' + ''.join(f'{name:>34}' for name in modes))
+    for phase in PHASES:
+        values = []
+        for runs in results.values():
+            samples = [run[phase] for run in runs if phase in run]
+            values.append(f'{statistics.median(samples) * 1000:>34.1f}' if samples else f'{"-":>34}')
+        print(f'{phase:<24}' + ''.join(values))
+    run = results['standalone worker'][0]
+    print(f'schema_check and create_all are timed on a warm connection; boot runs only the check. '
+          f'Queries: {run["schema_check_queries"]} vs {run["create_all_queries"]}')
+
+    print('\nslowest top-level imports of backend.app (cumulative ms):')
+    for micros, name in slowest_imports(env, args.imports):
+        print(f'  {micros / 1000:>8.1f}  {name}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""Latency of one multi-element prompt versus one Gemini call per element.
+
+Run from the repository root:
+
+    python -m backend.benchmarks.bench_element_batch --elements 30 --latency 0.3
+"""
+import argparse
+import time
+
+from backend.benchmarks.mock_gemini import start_mock_server
+from backend.config import Config
+from backend.services.ai_service import AIService
+
+def timed(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--elements', type=int, default=30)
+    parser.add_argument('--latency', type=float, default=0.3,
+                        help='fixed per-request model latency in seconds')
+    parser.add_argument('--output-latency', type=float, default=0.01,
+                        help='extra seconds per 1000 response characters')
+    args = parser.parse_args()
+
+    server, url = start_mock_server(latency=args.latency, output_latency=args.output_latency)
+    Config.GEMINI_API_URL = url
+    Config.ANALYSIS_CACHE_ENABLED = False
+    Config.AI_PREFILTER_ENABLED = False
+
+    elements = [{
+        'text': f'Hurry! Only {i} left in stock',
+        'pattern': 'false_urgency',
+        'role': 'span',
+        'selector': f'span.stock-{i}'
+    } for i in range(args.elements)]
+    texts = [e['text'] for e in elements]
+
+    rows = [
+        ('single element', 1, lambda: AIService.analyze_elements(elements[:1])),
+        ('batched prompt', 1, lambda: AIService.analyze_elements(elements)),
+        ('per-element, sequential', len(texts), lambda: AIService.analyze_batch(texts, max_concurrency=1)),
+        ('per-element, concurrent', len(texts), lambda: AIService.analyze_batch(texts)),
+    ]
+
+    print(f'{args.elements} elements, mock latency {args.latency}s\n')
+    print(f'{"mode":<28} {"requests":>9} {"seconds":>9}')
+    for label, requests, func in rows:
+        print(f'{label:<28} {requests:>9} {timed(func):>9.3f}')
+
+    server.shutdown()
+
+if __name__ == '__main__':
+    main()
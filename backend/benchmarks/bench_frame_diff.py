@@ -0,0 +1,106 @@
+"""Pixels uploaded per browsing session with frame-diff OCR versus whole frames.
+
+Run from the repository root:
+
+    python -m backend.benchmarks.bench_frame_diff --frames 40 --upload-latency 0.4
+"""
+import argparse
+import functools
+import io
+import random
+import time
+
+from PIL import Image, ImageDraw
+
+from backend.benchmarks.mock_gemini import start_mock_server
+from backend.config import Config
+from backend.services.frame_diff import FrameDiffOCR
+from backend.services.ocr_service import OCRService
+
+def make_page(width, height, seed):
+    rng = random.Random(seed)
+    page = Image.new('RGB', (width, height), (250, 250, 250))
+    draw = ImageDraw.Draw(page)
+    for row in range(0, height, 36):
+        words = ' '.join(rng.choice(['Only', '3', 'left', 'Hurry', 'deal', 'cart', 'price', 'free'])
+                         for _ in range(12))
+        draw.text((width // 10 + rng.randint(0, 80), row + 8), words, fill=(30, 30, 30))
+        if rng.random() < 0.15:
+            draw.rectangle((width // 2, row, width // 2 + rng.randint(60, 400), row + 28),
+                           fill=(rng.randint(0, 255), 90, 120))
+    return page
+
+def session(page, size, frames, seed):
+    """Yield PNG captures of a user reading: scrolls, pauses and a ticking timer"""
+    rng = random.Random(seed)
+    width, height = size
+    offset = 0
+    for i in range(frames):
+        action = rng.random()
+        if action < 0.5:
+            offset = min(max(offset + rng.choice([-1, 1, 1, 1]) * rng.randint(40, height // 3), 0),
+                         page.size[1] - height)
+
+        frame = page.crop((0, offset, width, offset + height))
+        # A countdown banner pinned to the viewport top changes every frame
+        draw = ImageDraw.Draw(frame)
+        draw.rectangle((0, 0, width, 40), fill=(200, 30, 30))
+        draw.text((20, 12), f'Offer ends in 00:{59 - i % 60:02d}', fill=(255, 255, 255))
+
+        buffer = io.BytesIO()
+        frame.save(buffer, format='PNG')
+        yield buffer.getvalue()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--frames', type=int, default=40)
+    parser.add_argument('--width', type=int, default=1280)
+    parser.add_argument('--height', type=int, default=800)
+    parser.add_argument('--latency', type=float, default=0.2)
+    parser.add_argument('--upload-latency', type=float, default=0.4,
+                        help='simulated seconds per MB uploaded')
+    args = parser.parse_args()
+
+    server, url = start_mock_server(latency=args.latency, input_latency=args.upload_latency)
+    Config.GEMINI_API_URL = url
+    # Measure the uploads themselves, not repeat hits on the OCR cache
+    Config.OCR_CACHE_ENABLED = False
+
+    size = (args.width, args.height)
+    page = make_page(args.width, args.height * 6, seed=1)
+    frames = list(session(page, size, args.frames, seed=2))
+
+    start = time.perf_counter()
+    for frame in frames:
+        OCRService.extract_text(frame)
+    full_seconds = time.perf_counter() - start
+
+    differ = FrameDiffOCR(
+        functools.partial(OCRService.extract_text, perceptual=False),
+        width=Config.OCR_FRAME_DIFF_WIDTH,
+        band_height=Config.OCR_FRAME_DIFF_BAND_HEIGHT,
+        tolerance=Config.OCR_FRAME_DIFF_TOLERANCE,
+        max_region_bands=Config.OCR_FRAME_DIFF_REGION_BANDS
+    )
+    regions = 0
+    diff_ms = []
+    start = time.perf_counter()
+    for frame in frames:
+        frame_start = time.perf_counter()
+        result = differ.extract_text('bench', frame)
+        diff_ms.append((time.perf_counter() - frame_start) * 1000)
+        regions += result['regions_uploaded']
+    diff_seconds = time.perf_counter() - start
+    stats = differ.session_stats('bench')
+
+    print(f'frames:               {len(frames)} at {args.width}x{args.height}')
+    print(f'whole-frame OCR:      {len(frames)} calls, {full_seconds:.2f}s, 100.0% of pixels uploaded')
+    print(f'frame-diff OCR:       {regions} calls, {diff_seconds:.2f}s, '
+          f'{stats["uploaded_fraction"]:.1%} of pixels uploaded')
+    print(f'frame-diff per frame: median {sorted(diff_ms)[len(diff_ms) // 2]:.0f} ms, '
+          f'max {max(diff_ms):.0f} ms')
+
+    server.shutdown()
+
+if __name__ == '__main__':
+    main()
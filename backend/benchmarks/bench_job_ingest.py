@@ -0,0 +1,60 @@
+"""Ingest latency of POST /api/jobs while the upstream is slow.
+
+Run from the repository root:
+
+    python -m backend.benchmarks.bench_job_ingest --jobs 500 --latency 2.0
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from backend.benchmarks.mock_gemini import start_mock_server
+from backend.config import Config
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--jobs', type=int, default=500)
+    parser.add_argument('--latency', type=float, default=2.0,
+                        help='mock Gemini latency; ingest should not depend on it')
+    args = parser.parse_args()
+
+    server, url = start_mock_server(latency=args.latency)
+    directory = tempfile.mkdtemp(prefix='bench-jobs-')
+    Config.GEMINI_API_URL = url
+    Config.JOB_QUEUE_PATH = os.path.join(directory, 'jobs.db')
+    Config.ANALYSIS_CACHE_ENABLED = False
+
+    from backend.app import create_app
+    from backend.models import User, db
+    from backend.services.auth_service import AuthService
+
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        user = User(username='bench', passkey_credential=b'x', totp_secret='')
+        db.session.add(user)
+        db.session.commit()
+        token, _ = AuthService.create_session(user)
+
+    client = app.test_client()
+    headers = {'Authorization': f'Bearer {token}'}
+
+    samples = []
+    for i in range(args.jobs):
+        start = time.perf_counter()
+        response = client.post('/api/jobs', json={'type': 'text', 'text': f'Hurry, only {i} left'}, headers=headers)
+        samples.append(time.perf_counter() - start)
+        assert response.status_code == 202
+
+    samples.sort()
+    print(f'{args.jobs} submissions with mock Gemini latency {args.latency}s')
+    print(f'p50 {samples[len(samples) // 2] * 1000:.2f} ms  '
+          f'p99 {samples[int(len(samples) * 0.99)] * 1000:.2f} ms  '
+          f'mean {statistics.mean(samples) * 1000:.2f} ms')
+
+    server.shutdown()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""Training time, artifact size, load time and per-text inference cost of the local classifier.
+
+Run from the repository root:
+
+    python -m backend.benchmarks.bench_local_classifier --examples 20000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from backend.services.local_classifier import NONE_LABEL, LocalClassifier
+
+TEMPLATES = {
+    'urgency_manipulation': ['Only {n} left in stock', 'Hurry! Offer ends in {n} minutes',
+                             '{n} people are viewing this right now', 'Limited time: {n}% off today only'],
+    'confirm_shaming': ["No thanks, I don't want to save {n}%", 'I prefer paying full price',
+                        'No, I hate free shipping', 'Continue without my {n}% discount'],
+    'sneaky_opt_in': ['Send me the newsletter and offers from partners', 'Share my data with {n} partners',
+                      'Yes, I want marketing emails', 'Add protection plan for ${n}'],
+    'hidden_costs': ['Service fee ${n} added at checkout', 'Additional fees may apply *see details',
+                     'Price excludes ${n} handling', '+ shipping and {n} surcharge'],
+    NONE_LABEL: ['Add to cart', 'Size {n} in stock at your local store', 'Free returns within {n} days',
+                 'Contact customer support', 'Product description and care instructions',
+                 'Rated {n} out of 5 by verified buyers', 'Continue to payment', 'Sign in to your account']
+}
+FILLER = ['', 'now', 'today', 'for you', 'on this item', 'with code SAVE', 'while supplies last']
+
+def make_corpus(count, seed):
+    rng = random.Random(seed)
+    labels = list(TEMPLATES)
+    texts, targets = [], []
+    for _ in range(count):
+        label = rng.choice(labels)
+        text = rng.choice(TEMPLATES[label]).format(n=rng.randint(1, 99))
+        texts.append(f'{text} {rng.choice(FILLER)}'.strip())
+        targets.append(label)
+    return texts, targets
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--examples', type=int, default=20000)
+    parser.add_argument('--bits', type=int, default=16)
+    args = parser.parse_args()
+
+    texts, labels = make_corpus(args.examples, seed=1)
+    test_texts, test_labels = make_corpus(2000, seed=2)
+
+    start = time.perf_counter()
+    model = LocalClassifier.train(texts, labels, bits=args.bits)
+    print(f'train: {len(texts)} examples in {time.perf_counter() - start:.2f}s')
+
+    predictions = model.predict_proba(test_texts).argmax(axis=1)
+    accuracy = sum(model.labels[p] == label for p, label in zip(predictions, test_labels)) / len(test_labels)
+    print(f'holdout accuracy: {accuracy:.1%}')
+
+    path = os.path.join(tempfile.mkdtemp(prefix='local-model-'), 'model.npz')
+    model.save(path)
+    start = time.perf_counter()
+    model = LocalClassifier.load(path)
+    print(f'artifact: {os.path.getsize(path) / 1024:.0f} KB, load {(time.perf_counter() - start) * 1000:.1f} ms')
+
+    print(f'{"batch":>7} {"us/text":>9}')
+    for batch in (1, 32, 1024, 16384):
+        sample = (test_texts * (batch // len(test_texts) + 1))[:batch]
+        repeats = max(1, 20000 // batch)
+        start = time.perf_counter()
+        for _ in range(repeats):
+            model.classify(sample)
+        print(f'{batch:>7} {(time.perf_counter() - start) / (repeats * batch) * 1e6:>9.1f}')
+
+if __name__ == '__main__':
+    main()
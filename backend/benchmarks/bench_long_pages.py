@@ -0,0 +1,79 @@
+"""Coverage and wall-clock time for long pages: truncation versus chunked map-reduce.
+
+Run from the repository root:
+
+    python -m backend.benchmarks.bench_long_pages --paragraphs 300
+"""
+import argparse
+import random
+import time
+
+from backend.benchmarks.mock_gemini import DEFAULT_VERDICT, start_mock_server
+from backend.config import Config
+from backend.services.ai_service import AIService
+from backend.services.chunking_service import ChunkingService
+
+NAV = 'Home | Shop | Deals | Account | Help'
+FOOTER = 'Privacy policy | Terms of service | Cookie settings | Contact us'
+TRAPS = [
+    'Only 2 left at this price, hurry!',
+    'Subscribe to our newsletter and partners offers (pre-checked)',
+    'Additional fees may apply at checkout *see details',
+    "No thanks, I don't want to save money",
+]
+
+def make_page(paragraphs, seed):
+    rng = random.Random(seed)
+    vocabulary = ['product', 'quality', 'delivery', 'colour', 'size', 'review', 'customer', 'material',
+                  'warranty', 'return', 'order', 'design', 'comfortable', 'durable', 'recommend']
+    blocks = [NAV]
+    for i in range(paragraphs):
+        blocks.append(' '.join(rng.choice(vocabulary) for _ in range(rng.randint(15, 40))).capitalize() + '.')
+        if i and i % (paragraphs // len(TRAPS)) == 0:
+            blocks.append(TRAPS[(i // (paragraphs // len(TRAPS)) - 1) % len(TRAPS)])
+        if i % 50 == 0:
+            blocks.extend([NAV, FOOTER])
+    return '\n\n'.join(blocks)
+
+def run(page, server):
+    before = server.request_count
+    start = time.perf_counter()
+    result = AIService.analyze_text(page)
+    return result, time.perf_counter() - start, server.request_count - before
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--paragraphs', type=int, default=300)
+    parser.add_argument('--latency', type=float, default=0.5)
+    parser.add_argument('--output-latency', type=float, default=1.5)
+    args = parser.parse_args()
+
+    server, url = start_mock_server(latency=args.latency, output_latency=args.output_latency)
+    Config.GEMINI_API_URL = url
+    Config.ANALYSIS_CACHE_ENABLED = False
+
+    page = make_page(args.paragraphs, seed=1)
+    cleaned = ChunkingService.clean(page)
+    print(f'page: {len(page)} chars, {len(cleaned)} after boilerplate removal, '
+          f'{len(ChunkingService.split(cleaned, Config.AI_CHUNK_CHARS))} chunks')
+    print(f'{"mode":<24} {"wall ms":>8} {"requests":>9} {"coverage":>9}  first trap found')
+
+    Config.AI_CHUNKING_ENABLED = False
+    result, seconds, requests = run(page, server)
+    found = [trap for trap in TRAPS if trap in page[:Config.AI_CHUNK_CHARS]]
+    print(f'{"truncated to 2000":<24} {seconds * 1000:>8.0f} {requests:>9} '
+          f'{Config.AI_CHUNK_CHARS / len(cleaned):>9.0%}  {found[0] if found else "-"}')
+
+    Config.AI_CHUNKING_ENABLED = True
+    for label, confidence in [('chunked', DEFAULT_VERDICT['confidence_score']), ('chunked, early exit', 0.95)]:
+        server.verdict = dict(DEFAULT_VERDICT, confidence_score=confidence)
+        result, seconds, requests = run(page, server)
+        coverage = result['coverage']
+        print(f'{label:<24} {seconds * 1000:>8.0f} {requests:>9} '
+              f'{coverage["chars_analyzed"] / coverage["chars_total"]:>9.0%}  '
+              f'early_exit={coverage["early_exit"]}')
+
+    server.shutdown()
+
+if __name__ == '__main__':
+    main()
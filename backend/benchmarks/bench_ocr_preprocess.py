@@ -0,0 +1,67 @@
+"""Payload size and OCR latency with and without image preprocessing.
+
+Run from the repository root:
+
+    python -m backend.benchmarks.bench_ocr_preprocess --upload-latency 0.4
+"""
+import argparse
+import io
+import random
+import time
+
+from PIL import Image, ImageDraw
+
+from backend.benchmarks.mock_gemini import start_mock_server
+from backend.config import Config
+from backend.services.ocr_service import OCRService
+
+SIZES = [(1280, 800), (2560, 1600), (2880, 1800), (3024, 1964), (1170, 2532)]
+
+def make_screenshot(size, seed):
+    rng = random.Random(seed)
+    image = Image.new('RGB', size, (250, 250, 250))
+    draw = ImageDraw.Draw(image)
+    margin = size[0] // 8
+    draw.rectangle((margin, 80, size[0] - margin, 180), fill=(30, 90, 200))
+    # A noisy "product photo" block, which is what makes real captures heavy
+    photo = Image.effect_noise((size[0] // 3, size[1] // 3), 60).convert('RGB')
+    image.paste(photo, (size[0] - margin - photo.size[0], 220))
+    for row in range(220, size[1] - 80, 36):
+        words = ' '.join(rng.choice(['Only', '3', 'left', 'Hurry', 'deal', 'cart', 'price', 'free'])
+                         for _ in range(12))
+        draw.text((margin, row), words, fill=(30, 30, 30))
+    buffer = io.BytesIO()
+    image.save(buffer, format='PNG')
+    return buffer.getvalue()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--latency', type=float, default=0.2)
+    parser.add_argument('--upload-latency', type=float, default=0.4,
+                        help='simulated seconds per MB uploaded')
+    args = parser.parse_args()
+
+    server, url = start_mock_server(latency=args.latency, input_latency=args.upload_latency)
+    Config.GEMINI_API_URL = url
+
+    print(f'{"size":>11} {"orig KB":>9} {"sent KB":>9} {"saved":>6} {"prep ms":>8} '
+          f'{"raw ms":>8} {"prep e2e":>9}')
+    for seed, size in enumerate(SIZES):
+        image = make_screenshot(size, seed)
+
+        start = time.perf_counter()
+        OCRService.extract_text(image, preprocess=False)
+        raw_ms = (time.perf_counter() - start) * 1000
+
+        result = OCRService.extract_text(image, preprocess=True)
+        stats = result['preprocessing']
+        saved = 1 - stats['processed_bytes'] / stats['original_bytes']
+
+        print(f'{size[0]:>5}x{size[1]:<5} {stats["original_bytes"] / 1024:>9.0f} '
+              f'{stats["processed_bytes"] / 1024:>9.0f} {saved:>6.0%} {stats["preprocess_ms"]:>8.1f} '
+              f'{raw_ms:>8.0f} {result["latency_ms"]:>9.0f}')
+
+    server.shutdown()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""Throughput of the server-side dark-pattern prefilter.
+
+Run from the repository root:
+
+    python -m backend.benchmarks.bench_prefilter --megabytes 20
+"""
+import argparse
+import random
+import time
+
+from backend.services.prefilter_service import COMBINED_PATTERN, PrefilterService
+
+FILLER = (
+    'product description size colour add to cart customer reviews delivery '
+    'returns policy account sign in search menu home about contact help '
+    'warranty specifications rating questions answers brand price compare'
+).split()
+
+DARK_SNIPPETS = [
+    'Hurry, only 3 left in stock',
+    'No thanks, I prefer paying full price',
+    'Price shown + shipping and handling',
+    'Sign me up for the newsletter',
+    '12 people viewing this right now'
+]
+
+def build_corpus(megabytes, dark_ratio, seed=7):
+    rng = random.Random(seed)
+    lines = []
+    size = 0
+    while size < megabytes * 1_000_000:
+        if rng.random() < dark_ratio:
+            line = rng.choice(DARK_SNIPPETS)
+        else:
+            line = ' '.join(rng.choice(FILLER) for _ in range(rng.randint(4, 30)))
+        lines.append(line)
+        size += len(line) + 1
+    return lines
+
+def measure(label, lines, func):
+    total_bytes = sum(len(line) + 1 for line in lines)
+    start = time.perf_counter()
+    for line in lines:
+        func(line)
+    elapsed = time.perf_counter() - start
+    print(f'{label:<40} {total_bytes / elapsed / 1e6:>10.1f} MB/s '
+          f'{elapsed / len(lines) * 1e6:>8.2f} us/snippet')
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--megabytes', type=float, default=20)
+    parser.add_argument('--dark-ratio', type=float, default=0.02)
+    args = parser.parse_args()
+
+    lines = build_corpus(args.megabytes, args.dark_ratio)
+    page = '\n'.join(lines)
+    flagged = sum(1 for line in lines if PrefilterService.has_match(line))
+
+    print(f'{len(lines)} snippets, {len(page) / 1e6:.1f} MB, {flagged} flagged\n')
+
+    measure('regex only (per snippet)', lines, COMBINED_PATTERN.search)
+    measure('has_match (per snippet)', lines, PrefilterService.has_match)
+    measure('scan (per snippet)', lines, PrefilterService.scan)
+
+    start = time.perf_counter()
+    matches = PrefilterService.scan(page)
+    elapsed = time.perf_counter() - start
+    print(f'{"scan (whole corpus as one page)":<40} {len(page) / elapsed / 1e6:>10.1f} MB/s '
+          f'{len(matches):>8} matches')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""End-to-end latency and Gemini requests per screenshot, fused versus two-stage.
+
+Run from the repository root:
+
+    python -m backend.benchmarks.bench_screenshot_modes --screenshots 10
+"""
+import argparse
+import time
+
+from backend.benchmarks.bench_ocr_preprocess import make_screenshot
+from backend.benchmarks.mock_gemini import start_mock_server
+from backend.config import Config
+from backend.services.ai_service import AIService
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--screenshots', type=int, default=10)
+    parser.add_argument('--latency', type=float, default=0.4, help='seconds per call before output')
+    parser.add_argument('--upload-latency', type=float, default=0.4, help='simulated seconds per MB uploaded')
+    parser.add_argument('--output-latency', type=float, default=1.5,
+                        help='seconds per 1000 generated characters')
+    args = parser.parse_args()
+
+    server, url = start_mock_server(latency=args.latency, input_latency=args.upload_latency,
+                                    output_latency=args.output_latency)
+    Config.GEMINI_API_URL = url
+    # Distinct screenshots and no cache reuse, so every screenshot pays full price
+    Config.ANALYSIS_CACHE_ENABLED = False
+    Config.OCR_CACHE_ENABLED = False
+
+    screenshots = [make_screenshot((1280, 800), seed) for seed in range(args.screenshots)]
+
+    print(f'{"mode":<10} {"p50 ms":>8} {"p95 ms":>8} {"requests/shot":>14}')
+    for mode in AIService.SCREENSHOT_MODES:
+        latencies = []
+        before = server.request_count
+        for image in screenshots:
+            start = time.perf_counter()
+            result = AIService.analyze_screenshot(image, mode=mode)
+            latencies.append(time.perf_counter() - start)
+            assert result['success'], result
+        requests = (server.request_count - before) / len(screenshots)
+
+        print(f'{mode:<10} {percentile(latencies, 0.5) * 1000:>8.0f} '
+              f'{percentile(latencies, 0.95) * 1000:>8.0f} {requests:>14.2f}')
+
+    server.shutdown()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""Sentiment scoring throughput in samples per second, per request versus batched.
+
+Scores synthetic feed samples through SentimentService directly and
+through POST /api/analyze/sentiment with the Flask test client: once with
+one request per sample, as the extension used to send them, and once with
+every sample of a session in a single request.
+
+Run from the repository root:
+
+    python -m backend.benchmarks.bench_sentiment --samples 5000
+"""
+import argparse
+import random
+import time
+
+from backend.services.sentiment_service import LEXICON_TIERS, SentimentService
+
+FILLER = ['the', 'a', 'people', 'today', 'news', 'video', 'post', 'comments', 'city', 'team', 'new',
+          'after', 'says', 'more', 'just', 'watch', 'thread', 'update', 'photo', 'live']
+
+def make_samples(count, seed):
+    rng = random.Random(seed)
+    lexicon = ' '.join(LEXICON_TIERS.values()).split()
+    samples = []
+    for _ in range(count):
+        words = [rng.choice(lexicon) if rng.random() < 0.15 else rng.choice(FILLER)
+                 for _ in range(rng.randint(10, 60))]
+        samples.append(' '.join(words))
+    return samples
+
+def rate(count, seconds):
+    return f'{count / seconds:>12,.0f}'
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--samples', type=int, default=5000)
+    parser.add_argument('--session', type=int, default=200, help='samples per doomscore request')
+    args = parser.parse_args()
+
+    samples = make_samples(args.samples, seed=1)
+    print(f'{"mode":<34} {"samples/s":>12}')
+
+    start = time.perf_counter()
+    for sample in samples:
+        SentimentService.negativity([sample])
+    print(f'{"service, one sample per call":<34} {rate(len(samples), time.perf_counter() - start)}')
+
+    for batch in (10, 100, 1000):
+        start = time.perf_counter()
+        for offset in range(0, len(samples), batch):
+            SentimentService.negativity(samples[offset:offset + batch])
+        print(f'{f"service, batches of {batch}":<34} {rate(len(samples), time.perf_counter() - start)}')
+
+    from backend.app import create_app
+
+    client = create_app('testing').test_client()
+    session = samples[:args.session]
+
+    start = time.perf_counter()
+    for sample in session:
+        client.post('/api/analyze/sentiment', json={'samples': [sample]})
+    print(f'{"HTTP, one request per sample":<34} {rate(len(session), time.perf_counter() - start)}')
+
+    start = time.perf_counter()
+    client.post('/api/analyze/sentiment', json={'samples': session})
+    print(f'{f"HTTP, one request of {len(session)}":<34} {rate(len(session), time.perf_counter() - start)}')
+
+if __name__ == '__main__':
+    main()
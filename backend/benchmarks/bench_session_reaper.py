@@ -0,0 +1,135 @@
+"""Sessions table size and validation latency before and after reaping expired rows.
+
+Fills a SQLite file with --rows sessions, --expired of them past their
+expiry as abandoned tokens would be, then measures validation of live
+tokens, validation of expired tokens (the old delete-and-commit path
+against the read-only one), one full reaper pass, validation again and
+the cost of a steady-state reaper round with and without the index.
+
+Run from the repository root:
+
+    python -m backend.benchmarks.bench_session_reaper --rows 2000000 --expired 0.9
+"""
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from backend.benchmarks.bench_transport import percentile
+from backend.config import Config
+
+def populate(path, rows, expired, users=1000):
+    conn = sqlite3.connect(path)
+    now = datetime.utcnow()
+    conn.executemany('INSERT INTO users (id, username, passkey_credential, totp_secret, created_at, settings_version) '
+                     'VALUES (?, ?, ?, ?, ?, 0)',
+                     [(i + 1, f'user{i}', b'x', '', now) for i in range(users)])
+    rng = random.Random(1)
+
+    def sessions():
+        for i in range(rows):
+            if rng.random() < expired:
+                expires_at = now - timedelta(hours=rng.uniform(1, 24 * 90))
+            else:
+                expires_at = now + timedelta(hours=rng.uniform(1, 24))
+            yield i + 1, rng.randrange(users) + 1, f'token-{i:09d}', expires_at, expires_at - timedelta(hours=24)
+
+    conn.executemany('INSERT INTO sessions (id, user_id, token, expires_at, created_at) VALUES (?, ?, ?, ?, ?)',
+                     sessions())
+    conn.commit()
+    live = [row[0] for row in conn.execute('SELECT token FROM sessions WHERE expires_at > ? LIMIT 5000', (now,))]
+    dead = [row[0] for row in conn.execute('SELECT token FROM sessions WHERE expires_at < ? LIMIT 2000', (now,))]
+    conn.close()
+    return live, dead
+
+def table_size(path):
+    conn = sqlite3.connect(path)
+    rows = conn.execute('SELECT COUNT(*) FROM sessions').fetchone()[0]
+    pages = conn.execute("SELECT SUM(pgsize) FROM dbstat WHERE name LIKE '%sessions%'").fetchone()[0] \
+        if conn.execute("SELECT 1 FROM pragma_module_list WHERE name = 'dbstat'").fetchone() else None
+    conn.close()
+    size = f'{pages / 2**20:.0f} MB in sessions pages' if pages else f'{os.path.getsize(path) / 2**20:.0f} MB file'
+    return f'{rows:,} rows, {size}'
+
+def time_validations(tokens):
+    from backend.models import db
+    from backend.services.auth_service import AuthService
+
+    latencies = []
+    for token in tokens:
+        db.session.remove()
+        start = time.perf_counter()
+        AuthService.validate_session(token)
+        latencies.append(time.perf_counter() - start)
+    return f'p50 {percentile(latencies, 0.5) * 1e6:.0f} us, p99 {percentile(latencies, 0.99) * 1e6:.0f} us'
+
+def delete_on_read(tokens):
+    """The validate_session expiry path this change removed"""
+    from backend.models import Session, db
+
+    latencies = []
+    for token in tokens:
+        db.session.remove()
+        start = time.perf_counter()
+        session = Session.query.filter_by(token=token).first()
+        if session.expires_at < datetime.utcnow():
+            db.session.delete(session)
+            db.session.commit()
+        latencies.append(time.perf_counter() - start)
+    return f'p50 {percentile(latencies, 0.5) * 1e6:.0f} us, p99 {percentile(latencies, 0.99) * 1e6:.0f} us'
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=2000000)
+    parser.add_argument('--expired', type=float, default=0.9, help='fraction of sessions already expired')
+    parser.add_argument('--batch', type=int, default=1000)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix='bench-reaper-')
+    path = os.path.join(directory, 'sessions.db')
+    Config.SQLALCHEMY_DATABASE_URI = 'sqlite:///' + path
+    Config.SESSION_CACHE_ENABLED = False
+    Config.SESSION_REAPER_ENABLED = False
+
+    from backend.app import create_app
+    from backend.models import Session, db
+    from backend.services.session_reaper import SessionReaper
+
+    app = create_app()
+    start = time.perf_counter()
+    live, dead = populate(path, args.rows, args.expired)
+    print(f'populated in {time.perf_counter() - start:.0f}s')
+
+    with app.app_context():
+        print(f'before: {table_size(path)}')
+        print(f'  live token validation:    {time_validations(live)}')
+        print(f'  expired token, read-only: {time_validations(dead[:1000])}')
+        print(f'  expired token, old delete+commit: {delete_on_read(dead[1000:])}')
+
+        reaper = SessionReaper(app, batch_size=args.batch, pause=0)
+        start = time.perf_counter()
+        deleted = reaper.reap_once()
+        elapsed = time.perf_counter() - start
+        stats = reaper.stats()
+        print(f'reaper: {deleted:,} rows in {stats["batches"]} batches, {elapsed:.1f}s, '
+              f'{elapsed / max(stats["batches"], 1) * 1000:.1f} ms per batch transaction')
+
+        print(f'after: {table_size(path)}')
+        print(f'  live token validation:    {time_validations(live)}')
+
+        # Once the reaper keeps up, few rows are expired and a scan has to read the whole table to find them
+        index = next(i for i in Session.__table__.indexes if i.name == 'ix_sessions_expires_at')
+        for label in ('with', 'without'):
+            if label == 'without':
+                index.drop(bind=db.engine)
+            db.session.remove()
+            start = time.perf_counter()
+            reaper.reap_once()
+            print(f'  steady-state reaper round {label} expires_at index: {(time.perf_counter() - start) * 1000:.1f} ms')
+        index.create(bind=db.engine, checkfirst=True)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""Cost of validating a bearer token: opaque tokens with and without the session cache, and signed tokens.
+
+Each validation runs as its own request would: a fresh SQLAlchemy session,
+so the identity map cannot hide queries. The database is a SQLite file
+holding --sessions live sessions; signed tokens are issued for the same
+users, with --revoked other tokens already revoked.
+
+Run from the repository root:
+
+    python -m backend.benchmarks.bench_session_validation --sessions 20000 --requests 20000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+from backend.benchmarks.bench_transport import percentile
+from backend.config import Config
+
+def populate(count):
+    from backend.models import Session, User, db
+
+    users = [{'username': f'user{i}', 'passkey_credential': b'x', 'totp_secret': ''} for i in range(count)]
+    db.session.execute(User.__table__.insert(), users)
+    expires_at = datetime.utcnow() + timedelta(hours=24)
+    tokens = [f'token-{i:08d}-{os.urandom(8).hex()}' for i in range(count)]
+    db.session.execute(Session.__table__.insert(),
+                       [{'user_id': i + 1, 'token': token, 'expires_at': expires_at} for i, token in enumerate(tokens)])
+    db.session.commit()
+    return tokens
+
+def run(tokens, statements):
+    from backend.models import db
+    from backend.services.auth_service import AuthService
+
+    before = len(statements)
+    latencies = []
+    for token in tokens:
+        db.session.remove()
+        start = time.perf_counter()
+        user, error = AuthService.validate_session(token)
+        user.username  # handlers read the user, so load it as they would
+        latencies.append(time.perf_counter() - start)
+    return latencies, (len(statements) - before) / len(tokens)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sessions', type=int, default=20000)
+    parser.add_argument('--requests', type=int, default=20000)
+    parser.add_argument('--active', type=int, default=500, help='distinct tokens among the requests')
+    parser.add_argument('--revoked', type=int, default=10000, help='signed tokens revoked before the run')
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix='bench-sessions-')
+    Config.SQLALCHEMY_DATABASE_URI = 'sqlite:///' + os.path.join(directory, 'sessions.db')
+    Config.SESSION_REVOCATION_PATH = os.path.join(directory, 'revoked.log')
+
+    from backend.app import create_app
+    from backend.models import db
+    from backend.services.session_cache import get_session_cache
+    from backend.services.session_tokens import get_session_tokens
+
+    app = create_app()
+    with app.app_context():
+        tokens = populate(args.sessions)
+        statements = []
+        event.listen(db.engine, 'before_cursor_execute', lambda *a: statements.append(a[2]))
+
+        rng = random.Random(1)
+        active = rng.sample(tokens, min(args.active, len(tokens)))
+        requests = [rng.choice(active) for _ in range(args.requests)]
+
+        tokens = get_session_tokens()
+        expires_at = time.time() + 3600
+        for i in range(args.revoked):
+            tokens.revoke(tokens.issue(i + 1, expires_at))
+        signed = {token: tokens.issue(i + 1, expires_at) for i, token in enumerate(active)}
+        signed_requests = [signed[token] for token in requests]
+
+        print(f'{"mode":<14} {"queries/req":>12} {"mean us":>9} {"p50 us":>8} {"p99 us":>8} {"req/s":>8}')
+        for label, enabled, batch in (('opaque', False, requests), ('opaque+cache', True, requests),
+                                      ('signed', False, signed_requests)):
+            Config.SESSION_CACHE_ENABLED = enabled
+            latencies, queries = run(batch, statements)
+            mean = sum(latencies) / len(latencies)
+            print(f'{label:<14} {queries:>12.2f} {mean * 1e6:>9.1f} {percentile(latencies, 0.5) * 1e6:>8.1f} '
+                  f'{percentile(latencies, 0.99) * 1e6:>8.1f} {1 / mean:>8.0f}')
+
+        # The token check alone, without loading the user
+        Config.SESSION_CACHE_ENABLED = True
+        cache = get_session_cache()
+        for label, check, batch in (('cache lookup', cache.get, requests),
+                                    ('signed verify', tokens.verify, signed_requests)):
+            start = time.perf_counter()
+            for token in batch:
+                check(token)
+            elapsed = (time.perf_counter() - start) / len(batch)
+            print(f'{label}: {elapsed * 1e6:.1f} us, {1 / elapsed:.0f} checks/s')
+        print(f'revoked signed tokens held per worker: {tokens.revoked_count()}, '
+              f'log {os.path.getsize(Config.SESSION_REVOCATION_PATH) / 1024:.0f} KB')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""Gemini calls and latency for page visits with and without the cross-user verdict store.
+
+Simulates users visiting a catalogue of product pages whose popularity
+follows a Zipf distribution, each visit posting the page's suspicious
+elements to /api/analyze/dark-patterns. URLs carry per-visitor tracking
+parameters, as links shared by e-mail and social media do.
+
+Run from the repository root:
+
+    python -m backend.benchmarks.bench_shared_verdicts --visits 2000 --pages 300
+"""
+import argparse
+import random
+import time
+
+from backend.benchmarks.bench_transport import percentile
+from backend.benchmarks.mock_gemini import start_mock_server
+from backend.config import Config
+
+def make_visits(visits, pages, users, seed):
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) for rank in range(pages)]
+    visits_list = []
+    for page in rng.choices(range(pages), weights=weights, k=visits):
+        elements = [
+            {'text': f'Only {page % 9 + 1} left in stock', 'pattern': 'false_urgency', 'role': 'span',
+             'selector': f'#stock-{page}'},
+            {'text': f'Add protection plan for ${page % 50 + 5}', 'pattern': 'sneaky_opt_in', 'role': 'label',
+             'selector': '#plan'}
+        ]
+        url = f'https://shop.example/item/{page}?utm_source=user{rng.randrange(users)}'
+        visits_list.append({'elements': elements, 'context': {'url': url}})
+    return visits_list
+
+def run(client, visits, server):
+    before = server.request_count
+    latencies = []
+    for payload in visits:
+        start = time.perf_counter()
+        client.post('/api/analyze/dark-patterns', json=payload)
+        latencies.append(time.perf_counter() - start)
+    return server.request_count - before, latencies
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--visits', type=int, default=2000)
+    parser.add_argument('--pages', type=int, default=300)
+    parser.add_argument('--users', type=int, default=500)
+    parser.add_argument('--latency', type=float, default=0.05)
+    args = parser.parse_args()
+
+    server, Config.GEMINI_API_URL = start_mock_server(latency=args.latency)
+    Config.SHARED_VERDICT_FLUSH_SECONDS = 5
+
+    from backend.app import create_app
+
+    app = create_app('testing')
+    visits = make_visits(args.visits, args.pages, args.users, seed=1)
+    print(f'{"store":<8} {"gemini calls":>13} {"p50 ms":>8} {"p95 ms":>8}')
+
+    for enabled in (False, True):
+        Config.SHARED_VERDICT_ENABLED = enabled
+        with app.app_context():
+            calls, latencies = run(app.test_client(), visits, server)
+        print(f'{"on" if enabled else "off":<8} {calls:>13} {percentile(latencies, 0.5) * 1000:>8.1f} '
+              f'{percentile(latencies, 0.95) * 1000:>8.1f}')
+
+    from backend.services.verdict_store import get_shared_verdicts
+
+    with app.app_context():
+        stats = get_shared_verdicts().stats()
+    print(f'hit rate {stats["process"]["hit_rate"]:.1%}, today: {stats["daily"][-1]}')
+    server.shutdown()
+
+if __name__ == '__main__':
+    main()
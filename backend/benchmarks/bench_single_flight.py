@@ -0,0 +1,74 @@
+"""Upstream calls for a burst of identical analyze_text requests across worker processes.
+
+Forks --workers processes (standing in for gunicorn workers), each firing
+--threads concurrent analyze_text calls for the same text at the same
+moment, once with single-flight coalescing off and once on. The analysis
+cache is disabled so only coalescing can save calls.
+
+Run from the repository root:
+
+    python -m backend.benchmarks.bench_single_flight --workers 4 --threads 16
+"""
+import argparse
+import multiprocessing
+import tempfile
+import threading
+import time
+
+from backend.benchmarks.mock_gemini import start_mock_server
+from backend.config import Config
+from backend.services.ai_service import AIService
+
+TEXT = 'Only 2 left at this price - offer ends in 10 minutes!'
+
+def burst(threads, barrier, done):
+    workers = [threading.Thread(target=AIService.analyze_text, args=(TEXT,)) for _ in range(threads)]
+    barrier.wait()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    done.put(True)
+
+def run(workers, threads, server):
+    context = multiprocessing.get_context('fork')
+    barrier = context.Barrier(workers)
+    done = context.Queue()
+    before = server.request_count
+
+    start = time.perf_counter()
+    processes = [context.Process(target=burst, args=(threads, barrier, done)) for _ in range(workers)]
+    for process in processes:
+        process.start()
+    for _ in processes:
+        done.get()
+    seconds = time.perf_counter() - start
+    for process in processes:
+        process.join()
+
+    return server.request_count - before, seconds
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--latency', type=float, default=0.5)
+    args = parser.parse_args()
+
+    server, Config.GEMINI_API_URL = start_mock_server(latency=args.latency)
+    Config.ANALYSIS_CACHE_ENABLED = False
+    Config.AI_PREFILTER_ENABLED = False
+    Config.AI_CASCADE_ENABLED = False
+    Config.SINGLE_FLIGHT_DIR = tempfile.mkdtemp(prefix='single-flight-')
+
+    print(f'{args.workers} workers x {args.threads} threads = {args.workers * args.threads} identical requests')
+    print(f'{"single-flight":<14} {"upstream calls":>15} {"wall ms":>8}')
+    for enabled in (False, True):
+        Config.SINGLE_FLIGHT_ENABLED = enabled
+        calls, seconds = run(args.workers, args.threads, server)
+        print(f'{"on" if enabled else "off":<14} {calls:>15} {seconds * 1000:>8.0f}')
+
+    server.shutdown()
+
+if __name__ == '__main__':
+    main()
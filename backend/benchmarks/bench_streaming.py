@@ -0,0 +1,70 @@
+"""Time-to-first-verdict with streamGenerateContent versus waiting for the full body.
+
+Run from the repository root:
+
+    python -m backend.benchmarks.bench_streaming --requests 20 --output-latency 1.5
+"""
+import argparse
+import time
+
+from backend.benchmarks.mock_gemini import DEFAULT_VERDICT, start_mock_server
+from backend.config import Config
+from backend.services.ai_service import AIService
+
+# Roughly what the model writes once it has committed to a verdict
+VERDICT = dict(DEFAULT_VERDICT, **{
+    'description': ('The page claims only 3 items are left in stock and shows a countdown that '
+                    'restarts on reload, pressuring the user to buy before the timer ends. The '
+                    'scarcity claim is not tied to real inventory and the deadline is artificial.'),
+    'affected_elements': ['Only 3 left in stock', 'Offer ends in 09:59', 'Hurry! 27 people are viewing this',
+                          'Price goes up at midnight']
+})
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=20)
+    parser.add_argument('--latency', type=float, default=0.3, help='seconds before the first token')
+    parser.add_argument('--output-latency', type=float, default=1.5,
+                        help='seconds per 1000 generated characters')
+    args = parser.parse_args()
+
+    server, url = start_mock_server(latency=args.latency, output_latency=args.output_latency, verdict=VERDICT)
+    Config.GEMINI_API_URL = url
+    # Every request must reach the model for the timings to mean anything
+    Config.ANALYSIS_CACHE_ENABLED = False
+    Config.AI_PREFILTER_ENABLED = False
+
+    text = 'Only 3 left in stock! Offer ends in 09:59. Hurry!'
+
+    full = []
+    for _ in range(args.requests):
+        start = time.perf_counter()
+        AIService.analyze_text(text)
+        full.append(time.perf_counter() - start)
+
+    first_verdict = []
+    streamed = []
+    for _ in range(args.requests):
+        start = time.perf_counter()
+        marks = []
+        AIService.analyze_text(text, on_verdict=lambda verdict: marks.append(time.perf_counter() - start))
+        streamed.append(time.perf_counter() - start)
+        first_verdict.append(marks[0])
+
+    print(f'{"":<26} {"p50 ms":>8} {"p95 ms":>8}')
+    for label, values in [('full response (blocking)', full),
+                          ('time to first verdict', first_verdict),
+                          ('full response (streamed)', streamed)]:
+        print(f'{label:<26} {percentile(values, 0.5) * 1000:>8.0f} {percentile(values, 0.95) * 1000:>8.0f}')
+
+    saved = 1 - percentile(first_verdict, 0.5) / percentile(full, 0.5)
+    print(f'verdict available {saved:.0%} sooner at the median')
+
+    server.shutdown()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""Per-call latency with and without connection reuse against a local TLS mock.
+
+Run from the repository root:
+
+    python -m backend.benchmarks.bench_transport --calls 200
+"""
+import argparse
+import os
+import statistics
+import time
+
+import requests
+
+from backend.benchmarks.mock_gemini import start_mock_server
+from backend.config import Config
+from backend.services.gemini_transport import GeminiTransport
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+def report(label, samples):
+    print(f'{label:<28} p50 {percentile(samples, 0.5) * 1000:>7.2f} ms   '
+          f'p95 {percentile(samples, 0.95) * 1000:>7.2f} ms   '
+          f'mean {statistics.mean(samples) * 1000:>7.2f} ms')
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--calls', type=int, default=200)
+    parser.add_argument('--latency', type=float, default=0.0)
+    args = parser.parse_args()
+
+    server, url = start_mock_server(latency=args.latency, tls=True)
+    os.environ['REQUESTS_CA_BUNDLE'] = server.cert_path
+    Config.GEMINI_API_URL = url
+    parts = [{'text': 'Hurry! Only 3 left'}]
+    payload = {'contents': [{'parts': parts}]}
+
+    # Baseline: module-level requests.post, a new TCP + TLS handshake per call
+    fresh = []
+    for _ in range(args.calls):
+        start = time.perf_counter()
+        requests.post(url, json=payload, timeout=5).json()
+        fresh.append(time.perf_counter() - start)
+
+    transport = GeminiTransport()
+    pooled = []
+    transport.add_hook(lambda event: pooled.append(event['latency']))
+    for _ in range(args.calls):
+        transport.generate(parts, timeout=5, service='bench', max_retries=1)
+
+    report('requests.post (no reuse)', fresh)
+    report('GeminiTransport (pooled)', pooled)
+    print(f'\np50 drop: {(1 - percentile(pooled, 0.5) / percentile(fresh, 0.5)) * 100:.0f}%')
+
+    server.shutdown()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,165 @@
+"""Drive AIService or OCRService at a target request rate and report throughput, latency and retries.
+
+Arrivals are open-loop: request i is due at start + i / rps (or Poisson
+spaced with --poisson) whether or not earlier ones have finished, and its
+latency is measured from when it was due. Queueing behind a slow or
+failing upstream therefore shows up in the percentiles instead of quietly
+lowering the offered rate.
+
+By default the services talk to a mock started in-process with the given
+latency distribution and fault rates; --url points them at an already
+running mock (or the real API) instead.
+
+Run from the repository root:
+
+    python -m backend.benchmarks.load_test --target text --rps 50 --duration 20 \\
+        --latency lognormal:0.3,0.5 --rate-limit 0.05 --unavailable 0.02 --malformed 0.01
+"""
+import argparse
+import random
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from backend.benchmarks.bench_local_classifier import make_corpus
+from backend.benchmarks.bench_transport import percentile
+from backend.benchmarks.mock_gemini import fixed, parse_latency, start_mock_server
+from backend.config import Config
+from backend.services.usage_service import estimated_cost
+
+def make_workload(target, count, seed):
+    """A list of zero-argument calls; the same seed gives the same requests, so replays hit"""
+    if target == 'text':
+        from backend.services.ai_service import AIService
+
+        texts, _ = make_corpus(count, seed)
+        return [lambda text=text: AIService.analyze_text(text) for text in texts]
+
+    from backend.benchmarks.bench_ocr_preprocess import make_screenshot
+
+    images = [make_screenshot((1280, 800), seed + i) for i in range(min(count, 8))]
+    if target == 'ocr':
+        from backend.services.ocr_service import OCRService
+
+        return [lambda image=image: OCRService.extract_text(image) for image in images]
+
+    from backend.services.ai_service import AIService
+
+    return [lambda image=image: AIService.analyze_screenshot(image) for image in images]
+
+def run(workload, rps, duration, concurrency, poisson, seed):
+    """Issue requests at rps for duration seconds; return (samples, wall seconds)"""
+    rng = random.Random(seed)
+    samples = []
+    lock = threading.Lock()
+
+    def call(job, due):
+        started = time.perf_counter()
+        try:
+            result = job()
+        except Exception as e:
+            result = {'success': False, 'error': f'{type(e).__name__}: {e}'}
+        finished = time.perf_counter()
+        with lock:
+            samples.append({
+                'latency': finished - due,
+                'service_time': finished - started,
+                'success': bool(result.get('success')),
+                'error': result.get('error')
+            })
+
+    total = int(rps * duration)
+    start = time.perf_counter()
+    due = start
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for i in range(total):
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            executor.submit(call, workload[i % len(workload)], due)
+            due += rng.expovariate(rps) if poisson else 1 / rps
+
+    return samples, time.perf_counter() - start
+
+def report(samples, seconds, rps, duration, events, server):
+    succeeded = [s for s in samples if s['success']]
+    print(f'offered   {rps:.1f} rps for {duration:.0f} s: {len(samples)} requests')
+    print(f'completed {len(samples)} in {seconds:.1f} s: {len(samples) / seconds:.1f} rps, '
+          f'{len(succeeded) / len(samples):.1%} success ({len(succeeded) / seconds:.1f} rps goodput)')
+
+    for label, group in (('all', samples), ('success', succeeded)):
+        if group:
+            latencies = [s['latency'] * 1000 for s in group]
+            print(f'latency ms {label:<8} p50 {percentile(latencies, 0.5):>8.1f}  '
+                  f'p95 {percentile(latencies, 0.95):>8.1f}  p99 {percentile(latencies, 0.99):>8.1f}  '
+                  f'max {max(latencies):>8.1f}')
+
+    retries = sum(event['retries'] for event in events)
+    fast_fails = sum(1 for event in events if event['attempts'] == 0)
+    print(f'gemini calls {len(events)}: {retries} retries ({retries / max(len(events), 1):.2f} per call), '
+          f'{fast_fails} failed fast on an open breaker')
+    prompt_tokens = sum(event['prompt_tokens'] for event in events)
+    output_tokens = sum(event['output_tokens'] for event in events)
+    print(f'tokens {prompt_tokens} in / {output_tokens} out, '
+          f'estimated ${estimated_cost(prompt_tokens, output_tokens):.4f}')
+    if server is not None:
+        print(f'mock served {server.request_count} requests: {dict(sorted(server.status_counts.items()))}, '
+              f'{server.malformed_count} malformed')
+
+    errors = Counter(s['error'] for s in samples if not s['success'])
+    for error, count in errors.most_common(5):
+        print(f'  {count:>6} x {error[:100]}')
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--target', choices=('text', 'ocr', 'screenshot'), default='text')
+    parser.add_argument('--rps', type=float, default=20)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--concurrency', type=int, default=64, help='worker threads issuing requests')
+    parser.add_argument('--poisson', action='store_true', help='exponential inter-arrival times')
+    parser.add_argument('--url', help='use this generateContent URL instead of an in-process mock')
+    parser.add_argument('--latency', type=parse_latency, default=fixed(0.2),
+                        help="seconds or e.g. 'lognormal:0.3,0.5'")
+    parser.add_argument('--rate-limit', type=float, default=0.0, help='fraction of requests answered 429')
+    parser.add_argument('--unavailable', type=float, default=0.0, help='fraction of requests answered 503')
+    parser.add_argument('--malformed', type=float, default=0.0, help='fraction of malformed 200 responses')
+    parser.add_argument('--malformed-kind', choices=('text', 'body'), default='text')
+    parser.add_argument('--replay', help='JSONL recording for the mock to answer from')
+    parser.add_argument('--backoff-base', type=float, default=Config.GEMINI_BACKOFF_BASE)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    server = None
+    if args.url:
+        Config.GEMINI_API_URL = args.url
+    else:
+        server, Config.GEMINI_API_URL = start_mock_server(
+            latency=args.latency, rate_limit_rate=args.rate_limit, unavailable_rate=args.unavailable,
+            malformed_rate=args.malformed, malformed_kind=args.malformed_kind,
+            replay=args.replay, seed=args.seed
+        )
+
+    # Every request should reach the transport; the local shortcuts are measured elsewhere
+    Config.ANALYSIS_CACHE_ENABLED = False
+    Config.OCR_CACHE_ENABLED = False
+    Config.AI_PREFILTER_ENABLED = False
+    Config.AI_CASCADE_ENABLED = False
+    Config.LOCAL_MODEL_FALLBACK_ENABLED = False
+    Config.GEMINI_BACKOFF_BASE = args.backoff_base
+    Config.GEMINI_POOL_SIZE = max(Config.GEMINI_POOL_SIZE, args.concurrency)
+
+    from backend.services.gemini_transport import get_transport
+
+    events = []
+    get_transport().add_hook(events.append)
+
+    workload = make_workload(args.target, max(int(args.rps * args.duration), 1), args.seed)
+    samples, seconds = run(workload, args.rps, args.duration, args.concurrency, args.poisson, args.seed)
+    report(samples, seconds, args.rps, args.duration, events, server)
+
+    if server is not None:
+        server.shutdown()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,394 @@
+"""Local stand-in for the Gemini generateContent and streamGenerateContent endpoints.
+
+Used by the benchmark scripts and load_test so that throughput can be
+measured without touching the real API or its quota. Besides canned
+verdicts it can draw latency from a distribution, inject 429/503 and
+malformed responses at given rates, record real responses while proxying
+to the API, and replay such a recording.
+
+Run standalone, e.g. to record real traffic:
+
+    python -m backend.benchmarks.mock_gemini --port 8099 --record captured.jsonl \
+        --upstream "https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash-exp:generateContent?key=$GEMINI_API_KEY"
+
+then point GEMINI_API_URL at http://127.0.0.1:8099/v1beta/models/mock:generateContent.
+"""
+import argparse
+import datetime
+import hashlib
+import ipaddress
+import json
+import math
+import os
+import random
+import re
+import ssl
+import tempfile
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_VERDICT = {
+    'detected': True,
+    'pattern_type': 'urgency_manipulation',
+    'confidence_score': 0.85,
+    'description': 'Limited stock claim used to pressure the user',
+    'affected_elements': ['Only 3 left in stock']
+}
+
+SCREEN_TEXT = 'Only 3 left in stock! Offer ends in 09:59. Add to cart. Free shipping over $50.'
+
+def fixed(seconds):
+    return lambda rng: seconds
+
+def uniform(low, high):
+    return lambda rng: rng.uniform(low, high)
+
+def exponential(mean):
+    return lambda rng: rng.expovariate(1 / mean) if mean else 0.0
+
+def lognormal(median, sigma):
+    """Right-skewed latency with the given median; sigma 0.5 gives p99 ~ 3.2x median"""
+    return lambda rng: rng.lognormvariate(math.log(median), sigma)
+
+LATENCY_DISTRIBUTIONS = {'fixed': fixed, 'uniform': uniform, 'exponential': exponential, 'lognormal': lognormal}
+
+def parse_latency(spec):
+    """Parse '0.2', 'fixed:0.2', 'uniform:0.1,0.4', 'exponential:0.2' or 'lognormal:0.2,0.5'"""
+    name, _, args = spec.partition(':')
+    if not args:
+        return fixed(float(name))
+    if name not in LATENCY_DISTRIBUTIONS:
+        raise ValueError(f'Unknown latency distribution: {name}')
+    return LATENCY_DISTRIBUTIONS[name](*(float(arg) for arg in args.split(',')))
+
+def request_key(payload):
+    """Recording key: a hash of the request contents, ignoring the API key and URL"""
+    canonical = json.dumps(payload.get('contents', []), sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+def load_recording(path):
+    """Map request_key -> recorded response body; later lines win"""
+    recorded = {}
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                entry = json.loads(line)
+                recorded[entry['key']] = entry['response']
+    return recorded
+
+def candidate_text(body):
+    try:
+        return ''.join(part.get('text', '') for part in body['candidates'][0]['content']['parts'])
+    except (KeyError, IndexError, TypeError):
+        return ''
+
+def make_response(text, prompt_chars=None):
+    """A generateContent body; with prompt_chars, usageMetadata estimates tokens at 4 chars each"""
+    response = {
+        'candidates': [{
+            'content': {
+                'parts': [{'text': text}]
+            }
+        }]
+    }
+    if prompt_chars is not None:
+        prompt_tokens, output_tokens = (prompt_chars + 3) // 4, (len(text) + 3) // 4
+        response['usageMetadata'] = {
+            'promptTokenCount': prompt_tokens,
+            'candidatesTokenCount': output_tokens,
+            'totalTokenCount': prompt_tokens + output_tokens
+        }
+    return response
+
+def default_responder(prompt, verdict):
+    """Answer multi-element prompts per index, screenshot prompts with the verdict
+    plus extracted_text, and everything else with the verdict"""
+    indices = [int(i) for i in re.findall(r'^\[(\d+)\]', prompt, re.MULTILINE)]
+    if indices:
+        return json.dumps({'results': [{
+            'index': index,
+            'dark_pattern_detected': verdict['detected'],
+            'pattern_type': verdict['pattern_type'],
+            'confidence_score': verdict['confidence_score'],
+            'severity': 'medium',
+            'explanation': verdict['description']
+        } for index in indices]})
+    if '"extracted_text"' in prompt:
+        return json.dumps(dict(verdict, extracted_text=SCREEN_TEXT))
+    return json.dumps(verdict)
+
+class MockGeminiHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        raw = self.rfile.read(length)
+        payload = json.loads(raw or b'{}')
+        prompt = ''.join(
+            part.get('text', '')
+            for content in payload.get('contents', [])
+            for part in content.get('parts', [])
+        )
+        streaming = ':streamGenerateContent' in self.path
+
+        server = self.server
+        with server.lock:
+            server.request_count += 1
+            roll = server.rng.random()
+            delay = server.latency(server.rng) if callable(server.latency) else server.latency
+
+        # Rejections come back at once, like a real front end shedding load
+        for status, rate in ((429, server.rate_limit_rate), (503, server.unavailable_rate)):
+            if roll < rate:
+                self._send_error(status)
+                return
+            roll -= rate
+        malformed = roll < server.malformed_rate
+        if malformed:
+            with server.lock:
+                server.malformed_count += 1
+
+        body = None
+        if server.upstream:
+            body = self._proxy(raw, payload)
+            if body is None:
+                return
+            delay = 0.0
+        elif server.replay is not None:
+            body = server.replay.get(request_key(payload))
+            if body is None:
+                with server.lock:
+                    server.replay_misses += 1
+
+        text = candidate_text(body) if body is not None else default_responder(prompt, server.verdict)
+        if malformed and server.malformed_kind == 'text':
+            # What a model cut off mid-answer looks like
+            text = text[:len(text) // 2]
+            body = None
+
+        self._count(200)
+        if streaming:
+            self._stream(raw, text, delay, broken=malformed and server.malformed_kind == 'body', prompt_chars=len(prompt))
+            return
+
+        # Latency grows with upload size (seconds per MB) and generated output
+        delay += (server.input_latency * len(raw) / 1_000_000
+                  + server.output_latency * len(text) / 1000)
+        if delay:
+            time.sleep(delay)
+
+        data = json.dumps(body if body is not None else make_response(text, len(prompt))).encode()
+        if malformed and server.malformed_kind == 'body':
+            data = data[:len(data) // 2]
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _count(self, status):
+        with self.server.lock:
+            self.server.status_counts[status] += 1
+
+    def _send_error(self, status):
+        self._count(status)
+        data = json.dumps({'error': {'code': status, 'status': 'RESOURCE_EXHAUSTED' if status == 429 else 'UNAVAILABLE'}}).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        if self.server.retry_after is not None:
+            self.send_header('Retry-After', str(self.server.retry_after))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _proxy(self, raw, payload):
+        """Forward to the real API, recording successful answers; None if the error was relayed"""
+        import requests
+
+        try:
+            response = requests.post(self.server.upstream, data=raw,
+                                     headers={'Content-Type': 'application/json'}, timeout=60)
+        except requests.RequestException:
+            self._send_error(503)
+            return None
+
+        if response.status_code != 200:
+            self._count(response.status_code)
+            self.send_response(response.status_code)
+            self.send_header('Content-Type', response.headers.get('Content-Type', 'application/json'))
+            self.send_header('Content-Length', str(len(response.content)))
+            self.end_headers()
+            self.wfile.write(response.content)
+            return None
+
+        body = response.json()
+        if self.server.record:
+            entry = {'key': request_key(payload), 'recorded_at': time.time(), 'response': body}
+            with self.server.lock, open(self.server.record, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry) + '\n')
+        return body
+
+    def _stream(self, raw, text, delay, broken=False, prompt_chars=0):
+        """Send text as server-sent events, paced by output_latency per character"""
+        delay += self.server.input_latency * len(raw) / 1_000_000
+        if delay:
+            time.sleep(delay)
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+
+        size = self.server.stream_chunk_chars
+        for offset in range(0, len(text), size):
+            fragment = text[offset:offset + size]
+            if self.server.output_latency:
+                time.sleep(self.server.output_latency * len(fragment) / 1000)
+            # The final chunk carries usageMetadata for the whole response, as Gemini's does
+            event = make_response(fragment)
+            if offset + size >= len(text):
+                event['usageMetadata'] = make_response(text, prompt_chars)['usageMetadata']
+            event = json.dumps(event)
+            if broken:
+                event = event[:len(event) // 2]
+            event = f'data: {event}\r\n\r\n'.encode()
+            self.wfile.write(f'{len(event):x}\r\n'.encode() + event + b'\r\n')
+            self.wfile.flush()
+        self.wfile.write(b'0\r\n\r\n')
+
+    def log_message(self, format, *args):
+        pass
+
+def make_self_signed_cert(host='127.0.0.1'):
+    """Write a throwaway certificate/key pair for host and return their paths"""
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.x509.oid import NameOID
+
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, host)])
+    now = datetime.datetime.utcnow()
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(minutes=5))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .add_extension(x509.SubjectAlternativeName([x509.IPAddress(ipaddress.ip_address(host))]), critical=False)
+        .sign(key, hashes.SHA256())
+    )
+
+    directory = tempfile.mkdtemp(prefix='mock-gemini-')
+    cert_path = os.path.join(directory, 'cert.pem')
+    key_path = os.path.join(directory, 'key.pem')
+    with open(cert_path, 'wb') as f:
+        f.write(cert.public_bytes(serialization.Encoding.PEM))
+    with open(key_path, 'wb') as f:
+        f.write(key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption()
+        ))
+    return cert_path, key_path
+
+def start_mock_server(latency=0.05, verdict=None, output_latency=0.0, input_latency=0.0,
+                      tls=False, host='127.0.0.1', port=0, stream_chunk_chars=24,
+                      rate_limit_rate=0.0, unavailable_rate=0.0, malformed_rate=0.0,
+                      malformed_kind='text', retry_after=None, replay=None, record=None,
+                      upstream=None, seed=None):
+    """Start the mock server in a background thread and return (server, url).
+
+    latency is seconds or a callable taking a random.Random, such as
+    lognormal(0.3, 0.5). rate_limit_rate and unavailable_rate are the
+    fractions of requests answered 429 and 503; malformed_rate is the
+    fraction answered 200 with candidate text cut in half (malformed_kind
+    'text') or a truncated HTTP body ('body').
+
+    With replay, requests whose contents match a line of that recording get
+    the recorded response; others fall back to the canned verdict and are
+    counted in server.replay_misses. With upstream (a full URL including
+    the key), requests are proxied to the real API and, with record, its
+    successful responses are appended to that JSONL file.
+
+    server.request_count, server.status_counts and server.malformed_count
+    count what was served.
+    With tls=True the server speaks HTTPS using a self-signed certificate
+    whose path is available as server.cert_path.
+    """
+    server = ThreadingHTTPServer((host, port), MockGeminiHandler)
+    server.cert_path = None
+    if tls:
+        cert_path, key_path = make_self_signed_cert(host)
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(cert_path, key_path)
+        server.socket = context.wrap_socket(server.socket, server_side=True)
+        server.cert_path = cert_path
+    server.daemon_threads = True
+    server.latency = latency
+    server.output_latency = output_latency
+    server.input_latency = input_latency
+    server.verdict = verdict or DEFAULT_VERDICT
+    server.stream_chunk_chars = stream_chunk_chars
+    server.rate_limit_rate = rate_limit_rate
+    server.unavailable_rate = unavailable_rate
+    server.malformed_rate = malformed_rate
+    server.malformed_kind = malformed_kind
+    server.retry_after = retry_after
+    server.replay = load_recording(replay) if replay else None
+    server.record = record
+    server.upstream = upstream
+    server.rng = random.Random(seed)
+    server.lock = threading.Lock()
+    server.request_count = 0
+    server.replay_misses = 0
+    server.malformed_count = 0
+    server.status_counts = Counter()
+
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    scheme = 'https' if tls else 'http'
+    url = f'{scheme}://{host}:{server.server_address[1]}/v1beta/models/mock:generateContent'
+    return server, url
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the mock Gemini server in the foreground')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8099)
+    parser.add_argument('--latency', type=parse_latency, default=fixed(0.05),
+                        help="seconds or e.g. 'lognormal:0.3,0.5'")
+    parser.add_argument('--rate-limit', type=float, default=0.0, help='fraction of requests answered 429')
+    parser.add_argument('--unavailable', type=float, default=0.0, help='fraction of requests answered 503')
+    parser.add_argument('--malformed', type=float, default=0.0, help='fraction of malformed 200 responses')
+    parser.add_argument('--malformed-kind', choices=('text', 'body'), default='text')
+    parser.add_argument('--replay', help='JSONL recording to answer from')
+    parser.add_argument('--record', help='append upstream responses to this JSONL file')
+    parser.add_argument('--upstream', help='real generateContent URL, including ?key=, to proxy to')
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args()
+
+    if args.record and not args.upstream:
+        parser.error('--record needs --upstream')
+
+    server, url = start_mock_server(
+        latency=args.latency, host=args.host, port=args.port,
+        rate_limit_rate=args.rate_limit, unavailable_rate=args.unavailable,
+        malformed_rate=args.malformed, malformed_kind=args.malformed_kind,
+        replay=args.replay, record=args.record, upstream=args.upstream, seed=args.seed
+    )
+    print(f'mock Gemini listening on {url}')
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == '__main__':
+    main()
@@ -2,4 +2,4 @@ from flask import Blueprint
 
 api_bp = Blueprint('api', __name__, url_prefix='/api')
 
-from . import auth, detection, settings, analytics, user
+from . import auth, detection, settings, analytics, user, analysis, jobs, admin
@@ -0,0 +1,30 @@
+from flask import request, jsonify
+from backend.blueprints.api import api_bp
+from backend.utils.auth import require_auth
+from backend.config import Config
+from backend.services.usage_service import daily_rollup, get_usage_meter
+
+def require_admin(f):
+    """Decorator to restrict an endpoint to users listed in ADMIN_USERNAMES"""
+    @require_auth
+    def decorated_function(user, *args, **kwargs):
+        if user.username not in Config.ADMIN_USERNAMES:
+            return jsonify({'error': 'Admin access required'}), 403
+        return f(user, *args, **kwargs)
+    
+    decorated_function.__name__ = f.__name__
+    return decorated_function
+
+@api_bp.route('/admin/usage', methods=['GET'])
+@require_admin
+def get_gemini_usage(user):
+    """Get Gemini calls, tokens, cost and latency per service and user, plus the daily rollup"""
+    days = min(max(request.args.get('days', 14, type=int), 1), 90)
+    
+    meter = get_usage_meter()
+    meter.flush()
+    
+    return jsonify({
+        'process': meter.snapshot(),
+        'daily': daily_rollup(days)
+    }), 200
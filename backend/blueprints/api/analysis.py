@@ -0,0 +1,180 @@
+from flask import request, jsonify, Response
+from backend.blueprints.api import api_bp
+from backend.utils.auth import require_auth
+from backend.config import Config
+from backend.services.ai_service import AIService
+from backend.services.cascade_service import CascadeService
+from backend.services.ocr_service import OCRService
+from backend.services.verdict_store import element_fingerprint, get_shared_verdicts
+from backend.utils.image_preprocessing import decode_image_data
+from backend.utils.rate_limit import limiter
+import contextvars
+import json
+import queue
+import threading
+
+@api_bp.route('/analyze/dark-patterns', methods=['POST'])
+@limiter.limit(lambda: Config.RATE_LIMIT_DETECTION)
+def analyze_dark_patterns():
+    """Classify the suspicious elements found by the extension's quick scan"""
+    data = request.get_json(silent=True) or {}
+    
+    elements = data.get('elements', [])
+    if not isinstance(elements, list) or not all(isinstance(e, dict) for e in elements):
+        return jsonify({'error': 'elements must be an array of objects'}), 400
+    
+    context = data.get('context') if isinstance(data.get('context'), dict) else {}
+    flow_data = data.get('flow_data') if isinstance(data.get('flow_data'), list) else []
+    if not isinstance(context.get('url') or '', str):
+        return jsonify({'error': 'context.url must be a string'}), 400
+    
+    # Another user may already have had the same content on the same page analyzed
+    store = get_shared_verdicts() if context.get('url') else None
+    fingerprint = element_fingerprint(elements, context, flow_data) if store else None
+    shared = store.get(context['url'], fingerprint) if store else None
+    
+    if shared is not None and len(shared) == len(elements):
+        results = [dict(verdict, selector=element.get('selector')) for verdict, element in zip(shared, elements)]
+    else:
+        shared = None
+        # All elements go out in a single multi-item prompt rather than one call each
+        analysis = AIService.analyze_elements(
+            elements,
+            context=context,
+            flow_data=flow_data,
+            api_key=data.get('api_key') or None
+        )
+        
+        if not analysis['success']:
+            return jsonify({'success': False, 'error': analysis['error']}), 502
+        
+        results = analysis['results']
+        if store and not analysis['failed_chunks']:
+            verdicts = [{k: v for k, v in result.items() if k != 'selector'} for result in results]
+            store.put(context['url'], fingerprint, verdicts, gemini_calls=analysis['gemini_calls'])
+    
+    pattern_types = {}
+    for result in results:
+        if result['dark_pattern_detected']:
+            pattern_types[result['pattern_type']] = pattern_types.get(result['pattern_type'], 0) + 1
+    
+    return jsonify({
+        'success': True,
+        'results': results,
+        'site_score': AIService.site_score(results),
+        'aggregated': {
+            'total_elements': len(results),
+            'total_patterns_found': sum(pattern_types.values()),
+            'pattern_types': pattern_types
+        },
+        'url': context.get('url'),
+        'shared_verdict': shared is not None
+    }), 200
+
+@api_bp.route('/analyze/sentiment', methods=['POST'])
+def analyze_sentiment():
+    """Score a batch of content samples for negativity in one request"""
+    data = request.get_json(silent=True) or {}
+    
+    samples = data.get('samples')
+    if not isinstance(samples, list) or not all(isinstance(s, str) for s in samples):
+        return jsonify({'error': 'samples must be an array of strings'}), 400
+    
+    if len(samples) > Config.SENTIMENT_MAX_SAMPLES:
+        return jsonify({'error': f'At most {Config.SENTIMENT_MAX_SAMPLES} samples per request'}), 413
+    
+    # Imported here so numpy and the lexicon build stay off the worker boot path
+    from backend.services.sentiment_service import SentimentService
+    
+    return jsonify(SentimentService.score([s[:Config.SENTIMENT_SAMPLE_CHARS] for s in samples])), 200
+
+@api_bp.route('/analyze/text', methods=['POST'])
+@require_auth
+def analyze_page_text(user):
+    """Analyze page text; with ?stream=1 the verdict is sent as soon as the model produces it"""
+    data = request.get_json(silent=True) or {}
+    
+    text = data.get('text')
+    if not text or not isinstance(text, str):
+        return jsonify({'error': 'text is required'}), 400
+    
+    if not request.args.get('stream', 0, type=int):
+        result = AIService.analyze_text(text)
+        if not result['success']:
+            return jsonify(result), 502
+        return jsonify(result), 200
+    
+    events = queue.Queue()
+    
+    def run():
+        try:
+            result = AIService.analyze_text(text, on_verdict=lambda verdict: events.put(('verdict', verdict)))
+        except Exception as e:
+            result = {'success': False, 'error': str(e)}
+        events.put(('result', result))
+    
+    threading.Thread(target=contextvars.copy_context().run, args=(run,), daemon=True).start()
+    
+    def stream():
+        while True:
+            event, payload = events.get()
+            yield f'event: {event}\ndata: {json.dumps(payload)}\n\n'
+            if event == 'result':
+                break
+    
+    return Response(stream(), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
+
+@api_bp.route('/analyze/screenshot', methods=['POST'])
+@require_auth
+def analyze_screenshot(user):
+    """Extract and analyze a screenshot; mode picks fused (one call) or two_stage"""
+    data = request.get_json(silent=True) or {}
+    
+    image = data.get('image')
+    if not image or not isinstance(image, str):
+        return jsonify({'error': 'image is required'}), 400
+    
+    try:
+        image = decode_image_data(image)
+    except ValueError:
+        return jsonify({'error': 'image must be base64 or a data: URL'}), 400
+    
+    mode = data.get('mode')
+    if mode is not None and mode not in AIService.SCREENSHOT_MODES:
+        return jsonify({'error': f'mode must be one of: {", ".join(AIService.SCREENSHOT_MODES)}'}), 400
+    
+    result = AIService.analyze_screenshot(image, mode=mode)
+    if not result['success']:
+        return jsonify(result), 502
+    
+    return jsonify(result), 200
+
+@api_bp.route('/analysis/cache/stats', methods=['GET'])
+@require_auth
+def get_analysis_cache_stats(user):
+    """Get hit/miss counters for the analysis and OCR result caches"""
+    stats = AIService.cache_stats()
+    ocr_stats = OCRService.cache_stats()
+    
+    if stats is None:
+        return jsonify({'enabled': False, 'ocr': ocr_stats}), 200
+    
+    return jsonify({'enabled': True, 'stats': stats, 'ocr': ocr_stats}), 200
+
+@api_bp.route('/analysis/cascade/stats', methods=['GET'])
+@require_auth
+def get_cascade_stats(user):
+    """Get per-tier counts, latencies and calibration for the local/Gemini cascade"""
+    stats = CascadeService.stats().snapshot()
+    stats['enabled'] = Config.AI_CASCADE_ENABLED
+    return jsonify(stats), 200
+
+@api_bp.route('/analysis/shared/stats', methods=['GET'])
+@require_auth
+def get_shared_verdict_stats(user):
+    """Get hit rate and Gemini calls saved per day by the cross-user verdict store"""
+    store = get_shared_verdicts()
+    if store is None:
+        return jsonify({'enabled': False}), 200
+    
+    return jsonify({'enabled': True, 'stats': store.stats()}), 200
@@ -1,29 +1,10 @@
 from flask import request, jsonify
 from backend.blueprints.api import api_bp
-from backend.services.auth_service import AuthService
+from backend.utils.auth import require_auth
 from backend.models import db, DetectionLog, DoomscrollLog
 from datetime import datetime
 import json
 
-def require_auth(f):
-    """Decorator to require authentication"""
-    def decorated_function(*args, **kwargs):
-        token = request.headers.get('Authorization', '').replace('Bearer ', '')
-        
-        if not token:
-            return jsonify({'error': 'Authentication required'}), 401
-        
-        user, error = AuthService.validate_session(token)
-        
-        if error:
-            return jsonify({'error': error}), 401
-        
-        # Pass user to the wrapped function
-        return f(user, *args, **kwargs)
-    
-    decorated_function.__name__ = f.__name__
-    return decorated_function
-
 @api_bp.route('/detection/log', methods=['POST'])
 @require_auth
 def log_detection(user):
@@ -0,0 +1,78 @@
+from flask import request, jsonify, url_for
+from backend.blueprints.api import api_bp
+from backend.utils.auth import require_auth
+from backend.services.ai_service import AIService
+from backend.services.job_queue import JobQueue, get_job_queue, submit_job
+from backend.config import Config
+import time
+
+JOB_TYPES = {
+    'text': ('analyze_text', 'text'),
+    'screenshot': ('analyze_screenshot', 'image'),
+    'ocr': ('ocr', 'image'),
+    'frame': ('ocr_frame', 'image')
+}
+
+@api_bp.route('/jobs', methods=['POST'])
+@require_auth
+def create_job(user):
+    """Queue a text or screenshot for background analysis"""
+    data = request.get_json(silent=True) or {}
+    
+    job_type = data.get('type')
+    if job_type not in JOB_TYPES:
+        return jsonify({'error': f'type must be one of: {", ".join(JOB_TYPES)}'}), 400
+    
+    kind, field = JOB_TYPES[job_type]
+    value = data.get(field)
+    if not value or not isinstance(value, str):
+        return jsonify({'error': f'{field} is required for {job_type} jobs'}), 400
+    
+    payload = {field: value}
+    if job_type == 'screenshot' and data.get('mode') is not None:
+        if data['mode'] not in AIService.SCREENSHOT_MODES:
+            return jsonify({'error': f'mode must be one of: {", ".join(AIService.SCREENSHOT_MODES)}'}), 400
+        payload['mode'] = data['mode']
+    
+    if job_type == 'frame':
+        tab_id = data.get('tab_id')
+        if tab_id is None or not isinstance(tab_id, (str, int)):
+            return jsonify({'error': 'tab_id is required for frame jobs'}), 400
+        # Tab ids are only unique per browser, so scope frame history by user
+        payload['tab'] = f'{user.id}:{tab_id}'
+    
+    job_id = submit_job(kind, payload, user_id=user.id)
+    
+    return jsonify({
+        'job_id': job_id,
+        'status': JobQueue.QUEUED,
+        'status_url': url_for('api.get_job', job_id=job_id)
+    }), 202
+
+@api_bp.route('/jobs/<job_id>', methods=['GET'])
+@require_auth
+def get_job(user, job_id):
+    """Poll a job; ?wait=N holds the request up to N seconds (at most JOB_MAX_WAIT) for completion"""
+    queue = get_job_queue()
+    wait = min(max(request.args.get('wait', 0, type=float), 0), Config.JOB_MAX_WAIT)
+    deadline = time.monotonic() + wait
+    
+    while True:
+        job = queue.get(job_id)
+        
+        if not job or job['user_id'] != user.id:
+            return jsonify({'error': 'Job not found'}), 404
+        
+        if job['status'] in (JobQueue.DONE, JobQueue.FAILED) or time.monotonic() >= deadline:
+            break
+        
+        time.sleep(0.1)
+    
+    return jsonify({
+        'job_id': job['id'],
+        'type': job['kind'],
+        'status': job['status'],
+        'result': job['result'],
+        'error': job['error'],
+        'attempts': job['attempts']
+    }), 200
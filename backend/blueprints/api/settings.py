@@ -1,33 +1,14 @@
 from flask import request, jsonify
 from backend.blueprints.api import api_bp
-from backend.services.auth_service import AuthService
+from backend.utils.auth import require_auth
 from backend.models import db, Settings
 from datetime import datetime
 
-def require_auth(f):
-    """Decorator to require authentication"""
-    def decorated_function(*args, **kwargs):
-        token = request.headers.get('Authorization', '').replace('Bearer ', '')
-        
-        if not token:
-            return jsonify({'error': 'Authentication required'}), 401
-        
-        user, error = AuthService.validate_session(token)
-        
-        if error:
-            return jsonify({'error': error}), 401
-        
-        # Pass user to the wrapped function
-        return f(user, *args, **kwargs)
-    
-    decorated_function.__name__ = f.__name__
-    return decorated_function
-
 @api_bp.route('/settings', methods=['GET'])
 @require_auth
 def get_settings(user):
     """Get user settings"""
-    settings = Settings.query.filter_by(user_id=user.id).first()
+    settings = user.settings
     
     # Create default settings if none exist
     if not settings:
@@ -38,7 +19,7 @@ def get_settings(user):
             enabled_websites='[]',
             intervention_style='moderate'
         )
-        db.session.add(settings)
+        user.settings = settings
         db.session.commit()
     
     return jsonify({
@@ -58,12 +39,12 @@ def update_settings(user):
     """Update user settings"""
     data = request.get_json()
     
-    settings = Settings.query.filter_by(user_id=user.id).first()
+    settings = user.settings
     
     # Create settings if none exist
     if not settings:
         settings = Settings(user_id=user.id)
-        db.session.add(settings)
+        user.settings = settings
     
     # Update fields if provided
     if 'dark_pattern_sensitivity' in data:
@@ -96,9 +77,9 @@ def update_settings(user):
     # Increment settings version for sync
     user.settings_version += 1
     
-    db.session.commit()
-    
-    return jsonify({
+    # Serialize before committing, which would expire both rows and reload them
+    db.session.flush()
+    response = jsonify({
         'message': 'Settings updated successfully',
         'settings': {
             'dark_pattern_sensitivity': settings.dark_pattern_sensitivity,
@@ -108,7 +89,10 @@ def update_settings(user):
             'updated_at': settings.updated_at.isoformat()
         },
         'settings_version': user.settings_version
-    }), 200
+    })
+    db.session.commit()
+    
+    return response, 200
 
 @api_bp.route('/settings/sync', methods=['GET'])
 @require_auth
@@ -132,7 +116,7 @@ def get_user_settings_alias(user):
     if request.method == 'OPTIONS':
         return '', 204
     
-    settings = Settings.query.filter_by(user_id=user.id).first()
+    settings = user.settings
     
     # Create default settings if none exist
     if not settings:
@@ -143,7 +127,7 @@ def get_user_settings_alias(user):
             enabled_websites='[]',
             intervention_style='moderate'
         )
-        db.session.add(settings)
+        user.settings = settings
         db.session.commit()
     
     return jsonify({
@@ -166,12 +150,12 @@ def update_user_settings_alias(user):
     
     data = request.get_json()
     
-    settings = Settings.query.filter_by(user_id=user.id).first()
+    settings = user.settings
     
     # Create settings if none exist
     if not settings:
         settings = Settings(user_id=user.id)
-        db.session.add(settings)
+        user.settings = settings
     
     # Update fields if provided
     if 'dark_pattern_sensitivity' in data:
@@ -204,9 +188,9 @@ def update_user_settings_alias(user):
     # Increment settings version for sync
     user.settings_version += 1
     
-    db.session.commit()
-    
-    return jsonify({
+    # Serialize before committing, which would expire both rows and reload them
+    db.session.flush()
+    response = jsonify({
         'message': 'Settings updated successfully',
         'settings': {
             'dark_pattern_sensitivity': settings.dark_pattern_sensitivity,
@@ -216,4 +200,7 @@ def update_user_settings_alias(user):
             'updated_at': settings.updated_at.isoformat()
         },
         'settings_version': user.settings_version
-    }), 200
+    })
+    db.session.commit()
+    
+    return response, 200
@@ -1,27 +1,7 @@
 from flask import render_template, redirect, url_for, session, request, jsonify
 from backend.blueprints.frontend import frontend_bp
 from backend.services.auth_service import AuthService
-from backend.models import db, User
-from functools import wraps
-
-def login_required(f):
-    """Decorator to require login"""
-    @wraps(f)
-    def decorated_function(*args, **kwargs):
-        token = session.get('token')
-        
-        if not token:
-            return redirect(url_for('frontend.login'))
-        
-        user, error = AuthService.validate_session(token)
-        
-        if error:
-            session.clear()
-            return redirect(url_for('frontend.login'))
-        
-        return f(user, *args, **kwargs)
-    
-    return decorated_function
+from backend.utils.auth import current_user, login_required
 
 @frontend_bp.route('/')
 @login_required
@@ -35,11 +15,9 @@ def index(user):
 def login():
     """Login page"""
     # If already logged in, redirect to dashboard
-    token = session.get('token')
-    if token:
-        user, error = AuthService.validate_session(token)
-        if not error:
-            return redirect(url_for('frontend.index'))
+    user, error = current_user()
+    if not error:
+        return redirect(url_for('frontend.index'))
     
     return render_template('login.html')
 
@@ -47,11 +25,9 @@ def login():
 def register():
     """Registration page"""
     # If already logged in, redirect to dashboard
-    token = session.get('token')
-    if token:
-        user, error = AuthService.validate_session(token)
-        if not error:
-            return redirect(url_for('frontend.index'))
+    user, error = current_user()
+    if not error:
+        return redirect(url_for('frontend.index'))
     
     return render_template('register.html')
 
@@ -104,12 +80,10 @@ def api_login():
 @frontend_bp.route('/api/frontend/check-session', methods=['GET'])
 def check_session():
     """Check if user has valid session"""
-    token = session.get('token')
-    
-    if not token:
+    if not session.get('token'):
         return jsonify({'logged_in': False}), 200
     
-    user, error = AuthService.validate_session(token)
+    user, error = current_user()
     
     if error:
         session.clear()
@@ -1,9 +1,14 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.exc import DBAPIError
 from datetime import datetime
 import json
+import time
 
 db = SQLAlchemy()
 
+# Bump when a table or index is added, so databases created earlier pick it up on the next boot
+SCHEMA_VERSION = 2
+
 class User(db.Model):
     __tablename__ = 'users'
     
@@ -71,5 +76,105 @@ class Session(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     token = db.Column(db.String(255), unique=True, nullable=False, index=True)
-    expires_at = db.Column(db.DateTime, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+class RevokedToken(db.Model):
+    """Signed session tokens logged out before they expire, read by every worker on every host"""
+    __tablename__ = 'revoked_tokens'
+    
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    digest = db.Column(db.String(32), unique=True, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+class SharedVerdict(db.Model):
+    """Element verdicts for a page, shared by every user who visits it.
+
+    key is a SHA-256 of the normalized URL and the analyzed content, so
+    neither the URL nor anything about the requesting user is stored.
+    """
+    __tablename__ = 'shared_verdicts'
+    
+    key = db.Column(db.String(64), primary_key=True)
+    verdict = db.Column(db.Text, nullable=False)
+    gemini_calls = db.Column(db.Integer, nullable=False, default=1)
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    
+    def get_verdict(self):
+        return json.loads(self.verdict)
+    
+    def set_verdict(self, verdict):
+        self.verdict = json.dumps(verdict)
+
+class SharedVerdictDaily(db.Model):
+    __tablename__ = 'shared_verdict_daily'
+    
+    day = db.Column(db.Date, primary_key=True)
+    lookups = db.Column(db.Integer, nullable=False, default=0)
+    hits = db.Column(db.Integer, nullable=False, default=0)
+    stores = db.Column(db.Integer, nullable=False, default=0)
+    calls_saved = db.Column(db.Integer, nullable=False, default=0)
+
+class GeminiUsageDaily(db.Model):
+    """Gemini calls per day, service and user; user_id 0 is unattributed work"""
+    __tablename__ = 'gemini_usage_daily'
+    
+    day = db.Column(db.Date, primary_key=True)
+    service = db.Column(db.String(20), primary_key=True)
+    user_id = db.Column(db.Integer, primary_key=True)
+    calls = db.Column(db.Integer, nullable=False, default=0)
+    failures = db.Column(db.Integer, nullable=False, default=0)
+    retries = db.Column(db.Integer, nullable=False, default=0)
+    request_bytes = db.Column(db.BigInteger, nullable=False, default=0)
+    response_bytes = db.Column(db.BigInteger, nullable=False, default=0)
+    prompt_tokens = db.Column(db.BigInteger, nullable=False, default=0)
+    output_tokens = db.Column(db.BigInteger, nullable=False, default=0)
+    statuses = db.Column(db.Text, default='{}')
+    # A services.metrics.Histogram, encoded by usage_service.encode_latency
+    latency = db.Column(db.Text)
+
+class SchemaVersion(db.Model):
+    __tablename__ = 'schema_version'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False)
+
+def _schema_version():
+    try:
+        return db.session.query(SchemaVersion.version).filter_by(id=1).scalar()
+    except DBAPIError:
+        db.session.rollback()
+        return None
+
+def ensure_schema(attempts=5, retry_delay=0.2):
+    """Bring the database up to SCHEMA_VERSION; return False when it already was.
+
+    Replaces calling db.create_all() on every boot, which inspects every
+    table; a current database costs one SELECT. Workers booting together
+    without --preload can race to create a table or insert the version
+    row; the loser rolls back, waits and checks again, and returns False
+    once the winner has finished. Needs an app context.
+    """
+    for attempt in range(attempts):
+        current = _schema_version()
+        if current is not None and current >= SCHEMA_VERSION:
+            return False
+        
+        try:
+            db.create_all()
+            # create_all skips tables that exist, so add indexes introduced since they were created
+            for table in db.metadata.sorted_tables:
+                for index in table.indexes:
+                    index.create(bind=db.engine, checkfirst=True)
+            
+            row = db.session.get(SchemaVersion, 1) or SchemaVersion(id=1)
+            row.version = SCHEMA_VERSION
+            db.session.add(row)
+            db.session.commit()
+            return True
+        except DBAPIError:
+            db.session.rollback()
+            if attempt == attempts - 1:
+                raise
+            time.sleep(retry_delay * (attempt + 1))
@@ -1,120 +1,598 @@
-import requests
 import time
 import json
+import threading
+import copy
+from concurrent.futures import as_completed
 from backend.config import Config
+from backend.services.cache_service import AnalysisCache, content_key, normalize_text
+from backend.services.prefilter_service import PrefilterService
+from backend.services.cascade_service import CascadeService
+from backend.services.single_flight import get_single_flight
+from backend.services.chunking_service import ChunkingService
+from backend.services.gemini_transport import get_transport
+from backend.services.ocr_cache import OCRCache
+from backend.services.ocr_service import OCRService, get_ocr_cache
+from backend.services.usage_service import attributed_user
+from backend.utils.image_preprocessing import decode_image_data
+from backend.utils.json_stream import IncrementalJSONParser
+from backend.utils.concurrency import ContextThreadPoolExecutor
 
-class AIService:
-    DARK_PATTERN_PROMPT = """Analyze the following text extracted from a webpage and identify any dark patterns.
+_analysis_cache = None
+_analysis_cache_lock = threading.Lock()
+
+def get_analysis_cache():
+    """Return the shared analysis result cache, or None when disabled"""
+    global _analysis_cache
+    if not Config.ANALYSIS_CACHE_ENABLED:
+        return None
+    if _analysis_cache is None:
+        with _analysis_cache_lock:
+            if _analysis_cache is None:
+                _analysis_cache = AnalysisCache(
+                    maxsize=Config.ANALYSIS_CACHE_SIZE,
+                    ttl=Config.ANALYSIS_CACHE_TTL,
+                    path=Config.ANALYSIS_CACHE_PATH
+                )
+    return _analysis_cache
 
-Dark patterns to detect:
+# Shared by the text and screenshot prompts, which must describe the same patterns and verdict
+PATTERNS_TO_DETECT = """Dark patterns to detect:
 1. Urgency manipulation: countdown timers, limited stock claims, pressure language
 2. Misdirection: hidden costs, confusing navigation, disguised advertisements
 3. Social proof manipulation: fake reviews, inflated popularity claims, fabricated scarcity
-4. Obstruction: difficult unsubscribe processes, hidden cancellation options, forced continuity
-
-Text to analyze:
-{text}
+4. Obstruction: difficult unsubscribe processes, hidden cancellation options, forced continuity"""
 
-Respond in JSON format with:
-{{
-    "detected": true/false,
+VERDICT_FIELDS_JSON = """    "detected": true/false,
     "pattern_type": "urgency_manipulation|misdirection|social_proof_manipulation|obstruction|other",
     "confidence_score": 0.0-1.0,
     "description": "brief description of the detected pattern",
-    "affected_elements": ["list of text snippets that contain the pattern"]
-}}
+    "affected_elements": ["list of text snippets that contain the pattern"]"""
+
+NO_PATTERN_NOTE = 'If no dark pattern is detected, set "detected" to false and confidence_score to 0.0.'
 
-If no dark pattern is detected, set "detected" to false and confidence_score to 0.0."""
+class AIService:
+    DARK_PATTERN_PROMPT = (
+        'Analyze the following text extracted from a webpage and identify any dark patterns.\n\n'
+        + PATTERNS_TO_DETECT
+        + '\n\nText to analyze:\n{text}\n\nRespond in JSON format with:\n{{\n'
+        + VERDICT_FIELDS_JSON
+        + '\n}}\n\n'
+        + NO_PATTERN_NOTE
+    )
+
+    ELEMENT_BATCH_PROMPT = """Analyze each numbered webpage element below and decide whether it is a dark pattern.
+
+Page context:
+{context}
+
+Recent user actions:
+{flow}
+
+Elements (each line is [index] locally suspected pattern | element role | text):
+{elements}
+
+Respond in JSON format with one entry per element index, in any order:
+{{
+    "results": [
+        {{
+            "index": 0,
+            "dark_pattern_detected": true/false,
+            "pattern_type": "urgency_manipulation|misdirection|social_proof_manipulation|obstruction|confirm_shaming|sneaky_opt_in|hidden_costs|other",
+            "confidence_score": 0.0-1.0,
+            "severity": "low|medium|high",
+            "explanation": "one sentence explaining the verdict"
+        }}
+    ]
+}}"""
 
+    # Not passed through format(), so its braces are single
+    SCREENSHOT_PROMPT = (
+        'Read all visible text in this screenshot of a webpage and identify any dark patterns.\n\n'
+        + PATTERNS_TO_DETECT
+        + '\n\nRespond in JSON format with:\n{\n'
+        + VERDICT_FIELDS_JSON
+        + ',\n    "extracted_text": "all visible text in the screenshot, in reading order"\n}\n\n'
+        + NO_PATTERN_NOTE
+    )
+
+    SCREENSHOT_MODES = ('two_stage', 'fused')
+
+    SEVERITY_WEIGHTS = {'low': 10, 'medium': 20, 'high': 35}
+
+    VERDICT_FIELDS = ('detected', 'pattern_type', 'confidence_score')
+
+    @staticmethod
+    def analyze_text(text, max_retries=5, on_verdict=None):
+        """Analyze page text for dark patterns.
+        
+        With on_verdict, the response is streamed and on_verdict is called
+        once with detected, pattern_type and confidence_score as soon as the
+        model has produced them, before description and affected_elements.
+        Cached and prefiltered answers call it immediately.
+        
+        Text longer than AI_CHUNK_CHARS goes through analyze_page; on_verdict
+        then receives the merged page verdict.
+        """
+        if Config.AI_CHUNKING_ENABLED and len(text) > Config.AI_CHUNK_CHARS:
+            return AIService._with_verdict(AIService.analyze_page(text, max_retries), on_verdict)
+        
+        text = text[:Config.AI_CHUNK_CHARS]
+        stats = CascadeService.stats()
+        start = time.perf_counter()
+        
+        # Text none of the local heuristics flag is answered without Gemini
+        if Config.AI_PREFILTER_ENABLED and not PrefilterService.has_match(text):
+            stats.record('prefilter', time.perf_counter() - start)
+            return AIService._with_verdict(AIService.no_pattern_result(), on_verdict)
+        
+        prompt = AIService.DARK_PATTERN_PROMPT.format(text=text)
+        
+        cache = get_analysis_cache()
+        key = content_key(normalize_text(prompt))
+        if cache is not None:
+            cached = cache.get(key)
+            if cached is not None:
+                stats.record('cache', time.perf_counter() - start)
+                return AIService._with_verdict(copy.deepcopy(cached), on_verdict)
+        
+        # Confident local scores are answered here; only the uncertainty band goes to Gemini
+        route = CascadeService.route(text)
+        if route['verdict'] is not None:
+            stats.record('local', time.perf_counter() - start, route['verdict'])
+            return AIService._with_verdict(route['verdict'], on_verdict)
+        
+        def request():
+            remote_start = time.perf_counter()
+            result = AIService._request_analysis(prompt, max_retries, on_verdict)
+            if cache is not None and result.get('success'):
+                cache.set(key, copy.deepcopy(result), latency=time.perf_counter() - remote_start)
+            return result
+        
+        # Identical texts arriving together, in this worker or another, share one Gemini call
+        flight = get_single_flight()
+        if flight is None:
+            result = request()
+        else:
+            result, shared = flight.do(key, request)
+            if shared:
+                result = AIService._with_verdict(copy.deepcopy(result), on_verdict)
+                stats.record('coalesced', time.perf_counter() - start)
+                return AIService._local_fallback(text, result, on_verdict)
+        
+        stats.record('remote', time.perf_counter() - start, result, route['score'])
+        
+        # Fallback verdicts are never cached, so Gemini answers once it is back
+        return AIService._local_fallback(text, result, on_verdict)
+    
     @staticmethod
-    def analyze_text(text, max_retries=5):
-        url = f"{Config.GEMINI_API_URL}?key={Config.GEMINI_API_KEY}"
+    def _local_fallback(text, result, on_verdict=None):
+        """Answer from the local classifier when Gemini could not be reached"""
+        if result.get('success') or not Config.LOCAL_MODEL_FALLBACK_ENABLED:
+            return result
         
-        prompt = AIService.DARK_PATTERN_PROMPT.format(text=text[:2000])
+        # A 4xx means the request itself was bad; the local model cannot fix that
+        if result.get('error', '').startswith('HTTP 4'):
+            return result
         
-        payload = {
-            'contents': [{
-                'parts': [{'text': prompt}]
-            }]
+        from backend.services.local_classifier import get_local_classifier
+        
+        try:
+            classifier = get_local_classifier()
+        except Exception:
+            classifier = None
+        if classifier is None:
+            return result
+        
+        verdict = classifier.classify([text])[0]
+        fallback = {
+            'success': True,
+            'detected': verdict['detected'],
+            'pattern_type': verdict['pattern_type'] if verdict['detected'] else 'other',
+            'confidence_score': verdict['confidence_score'],
+            'description': 'Local classifier verdict; Gemini was unavailable',
+            'affected_elements': [],
+            'source': 'local',
+            'fallback_reason': result.get('error')
         }
+        return AIService._with_verdict(fallback, on_verdict)
+    
+    @staticmethod
+    def analyze_page(text, max_retries=5, token_budget=None):
+        """Analyze a long page as chunks and merge the verdicts.
         
-        retry_count = 0
-        delay = 1
+        The text is cleaned of repeated lines, split on structural
+        boundaries and the chunks chosen within token_budget are analyzed
+        concurrently, most suspicious first. A detection at or above
+        AI_EARLY_EXIT_CONFIDENCE ends the page early. The result carries a
+        coverage dict describing how much of the page was analyzed.
+        """
+        if token_budget is None:
+            token_budget = Config.AI_PAGE_TOKEN_BUDGET
         
-        while retry_count < max_retries:
+        cleaned = ChunkingService.clean(text)
+        chunks = ChunkingService.split(cleaned, Config.AI_CHUNK_CHARS)
+        selected = ChunkingService.select(
+            chunks,
+            token_budget,
+            overhead_tokens=ChunkingService.estimate_tokens(AIService.DARK_PATTERN_PROMPT),
+            unflagged_free=Config.AI_PREFILTER_ENABLED
+        )
+        
+        results = {}
+        early_exit = False
+        if selected:
+            executor = ContextThreadPoolExecutor(max_workers=min(len(selected), Config.AI_MAX_CONCURRENCY))
+            futures = {
+                executor.submit(AIService.analyze_text, chunks[index], max_retries): index
+                for index in selected
+            }
             try:
-                response = requests.post(
-                    url,
-                    json=payload,
-                    timeout=Config.AI_TIMEOUT
-                )
-                
-                if response.status_code == 200:
-                    result = response.json()
-                    
-                    if 'candidates' in result and len(result['candidates']) > 0:
-                        content = result['candidates'][0].get('content', {})
-                        parts = content.get('parts', [])
-                        
-                        if parts and len(parts) > 0:
-                            text_response = parts[0].get('text', '')
-                            
-                            try:
-                                json_start = text_response.find('{')
-                                json_end = text_response.rfind('}') + 1
-                                
-                                if json_start != -1 and json_end > json_start:
-                                    json_str = text_response[json_start:json_end]
-                                    parsed = json.loads(json_str)
-                                    
-                                    return {
-                                        'success': True,
-                                        'detected': parsed.get('detected', False),
-                                        'pattern_type': parsed.get('pattern_type', 'other'),
-                                        'confidence_score': parsed.get('confidence_score', 0.0),
-                                        'description': parsed.get('description', ''),
-                                        'affected_elements': parsed.get('affected_elements', [])
-                                    }
-                            except json.JSONDecodeError:
-                                pass
+                for future in as_completed(futures):
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        result = {'success': False, 'error': str(e)}
+                    results[futures[future]] = result
                     
-                    return {
-                        'success': True,
-                        'detected': False,
-                        'pattern_type': 'other',
-                        'confidence_score': 0.0,
-                        'description': 'No pattern detected',
-                        'affected_elements': []
-                    }
-                
-                elif response.status_code in [429, 503]:
-                    retry_count += 1
-                    if retry_count < max_retries:
-                        time.sleep(delay)
-                        delay = min(delay * 2, 60)
-                        continue
-                    else:
-                        return {'success': False, 'error': 'Service unavailable after retries'}
-                
-                else:
-                    return {'success': False, 'error': f'HTTP {response.status_code}: {response.text}'}
+                    if (result.get('success') and result.get('detected')
+                            and result.get('confidence_score', 0.0) >= Config.AI_EARLY_EXIT_CONFIDENCE):
+                        early_exit = True
+                        break
+            finally:
+                # Chunks not yet started are dropped; ones in flight still
+                # finish in the background and populate the cache.
+                executor.shutdown(wait=False, cancel_futures=True)
+        
+        merged = AIService.merge_verdicts([results[index] for index in sorted(results)])
+        if merged.get('success'):
+            analyzed = [index for index, result in results.items() if result.get('success')]
+            merged['coverage'] = {
+                'chunks_total': len(chunks),
+                'chunks_analyzed': len(analyzed),
+                'chunks_failed': len(results) - len(analyzed),
+                'chunks_over_budget': len(chunks) - len(selected),
+                'chars_total': sum(len(chunk) for chunk in chunks),
+                'chars_analyzed': sum(len(chunks[index]) for index in analyzed),
+                'early_exit': early_exit
+            }
+        return merged
+    
+    @staticmethod
+    def merge_verdicts(results):
+        """Combine per-chunk verdicts into one page verdict.
+        
+        The page takes its type, confidence and description from the most
+        confident detection and the affected elements of every detection.
+        Failed chunks are ignored unless every chunk failed.
+        """
+        successes = [result for result in results if result.get('success')]
+        if not successes:
+            return results[0] if results else AIService.no_pattern_result()
+        
+        detections = sorted(
+            (result for result in successes if result.get('detected')),
+            key=lambda result: result.get('confidence_score', 0.0),
+            reverse=True
+        )
+        if not detections:
+            return AIService.no_pattern_result()
+        
+        affected_elements = []
+        for result in detections:
+            for element in result.get('affected_elements', []):
+                if element not in affected_elements:
+                    affected_elements.append(element)
+        
+        top = detections[0]
+        return {
+            'success': True,
+            'detected': True,
+            'pattern_type': top.get('pattern_type', 'other'),
+            'confidence_score': top.get('confidence_score', 0.0),
+            'description': top.get('description', ''),
+            'affected_elements': affected_elements
+        }
+    
+    @staticmethod
+    def analyze_screenshot(image_data, mode=None, max_retries=5):
+        """Extract text from a screenshot and analyze it for dark patterns.
+        
+        two_stage runs OCR and then analyze_text, so the OCR cache, the
+        prefilter and the analysis cache can each skip a call. fused sends
+        the image with the analysis instructions in one request.
+        Both return the analyze_text result plus extracted_text and mode.
+        """
+        mode = mode or Config.SCREENSHOT_ANALYSIS_MODE
+        if mode not in AIService.SCREENSHOT_MODES:
+            return {'success': False, 'error': f'Unknown screenshot analysis mode: {mode}'}
+        
+        if mode == 'fused':
+            result = AIService._analyze_screenshot_fused(image_data, max_retries)
+        else:
+            ocr = OCRService.extract_text(image_data, max_retries=max_retries)
+            if not ocr['success']:
+                return ocr
             
-            except requests.exceptions.Timeout:
-                retry_count += 1
-                if retry_count < max_retries:
-                    time.sleep(delay)
-                    delay = min(delay * 2, 60)
-                    continue
-                else:
-                    return {'success': False, 'error': 'Timeout after retries'}
+            result = AIService.analyze_text(ocr['text'], max_retries=max_retries)
+            result['extracted_text'] = ocr['text']
+        
+        if result.get('success'):
+            result['mode'] = mode
+        return result
+    
+    @staticmethod
+    def _analyze_screenshot_fused(image_data, max_retries=5):
+        try:
+            image_data = decode_image_data(image_data)
+        except ValueError:
+            # Not decodable here; let Gemini judge it, uncached
+            pass
+        
+        try:
+            image_part, stats = OCRService.image_part(image_data, Config.OCR_PREPROCESS_ENABLED)
+        except ValueError as e:
+            return {'success': False, 'error': f'Invalid image: {e}'}
+        
+        response = get_transport().generate(
+            [image_part, {'text': AIService.SCREENSHOT_PROMPT}],
+            timeout=Config.AI_TIMEOUT,
+            service='ai',
+            max_retries=max_retries
+        )
+        
+        if not response['success']:
+            return response
+        
+        parsed = AIService._extract_json(response['text'])
+        if not isinstance(parsed, dict):
+            result = AIService.no_pattern_result()
+            result['extracted_text'] = ''
+            return result
+        
+        extracted_text = parsed.get('extracted_text', '')
+        if not isinstance(extracted_text, str):
+            extracted_text = ''
+        
+        # Let a later two-stage request for the same image skip its OCR call
+        ocr_cache = get_ocr_cache()
+        if ocr_cache is not None and extracted_text and isinstance(image_data, bytes):
+            ocr_cache.set(OCRCache.content_hash(image_data), stats['dhash'] if stats else None, extracted_text,
+                          scope=attributed_user())
+        
+        return {
+            'success': True,
+            'detected': parsed.get('detected', False),
+            'pattern_type': parsed.get('pattern_type', 'other'),
+            'confidence_score': parsed.get('confidence_score', 0.0),
+            'description': parsed.get('description', ''),
+            'affected_elements': parsed.get('affected_elements', []),
+            'extracted_text': extracted_text
+        }
+    
+    @staticmethod
+    def no_pattern_result():
+        return {
+            'success': True,
+            'detected': False,
+            'pattern_type': 'other',
+            'confidence_score': 0.0,
+            'description': 'No pattern detected',
+            'affected_elements': []
+        }
+    
+    @staticmethod
+    def cache_stats():
+        cache = get_analysis_cache()
+        return cache.stats() if cache is not None else None
+    
+    @staticmethod
+    def _with_verdict(result, on_verdict):
+        if on_verdict is not None and result.get('success'):
+            on_verdict({field: result[field] for field in AIService.VERDICT_FIELDS})
+        return result
+    
+    @staticmethod
+    def _request_analysis(prompt, max_retries=5, on_verdict=None):
+        if on_verdict is None:
+            response = AIService._generate(prompt, max_retries)
+            sent = True
+        else:
+            parser = IncrementalJSONParser()
+            sent = False
             
+            def on_text(fragment):
+                nonlocal sent
+                parser.feed(fragment)
+                if not sent and all(field in parser.fields for field in AIService.VERDICT_FIELDS):
+                    sent = True
+                    on_verdict({field: parser.fields[field] for field in AIService.VERDICT_FIELDS})
+            
+            response = AIService._generate(prompt, max_retries, on_text=on_text)
+        
+        if not response['success']:
+            return response
+        
+        parsed = AIService._extract_json(response['text'])
+        
+        if not isinstance(parsed, dict):
+            result = AIService.no_pattern_result()
+        else:
+            result = {
+                'success': True,
+                'detected': parsed.get('detected', False),
+                'pattern_type': parsed.get('pattern_type', 'other'),
+                'confidence_score': parsed.get('confidence_score', 0.0),
+                'description': parsed.get('description', ''),
+                'affected_elements': parsed.get('affected_elements', [])
+            }
+        
+        # The model may order fields differently or omit one; report the
+        # verdict from the full body rather than not at all
+        if not sent:
+            AIService._with_verdict(result, on_verdict)
+        
+        return result
+    
+    @staticmethod
+    def _extract_json(text_response):
+        """Pull the outermost JSON object out of a model response"""
+        json_start = text_response.find('{')
+        json_end = text_response.rfind('}') + 1
+        
+        if json_start == -1 or json_end <= json_start:
+            return None
+        
+        try:
+            return json.loads(text_response[json_start:json_end])
+        except json.JSONDecodeError:
+            return None
+    
+    @staticmethod
+    def _generate(prompt, max_retries=5, api_key=None, on_text=None):
+        """Send a prompt to Gemini and return the raw text of the first candidate"""
+        return get_transport().generate(
+            [{'text': prompt}],
+            timeout=Config.AI_TIMEOUT,
+            service='ai',
+            max_retries=max_retries,
+            api_key=api_key,
+            on_text=on_text
+        )
+    
+    @staticmethod
+    def analyze_elements(elements, context=None, flow_data=None, api_key=None, max_retries=3):
+        """Classify many page elements with one Gemini call per chunk.
+        
+        Elements are packed into a single indexed prompt (split into chunks of
+        AI_BATCH_MAX_ELEMENTS, sent concurrently) and the per-index verdicts
+        are mapped back onto the input order. Chunks whose call failed get
+        default verdicts and are counted in failed_chunks.
+        """
+        if not elements:
+            return {'success': True, 'results': [], 'gemini_calls': 0, 'failed_chunks': 0}
+        
+        chunk_size = max(1, Config.AI_BATCH_MAX_ELEMENTS)
+        chunks = [
+            (offset, elements[offset:offset + chunk_size])
+            for offset in range(0, len(elements), chunk_size)
+        ]
+        
+        def analyze_chunk(chunk):
+            offset, items = chunk
+            return AIService._analyze_element_chunk(items, offset, context, flow_data, api_key, max_retries)
+        
+        if len(chunks) == 1:
+            chunk_results = [analyze_chunk(chunks[0])]
+        else:
+            max_workers = min(len(chunks), Config.AI_MAX_CONCURRENCY)
+            with ContextThreadPoolExecutor(max_workers=max_workers) as executor:
+                chunk_results = list(executor.map(analyze_chunk, chunks))
+        
+        errors = [r['error'] for r in chunk_results if not r['success']]
+        if len(errors) == len(chunk_results):
+            return {'success': False, 'error': errors[0]}
+        
+        results = []
+        for chunk_result, (offset, items) in zip(chunk_results, chunks):
+            if chunk_result['success']:
+                results.extend(chunk_result['results'])
+            else:
+                results.extend(AIService._element_result({}, item) for item in items)
+        
+        return {'success': True, 'results': results, 'gemini_calls': len(chunks), 'failed_chunks': len(errors)}
+    
+    @staticmethod
+    def _analyze_element_chunk(items, offset, context, flow_data, api_key, max_retries):
+        lines = []
+        for index, item in enumerate(items):
+            text = ' '.join(str(item.get('text', '')).split())[:Config.AI_BATCH_ELEMENT_CHARS]
+            lines.append(f"[{index}] {item.get('pattern', 'unknown')} | {item.get('role', 'element')} | {text}")
+        
+        prompt = AIService.ELEMENT_BATCH_PROMPT.format(
+            context=json.dumps(context or {})[:500],
+            flow=json.dumps((flow_data or [])[-5:])[:500],
+            elements='\n'.join(lines)
+        )
+        
+        response = AIService._generate(prompt, max_retries, api_key=api_key)
+        
+        if not response['success']:
+            return response
+        
+        parsed = AIService._extract_json(response['text'])
+        entries = parsed.get('results', []) if isinstance(parsed, dict) else []
+        
+        by_index = {}
+        for entry in entries:
+            if isinstance(entry, dict) and isinstance(entry.get('index'), int):
+                by_index[entry['index']] = entry
+        
+        return {
+            'success': True,
+            'results': [
+                AIService._element_result(by_index.get(index, {}), item)
+                for index, item in enumerate(items)
+            ]
+        }
+    
+    @staticmethod
+    def _element_result(entry, item):
+        try:
+            confidence = min(max(float(entry.get('confidence_score', 0.0)), 0.0), 1.0)
+        except (TypeError, ValueError):
+            confidence = 0.0
+        
+        severity = entry.get('severity')
+        if not isinstance(severity, str) or severity not in AIService.SEVERITY_WEIGHTS:
+            severity = 'high' if confidence >= 0.85 else 'medium' if confidence >= 0.6 else 'low'
+        
+        # Results are tallied by pattern_type, so anything but a non-empty string is ignored
+        pattern_type = next(
+            (value for value in (entry.get('pattern_type'), item.get('pattern')) if isinstance(value, str) and value),
+            'other'
+        )
+        
+        return {
+            'selector': item.get('selector'),
+            'dark_pattern_detected': bool(entry.get('dark_pattern_detected', False)),
+            'pattern_type': pattern_type,
+            'confidence_score': confidence,
+            'severity': severity,
+            'explanation': entry.get('explanation') or 'No explanation provided'
+        }
+    
+    @staticmethod
+    def site_score(results):
+        """Combine per-element verdicts into a 0-100 page score"""
+        score = sum(
+            r['confidence_score'] * AIService.SEVERITY_WEIGHTS[r['severity']]
+            for r in results if r['dark_pattern_detected']
+        )
+        return min(100, round(score))
+    
+    @staticmethod
+    def analyze_batch(texts, max_concurrency=None, max_retries=5):
+        """Analyze many texts concurrently, returning results in input order.
+        
+        Each text is analyzed independently; a failure in one item yields an
+        error result at its index without affecting the others.
+        """
+        texts = list(texts)
+        if not texts:
+            return []
+        
+        if max_concurrency is None:
+            max_concurrency = Config.AI_MAX_CONCURRENCY
+        max_concurrency = max(1, min(max_concurrency, len(texts)))
+        
+        def analyze_one(text):
+            try:
+                return AIService.analyze_text(text, max_retries=max_retries)
             except Exception as e:
-                retry_count += 1
-                if retry_count < max_retries:
-                    time.sleep(delay)
-                    delay = min(delay * 2, 60)
-                    continue
-                else:
-                    return {'success': False, 'error': str(e)}
-        
-        return {'success': False, 'error': 'Max retries exceeded'}
+                return {'success': False, 'error': str(e)}
+        
+        if max_concurrency == 1:
+            return [analyze_one(text) for text in texts]
+        
+        with ContextThreadPoolExecutor(max_workers=max_concurrency) as executor:
+            return list(executor.map(analyze_one, texts))
@@ -1,10 +1,14 @@
 import secrets
 import hashlib
+import calendar
 from datetime import datetime, timedelta
+from sqlalchemy.orm import joinedload
+from backend.config import Config
 from backend.models import User, Session, db
+from backend.services.session_cache import get_session_cache
+from backend.services.session_tokens import get_session_tokens, is_signed_token, signing_key_configured
 from backend.utils.crypto import encrypt_data, decrypt_data
 import pyotp
-import qrcode
 import io
 import base64
 
@@ -37,6 +41,9 @@ class AuthService:
             issuer_name='ShieldUI'
         )
         
+        # qrcode pulls in Pillow; only TOTP enrolment needs it, so keep it off the worker boot path
+        import qrcode
+        
         qr = qrcode.QRCode(version=1, box_size=10, border=5)
         qr.add_data(totp_uri)
         qr.make(fit=True)
@@ -79,9 +86,15 @@ class AuthService:
     
     @staticmethod
     def create_session(user):
-        token = secrets.token_urlsafe(32)
         expires_at = datetime.utcnow() + timedelta(hours=24)
         
+        if Config.SESSION_TOKEN_MODE == 'signed':
+            token = get_session_tokens().issue(user.id, calendar.timegm(expires_at.timetuple()))
+            user.last_login = datetime.utcnow()
+            db.session.commit()
+            return token, expires_at
+        
+        token = secrets.token_urlsafe(32)
         session = Session(
             user_id=user.id,
             token=token,
@@ -94,25 +107,61 @@ class AuthService:
         
         return token, expires_at
     
+    @staticmethod
+    def load_user(user_id):
+        """Load a user together with their settings in one query"""
+        return User.query.options(joinedload(User.settings)).filter_by(id=user_id).first()
+    
     @staticmethod
     def validate_session(token):
-        session = Session.query.filter_by(token=token).first()
+        if is_signed_token(token):
+            # With the development SECRET_KEY a signed token proves nothing
+            if not signing_key_configured():
+                return None, 'Invalid session'
+            user_id, _, error = get_session_tokens().verify(token)
+            if error:
+                return None, error
+            user = AuthService.load_user(user_id)
+            return (user, None) if user is not None else (None, 'Invalid session')
+        
+        cache = get_session_cache()
+        if cache is not None:
+            entry = cache.get(token)
+            if entry is not None:
+                user_id, expires_at = entry
+                user = AuthService.load_user(user_id) if expires_at >= datetime.utcnow() else None
+                if user is not None:
+                    return user, None
+                cache.discard(token)
+        
+        session = Session.query.options(
+            joinedload(Session.user).joinedload(User.settings)
+        ).filter_by(token=token).first()
         
         if not session:
             return None, 'Invalid session'
         
+        # Expired rows are left for the SessionReaper so validation never writes
         if session.expires_at < datetime.utcnow():
-            db.session.delete(session)
-            db.session.commit()
             return None, 'Session expired'
         
+        if cache is not None:
+            cache.put(token, session.user_id, session.expires_at)
+        
         return session.user, None
     
     @staticmethod
     def invalidate_session(token):
+        if is_signed_token(token):
+            return signing_key_configured() and get_session_tokens().revoke(token)
+        
         session = Session.query.filter_by(token=token).first()
         if session:
             db.session.delete(session)
             db.session.commit()
+            # Only once the row is gone, or a worker could re-cache it from the database
+            cache = get_session_cache()
+            if cache is not None:
+                cache.revoke(token)
             return True
         return False
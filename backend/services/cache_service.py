@@ -0,0 +1,211 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+def normalize_text(text, max_length=None):
+    """Collapse whitespace and case so trivially different strings share a key"""
+    normalized = re.sub(r'\s+', ' ', text or '').strip().casefold()
+    if max_length is not None:
+        normalized = normalized[:max_length]
+    return normalized
+
+def content_key(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+class LRUCache:
+    """Thread-safe in-process LRU with per-entry TTL"""
+
+    def __init__(self, maxsize=4096, ttl=86400):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+
+            expires_at, value = entry
+            if expires_at < time.time():
+                del self._data[key]
+                return None
+
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.time() + (ttl if ttl is not None else self.ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+class SQLiteCache:
+    """Persistent key/value table shared by every worker on the host.
+
+    Expired rows are only dropped on read, so set() also purges up to
+    purge_batch of them every purge_interval seconds to keep the file
+    from growing with keys that are never looked up again.
+    """
+
+    def __init__(self, path, ttl=86400, table='analysis_cache', purge_interval=300, purge_batch=1000):
+        self.path = path
+        self.ttl = ttl
+        self.table = table
+        self.purge_interval = purge_interval
+        self.purge_batch = purge_batch
+        self._next_purge = time.monotonic() + purge_interval
+        self._purge_lock = threading.Lock()
+        self._local = threading.local()
+
+    def _connect(self):
+        # sqlite3 connections must not cross threads or forked workers
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+
+        conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute(
+            f'CREATE TABLE IF NOT EXISTS {self.table} ('
+            'key TEXT PRIMARY KEY, value TEXT NOT NULL, '
+            'latency REAL NOT NULL DEFAULT 0, expires_at REAL NOT NULL)'
+        )
+        conn.execute(f'CREATE INDEX IF NOT EXISTS ix_{self.table}_expires_at ON {self.table} (expires_at)')
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    def get(self, key):
+        row = self._connect().execute(
+            f'SELECT value, latency, expires_at FROM {self.table} WHERE key = ?', (key,)
+        ).fetchone()
+
+        if row is None:
+            return None
+
+        value, latency, expires_at = row
+        if expires_at < time.time():
+            self.delete(key)
+            return None
+
+        return json.loads(value), latency, expires_at
+
+    def set(self, key, value, latency=0.0, ttl=None):
+        expires_at = time.time() + (ttl if ttl is not None else self.ttl)
+        self._connect().execute(
+            f'INSERT OR REPLACE INTO {self.table} (key, value, latency, expires_at) VALUES (?, ?, ?, ?)',
+            (key, json.dumps(value), latency, expires_at)
+        )
+
+        with self._purge_lock:
+            due = time.monotonic() >= self._next_purge
+            if due:
+                self._next_purge = time.monotonic() + self.purge_interval
+        if due:
+            self.purge_expired(limit=self.purge_batch)
+
+    def delete(self, key):
+        self._connect().execute(f'DELETE FROM {self.table} WHERE key = ?', (key,))
+
+    def purge_expired(self, limit=None):
+        """Delete expired rows, at most limit of them; return how many were deleted"""
+        if limit is None:
+            cursor = self._connect().execute(
+                f'DELETE FROM {self.table} WHERE expires_at < ?', (time.time(),)
+            )
+        else:
+            cursor = self._connect().execute(
+                f'DELETE FROM {self.table} WHERE key IN '
+                f'(SELECT key FROM {self.table} WHERE expires_at < ? LIMIT ?)', (time.time(), limit)
+            )
+        return cursor.rowcount
+
+class AnalysisCache:
+    """Two-tier (memory, then SQLite) cache for Gemini analysis results"""
+
+    def __init__(self, maxsize=4096, ttl=86400, path=None):
+        self.ttl = ttl
+        self.memory = LRUCache(maxsize=maxsize, ttl=ttl)
+        self.disk = SQLiteCache(path, ttl=ttl) if path else None
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            'memory_hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'stores': 0,
+            'disk_errors': 0,
+            'saved_seconds': 0.0
+        }
+
+    def _count(self, name, amount=1):
+        with self._stats_lock:
+            self._stats[name] += amount
+
+    def get(self, key):
+        entry = self.memory.get(key)
+        if entry is not None:
+            value, latency = entry
+            self._count('memory_hits')
+            self._count('saved_seconds', latency)
+            return value
+
+        if self.disk is not None:
+            try:
+                row = self.disk.get(key)
+            except sqlite3.Error:
+                self._count('disk_errors')
+                row = None
+
+            if row is not None:
+                value, latency, expires_at = row
+                self.memory.set(key, (value, latency), ttl=max(expires_at - time.time(), 0))
+                self._count('disk_hits')
+                self._count('saved_seconds', latency)
+                return value
+
+        self._count('misses')
+        return None
+
+    def set(self, key, value, latency=0.0):
+        self.memory.set(key, (value, latency))
+        self._count('stores')
+
+        if self.disk is not None:
+            try:
+                self.disk.set(key, value, latency=latency)
+            except sqlite3.Error:
+                self._count('disk_errors')
+
+    def clear(self):
+        self.memory.clear()
+
+    def stats(self):
+        with self._stats_lock:
+            stats = dict(self._stats)
+
+        lookups = stats['memory_hits'] + stats['disk_hits'] + stats['misses']
+        stats['hit_rate'] = (stats['memory_hits'] + stats['disk_hits']) / lookups if lookups else 0.0
+        stats['saved_seconds'] = round(stats['saved_seconds'], 3)
+        stats['memory_entries'] = len(self.memory)
+        return stats
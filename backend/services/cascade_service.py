@@ -0,0 +1,114 @@
+import random
+import threading
+from backend.config import Config
+from backend.services.metrics import Histogram
+
+TIERS = ('prefilter', 'cache', 'local', 'coalesced', 'remote')
+CALIBRATION_BINS = 10
+
+class CascadeStats:
+    """Per-process counters and latency histograms for each cascade tier.
+
+    Remote answers for texts that had a local score are binned by that
+    score, which shows how often Gemini disagreed with the local model
+    at each confidence level and so where the band should sit.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._latency = {tier: Histogram() for tier in TIERS}
+            self._counters = {'local_positive': 0, 'local_negative': 0, 'shadow': 0, 'remote_failed': 0}
+            self._calibration = [[0, 0] for _ in range(CALIBRATION_BINS)]
+
+    def record(self, tier, latency, result=None, local_score=None):
+        with self._lock:
+            self._latency[tier].record(latency)
+
+            if tier == 'local' and result is not None:
+                self._counters['local_positive' if result['detected'] else 'local_negative'] += 1
+
+            if tier == 'remote':
+                if result is None or not result.get('success') or result.get('source') == 'local':
+                    self._counters['remote_failed'] += 1
+                elif local_score is not None:
+                    index = min(int(local_score * CALIBRATION_BINS), CALIBRATION_BINS - 1)
+                    self._calibration[index][1 if result.get('detected') else 0] += 1
+
+    def record_shadow(self):
+        with self._lock:
+            self._counters['shadow'] += 1
+
+    def snapshot(self):
+        with self._lock:
+            tiers = {tier: histogram.snapshot() for tier, histogram in self._latency.items()}
+            counters = dict(self._counters)
+            calibration = [list(counts) for counts in self._calibration]
+
+        total = sum(tier['count'] for tier in tiers.values())
+        remote = tiers['remote']['count']
+        return {
+            'band': [Config.AI_CASCADE_LOW, Config.AI_CASCADE_HIGH],
+            'requests': total,
+            'remote_calls': remote,
+            'remote_calls_avoided': total - remote,
+            'avoided_fraction': (total - remote) / total if total else 0.0,
+            'counters': counters,
+            'tiers': tiers,
+            'calibration': [{
+                'local_score': [i / CALIBRATION_BINS, (i + 1) / CALIBRATION_BINS],
+                'remote_negative': negative,
+                'remote_positive': positive
+            } for i, (negative, positive) in enumerate(calibration)]
+        }
+
+_stats = CascadeStats()
+
+class CascadeService:
+    @staticmethod
+    def stats():
+        return _stats
+
+    @staticmethod
+    def route(text):
+        """Score text locally and decide whether Gemini is needed.
+
+        Returns {'score', 'verdict'}; verdict is a full result when the local
+        score is outside the (AI_CASCADE_LOW, AI_CASCADE_HIGH) band, else
+        None. score is None when there is no local model. A fraction
+        AI_CASCADE_SHADOW_RATE of confident texts is still sent to Gemini so
+        the calibration table covers scores outside the band too.
+        """
+        if not Config.AI_CASCADE_ENABLED:
+            return {'score': None, 'verdict': None}
+
+        from backend.services.local_classifier import get_local_classifier
+
+        try:
+            classifier = get_local_classifier()
+        except Exception:
+            classifier = None
+        if classifier is None:
+            return {'score': None, 'verdict': None}
+
+        local = classifier.classify([text])[0]
+        score = local['confidence_score']
+        if Config.AI_CASCADE_LOW < score < Config.AI_CASCADE_HIGH:
+            return {'score': score, 'verdict': None}
+
+        if Config.AI_CASCADE_SHADOW_RATE and random.random() < Config.AI_CASCADE_SHADOW_RATE:
+            _stats.record_shadow()
+            return {'score': score, 'verdict': None}
+
+        return {'score': score, 'verdict': {
+            'success': True,
+            'detected': local['detected'],
+            'pattern_type': local['pattern_type'] if local['detected'] else 'other',
+            'confidence_score': score,
+            'description': 'Local classifier verdict' if local['detected'] else 'No pattern detected',
+            'affected_elements': [],
+            'source': 'local'
+        }}
@@ -0,0 +1,114 @@
+import re
+from backend.services.prefilter_service import PrefilterService
+
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])\s+')
+WHITESPACE = re.compile(r'\s+')
+
+# Rough English average for Gemini tokenization; only used for budgeting
+CHARS_PER_TOKEN = 4
+
+class ChunkingService:
+    @staticmethod
+    def clean(text):
+        """Collapse whitespace, drop empty lines and repeated boilerplate lines.
+
+        Lines are compared case-insensitively; only the first copy of a line
+        is kept, so nav bars and footers captured more than once cost nothing.
+        Blank lines are kept as single paragraph separators.
+        """
+        seen = set()
+        lines = []
+        for line in (text or '').splitlines():
+            line = WHITESPACE.sub(' ', line).strip()
+            if not line:
+                if lines and lines[-1]:
+                    lines.append('')
+                continue
+
+            key = line.casefold()
+            if key in seen:
+                continue
+            seen.add(key)
+            lines.append(line)
+
+        return '\n'.join(lines).strip()
+
+    @staticmethod
+    def _split_block(block, max_chars):
+        pieces = []
+        for sentence in SENTENCE_BOUNDARY.split(block):
+            while len(sentence) > max_chars:
+                cut = sentence.rfind(' ', 0, max_chars)
+                if cut <= 0:
+                    cut = max_chars
+                pieces.append(sentence[:cut].strip())
+                sentence = sentence[cut:].strip()
+            if sentence:
+                pieces.append(sentence)
+        return pieces
+
+    @staticmethod
+    def split(text, max_chars=2000):
+        """Pack text into chunks of at most max_chars along structural boundaries.
+
+        Paragraphs are preferred, then lines, then sentences; a single
+        sentence longer than max_chars is cut at the last space.
+        """
+        units = []
+        for paragraph in re.split(r'\n\s*\n', text):
+            for line in paragraph.splitlines():
+                line = line.strip()
+                if not line:
+                    continue
+                if len(line) > max_chars:
+                    units.extend((piece, False) for piece in ChunkingService._split_block(line, max_chars))
+                else:
+                    units.append((line, False))
+            if units:
+                units[-1] = (units[-1][0], True)
+
+        chunks = []
+        current = ''
+        for unit, ends_paragraph in units:
+            if current and len(current) + 1 + len(unit) > max_chars:
+                chunks.append(current)
+                current = ''
+            current = f'{current}\n{unit}' if current else unit
+            if ends_paragraph:
+                current += '\n'
+
+        if current.strip():
+            chunks.append(current)
+
+        return [chunk.strip() for chunk in chunks if chunk.strip()]
+
+    @staticmethod
+    def estimate_tokens(text):
+        return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+    @staticmethod
+    def select(chunks, token_budget, overhead_tokens=0, unflagged_free=False):
+        """Pick chunk indices to analyze within token_budget.
+
+        Chunks the local heuristics flag come first, most suspicious first,
+        then the rest in page order; the indices are returned in that order.
+        With unflagged_free, unflagged chunks are assumed to be answered
+        locally by the prefilter and do not count against the budget.
+        """
+        scores = [
+            max((match['suspicion_score'] for match in PrefilterService.scan(chunk)), default=0.0)
+            for chunk in chunks
+        ]
+
+        chosen = []
+        spent = 0
+        for index in sorted(range(len(chunks)), key=lambda i: (-scores[i], i)):
+            cost = 0
+            if scores[index] or not unflagged_free:
+                cost = ChunkingService.estimate_tokens(chunks[index]) + overhead_tokens
+            if spent + cost > token_budget:
+                continue
+            chosen.append(index)
+            spent += cost
+
+        return chosen
@@ -0,0 +1,280 @@
+import io
+import threading
+from collections import OrderedDict
+from backend.config import Config
+from backend.utils.concurrency import ContextThreadPoolExecutor
+from backend.utils.image_preprocessing import decode_image_data
+
+ROW_TOLERANCE = 1.0
+
+def _profile_error(previous_profile, current_profile, dy):
+    height = min(len(previous_profile), len(current_profile))
+    start = max(0, -dy)
+    stop = min(height, height - dy)
+    if stop <= start:
+        return float('inf')
+
+    # Count mismatched rows rather than summing differences, so a local edit
+    # (a countdown ticking, a banner appearing) cannot outweigh the alignment
+    # of everything else on screen
+    mismatched = 0
+    for y in range(start, stop):
+        if abs(current_profile[y] - previous_profile[y + dy]) > ROW_TOLERANCE:
+            mismatched += 1
+    return mismatched / (stop - start)
+
+def _best_shift(previous_profile, current_profile, shifts):
+    # Ties favour the smallest movement so static frames are not mistaken for scrolls
+    best_shift, best_error = 0, None
+    for dy in sorted(shifts, key=abs):
+        error = _profile_error(previous_profile, current_profile, dy)
+        if best_error is None or error < best_error - 1e-9:
+            best_shift, best_error = dy, error
+    return best_shift
+
+def estimate_scroll(previous_profile, current_profile, min_overlap=0.5):
+    """Return dy such that current row y shows what previous row y + dy showed.
+
+    Profiles are per-row mean intensities; the shift with the smallest
+    fraction of mismatched rows over the overlap wins.
+    """
+    height = min(len(previous_profile), len(current_profile))
+    max_shift = int(height * (1 - min_overlap))
+    return _best_shift(previous_profile, current_profile, range(-max_shift, max_shift + 1))
+
+def row_profile(gray):
+    """Mean intensity of every row of a grayscale frame"""
+    from PIL import Image
+    return list(gray.resize((1, gray.size[1]), Image.BOX).getdata())
+
+def _downsample(profile, rows):
+    step = len(profile) / rows
+    return [
+        sum(profile[int(i * step):max(int((i + 1) * step), int(i * step) + 1)])
+        / max(int((i + 1) * step) - int(i * step), 1)
+        for i in range(rows)
+    ]
+
+def estimate_scroll_fine(previous_profile, current_profile, coarse_rows=200):
+    """Pixel-exact scroll estimate: coarse search on a short profile, then refine"""
+    rows = min(coarse_rows, len(current_profile))
+    step = len(current_profile) / rows
+    coarse = estimate_scroll(_downsample(previous_profile, rows), _downsample(current_profile, rows))
+    coarse = round(coarse * step)
+
+    window = int(step) + 1
+    return _best_shift(previous_profile, current_profile, range(coarse - window, coarse + window + 1))
+
+class _TabState:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.frame_size = None
+        self.profile = None
+        self.offset = 0
+        # band index -> {'y0', 'y1', 'thumb', 'group'}; y in full-resolution
+        # page (document) pixels, thumb reduced by the tab's integer factor
+        self.bands = {}
+        # group id -> {'text', 'bands'}
+        self.groups = {}
+        self.next_group = 0
+        self.pixels_total = 0
+        self.pixels_uploaded = 0
+        self.frames = 0
+
+class FrameDiffOCR:
+    """Per-tab OCR that only uploads the parts of a frame that changed.
+
+    Each tab remembers its last frame. A new frame of the same size is aligned
+    to it by estimating the vertical scroll, then split into fixed bands in
+    page coordinates. Only bands whose pixels changed or were never seen are
+    cropped from the frame and OCR'd; text for unchanged bands is reused from
+    the OCR call that originally covered them.
+
+    The returned text is the union of every group still on screen, so a line
+    that was OCR'd together with rows since scrolled away keeps that context.
+    """
+    NEW = 'new'
+    CHANGED = 'changed'
+
+    def __init__(self, ocr_func, width=400, band_height=24, tolerance=24, max_tabs=256,
+                 max_region_bands=4):
+        self.ocr_func = ocr_func
+        self.width = width
+        self.band_height = band_height
+        self.tolerance = tolerance
+        self.max_tabs = max_tabs
+        self.max_region_bands = max_region_bands
+        self._lut = [0] * (tolerance + 1) + [255] * (255 - tolerance)
+        self._tabs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _state(self, tab_id):
+        with self._lock:
+            state = self._tabs.get(tab_id)
+            if state is None:
+                state = _TabState()
+                self._tabs[tab_id] = state
+            self._tabs.move_to_end(tab_id)
+            while len(self._tabs) > self.max_tabs:
+                self._tabs.popitem(last=False)
+            return state
+
+    def forget(self, tab_id):
+        with self._lock:
+            self._tabs.pop(tab_id, None)
+
+    def _thumb(self, gray, offset, y0, y1, factor):
+        return gray.crop((0, y0 - offset, gray.size[0], y1 - offset)).reduce(factor)
+
+    def _changed(self, band, thumb, y0, y1, factor):
+        """Return NEW for unseen rows, CHANGED for different pixels, else None"""
+        from PIL import ImageChops
+
+        if band is None or band['y0'] > y0 or band['y1'] < y1:
+            return self.NEW
+
+        top = (y0 - band['y0']) // factor
+        stored = band['thumb'].crop((0, top, thumb.size[0], top + thumb.size[1]))
+        if ImageChops.difference(thumb, stored).point(self._lut).getbbox() is not None:
+            return self.CHANGED
+        return None
+
+    def extract_text(self, tab_id, image_data):
+        from PIL import Image
+
+        try:
+            frame = Image.open(io.BytesIO(decode_image_data(image_data)))
+            frame.load()
+        except Exception as e:
+            return {'success': False, 'error': f'Invalid image: {e}'}
+
+        full_width, full_height = frame.size
+        gray = frame.convert('L')
+        profile = row_profile(gray)
+        # An integer reduction keeps thumbnails pixel-aligned across frames
+        factor = max(1, full_width // self.width)
+        band_height = self.band_height * factor
+
+        state = self._state(tab_id)
+        with state.lock:
+            # Nothing is written to state until OCR succeeds, so a failed
+            # frame leaves the tab aligned with the last good one
+            if state.frame_size == frame.size and state.profile is not None:
+                offset = state.offset + estimate_scroll_fine(state.profile, profile)
+                known_bands, known_groups = state.bands, state.groups
+            else:
+                offset = 0
+                known_bands, known_groups = {}, {}
+
+            visible = {}
+            thumbs = {}
+            dirty = set()
+            changed = set()
+            for k in range(offset // band_height, (offset + full_height - 1) // band_height + 1):
+                # Align partial edge bands inward to the reduction grid
+                y0 = -(-max(k * band_height, offset) // factor) * factor
+                y1 = (min((k + 1) * band_height, offset + full_height) // factor) * factor
+                if y1 <= y0:
+                    continue
+                visible[k] = (y0, y1)
+                thumbs[k] = self._thumb(gray, offset, y0, y1, factor)
+                status = self._changed(known_bands.get(k), thumbs[k], y0, y1, factor)
+                if status is not None:
+                    dirty.add(k)
+                if status == self.CHANGED:
+                    changed.add(k)
+
+            # Text is shared by every band of one OCR call, so a band whose
+            # pixels changed invalidates the rest of its group. Bands that only
+            # gained rows at a frame edge are re-read on their own.
+            for k in changed:
+                group = known_groups[known_bands[k]['group']]
+                dirty.update(b for b in group['bands'] if b in visible)
+
+            # Regions are capped so a later change re-reads a few bands, not
+            # everything that happened to be OCR'd alongside it
+            regions = []
+            for k in sorted(dirty):
+                if regions and regions[-1][-1] == k - 1 and len(regions[-1]) < self.max_region_bands:
+                    regions[-1].append(k)
+                else:
+                    regions.append([k])
+
+            crops = []
+            for region in regions:
+                top = visible[region[0]][0] - offset
+                bottom = visible[region[-1]][1] - offset
+                buffer = io.BytesIO()
+                frame.crop((0, top, full_width, bottom)).save(buffer, format='PNG')
+                crops.append((buffer.getvalue(), full_width * (bottom - top)))
+
+            if len(crops) > 1:
+                with ContextThreadPoolExecutor(max_workers=min(len(crops), Config.AI_MAX_CONCURRENCY)) as executor:
+                    results = list(executor.map(lambda crop: self.ocr_func(crop[0]), crops))
+            else:
+                results = [self.ocr_func(crop[0]) for crop in crops]
+
+            failed = [r for r in results if not r.get('success')]
+            if failed:
+                return {'success': False, 'error': failed[0].get('error', 'OCR failed')}
+
+            bands = {}
+            groups = {}
+            for k in visible:
+                if k not in dirty:
+                    band = known_bands[k]
+                    bands[k] = band
+                    groups.setdefault(band['group'], known_groups[band['group']])
+
+            for region, result in zip(regions, results):
+                group_id = state.next_group
+                state.next_group += 1
+                groups[group_id] = {'text': result.get('text', ''), 'bands': set(region)}
+                for k in region:
+                    y0, y1 = visible[k]
+                    bands[k] = {'y0': y0, 'y1': y1, 'thumb': thumbs[k], 'group': group_id}
+
+            for group in groups.values():
+                group['bands'] = {k for k in group['bands'] if k in bands}
+
+            state.offset = offset
+            state.bands = bands
+            state.groups = groups
+            state.frame_size = frame.size
+            state.profile = profile
+
+            uploaded = sum(area for _, area in crops)
+            state.frames += 1
+            state.pixels_total += full_width * full_height
+            state.pixels_uploaded += uploaded
+
+            ordered_groups = []
+            for k in sorted(bands):
+                group_id = bands[k]['group']
+                if group_id not in ordered_groups:
+                    ordered_groups.append(group_id)
+
+            return {
+                'success': True,
+                'text': '\n'.join(groups[g]['text'] for g in ordered_groups if groups[g]['text']),
+                'regions_uploaded': len(crops),
+                'uploaded_fraction': uploaded / (full_width * full_height),
+                'scroll_offset': offset,
+                'session': self._session_stats(state)
+            }
+
+    def _session_stats(self, state):
+        return {
+            'frames': state.frames,
+            'pixels_total': state.pixels_total,
+            'pixels_uploaded': state.pixels_uploaded,
+            'uploaded_fraction': state.pixels_uploaded / state.pixels_total if state.pixels_total else 0.0
+        }
+
+    def session_stats(self, tab_id):
+        with self._lock:
+            state = self._tabs.get(tab_id)
+        if state is None:
+            return None
+        with state.lock:
+            return self._session_stats(state)
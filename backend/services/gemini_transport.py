@@ -0,0 +1,216 @@
+import json
+import os
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from backend.config import Config
+from backend.services.resilience import CircuitBreaker, RetryBudget
+from backend.services.usage_service import get_usage_meter
+
+class GeminiTransport:
+    """Keep-alive HTTP transport and retry policy shared by the Gemini services.
+
+    One instance owns a pooled requests.Session; it is safe to call from many
+    threads at once. Hooks registered with add_hook are called after every
+    logical call with a dict describing its outcome and timing.
+
+    Calls are guarded by a circuit breaker and a retry budget shared by every
+    thread in the process, and each call is bounded by a deadline covering
+    all attempts and backoff sleeps.
+    """
+    RETRY_STATUSES = (429, 503)
+
+    def __init__(self, pool_size=None, backoff_base=None, backoff_max=None, deadline=None,
+                 breaker=None, retry_budget=None):
+        self.pool_size = pool_size or Config.GEMINI_POOL_SIZE
+        self.backoff_base = backoff_base if backoff_base is not None else Config.GEMINI_BACKOFF_BASE
+        self.backoff_max = backoff_max if backoff_max is not None else Config.GEMINI_BACKOFF_MAX
+        self.deadline = deadline if deadline is not None else Config.GEMINI_CALL_DEADLINE
+        self.breaker = breaker or CircuitBreaker(
+            error_rate=Config.GEMINI_BREAKER_ERROR_RATE,
+            min_requests=Config.GEMINI_BREAKER_MIN_REQUESTS,
+            window=Config.GEMINI_BREAKER_WINDOW,
+            cooldown=Config.GEMINI_BREAKER_COOLDOWN
+        )
+        self.retry_budget = retry_budget or RetryBudget(
+            ratio=Config.GEMINI_RETRY_BUDGET_RATIO,
+            min_retries=Config.GEMINI_RETRY_BUDGET_MIN
+        )
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self._hooks = []
+
+    def add_hook(self, hook):
+        self._hooks.append(hook)
+
+    def remove_hook(self, hook):
+        if hook in self._hooks:
+            self._hooks.remove(hook)
+
+    def _emit(self, event):
+        for hook in list(self._hooks):
+            try:
+                hook(event)
+            except Exception:
+                pass
+
+    @staticmethod
+    def _candidate_text(body):
+        if 'candidates' in body and len(body['candidates']) > 0:
+            content = body['candidates'][0].get('content', {})
+            parts_out = content.get('parts', [])
+
+            if parts_out and len(parts_out) > 0:
+                return parts_out[0].get('text', '')
+        return ''
+
+    @staticmethod
+    def stream_url():
+        return Config.GEMINI_API_URL.replace(':generateContent', ':streamGenerateContent')
+
+    def _read_stream(self, response, on_text, fragments):
+        """Consume a server-sent-events body, handing each text fragment to on_text"""
+        body = {}
+        for line in response.iter_lines():
+            if not line.startswith(b'data:'):
+                continue
+            chunk = json.loads(line[5:])
+            fragment = self._candidate_text(chunk)
+            if fragment:
+                fragments.append(fragment)
+                on_text(fragment)
+            # The last chunk carries finishReason and usageMetadata
+            body = chunk
+        return ''.join(fragments), body
+
+    def _backoff(self, attempt):
+        return min(self.backoff_base * (2 ** (attempt - 1)), self.backoff_max)
+
+    def generate(self, parts, timeout, service='gemini', max_retries=5, api_key=None, on_text=None):
+        """POST a generateContent request and return the first candidate's text.
+
+        Returns {'success': True, 'text': ..., 'response': ...} or
+        {'success': False, 'error': ...}, matching the services' result style.
+
+        With on_text, the request goes to streamGenerateContent and on_text is
+        called with each text fragment as it arrives; the return value is the
+        same. Once a fragment has been delivered the call is not retried, so
+        on_text never sees a fragment twice.
+        """
+        key = api_key or Config.GEMINI_API_KEY
+        if on_text is None:
+            url = f"{Config.GEMINI_API_URL}?key={key}"
+        else:
+            url = f"{self.stream_url()}?alt=sse&key={key}"
+        payload = {'contents': [{'parts': parts}]}
+        fragments = []
+
+        start = time.perf_counter()
+        deadline = start + self.deadline
+        attempts = 0
+        status = None
+        result = {'success': False, 'error': 'Max retries exceeded'}
+
+        self.retry_budget.record_request()
+
+        while attempts < max_retries:
+            if not self.breaker.allow():
+                if attempts == 0:
+                    result = {'success': False, 'error': 'Gemini circuit open, failing fast'}
+                break
+
+            attempts += 1
+            remaining = deadline - time.perf_counter()
+            healthy = False
+            response = None
+            try:
+                response = self.session.post(
+                    url,
+                    json=payload,
+                    timeout=min(timeout, max(remaining, 0.1)),
+                    stream=on_text is not None
+                )
+                status = response.status_code
+                # Client errors are the caller's fault, not a sign of an unhealthy upstream
+                healthy = status < 500 and status != 429
+
+                if response.status_code == 200:
+                    # A 200 whose body cannot be read counts against the breaker
+                    healthy = False
+                    if on_text is None:
+                        body = response.json()
+                        text = self._candidate_text(body)
+                    else:
+                        text, body = self._read_stream(response, on_text, fragments)
+
+                    result = {'success': True, 'text': text, 'response': body}
+                    self.breaker.record(True)
+                    break
+
+                elif response.status_code in self.RETRY_STATUSES:
+                    result = {'success': False, 'error': 'Service unavailable after retries'}
+
+                else:
+                    result = {'success': False, 'error': f'HTTP {response.status_code}: {response.text}'}
+                    self.breaker.record(healthy)
+                    break
+
+            except requests.exceptions.Timeout:
+                result = {'success': False, 'error': 'Timeout after retries'}
+
+            except Exception as e:
+                result = {'success': False, 'error': str(e)}
+
+            finally:
+                # Streamed bodies hold their pooled connection until read or closed
+                if response is not None:
+                    response.close()
+
+            self.breaker.record(healthy)
+
+            if attempts >= max_retries or fragments:
+                break
+
+            delay = self._backoff(attempts)
+            if time.perf_counter() + delay >= deadline:
+                break
+            if not self.retry_budget.try_acquire():
+                break
+            time.sleep(delay)
+
+        usage = result.get('response', {}).get('usageMetadata', {}) if result['success'] else {}
+        self._emit({
+            'service': service,
+            'streamed': on_text is not None,
+            'success': result['success'],
+            'status': status,
+            'attempts': attempts,
+            'retries': max(attempts - 1, 0),
+            'breaker_state': self.breaker.state,
+            'latency': time.perf_counter() - start,
+            'request_bytes': sum(len(p.get('text', '')) + len(p.get('inline_data', {}).get('data', '')) for p in parts),
+            'response_bytes': len(result.get('text', '')),
+            'prompt_tokens': usage.get('promptTokenCount', 0),
+            'output_tokens': usage.get('candidatesTokenCount', 0),
+            'total_tokens': usage.get('totalTokenCount', 0)
+        })
+
+        return result
+
+_transport = None
+_transport_pid = None
+_transport_lock = threading.Lock()
+
+def get_transport():
+    """Return this worker's shared transport, rebuilding it after a fork"""
+    global _transport, _transport_pid
+    if _transport is None or _transport_pid != os.getpid():
+        with _transport_lock:
+            if _transport is None or _transport_pid != os.getpid():
+                _transport = GeminiTransport()
+                _transport.add_hook(get_usage_meter().record)
+                _transport_pid = os.getpid()
+    return _transport
@@ -0,0 +1,288 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from backend.config import Config
+from backend.services.usage_service import attribute_usage
+
+class JobQueue:
+    """Durable SQLite-backed queue for OCR and analysis work.
+
+    Submitting only inserts a row, so ingest latency does not depend on
+    Gemini. Any process sharing the database file can claim jobs; a job
+    whose worker died is reclaimed once its lease expires, until it has
+    used max_attempts. A failed job waits retry_backoff seconds, doubling
+    with every attempt, before it is claimed again.
+    """
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+
+    def __init__(self, path, lease_seconds=120, max_attempts=3, retry_backoff=5.0, max_backoff=300.0):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.max_backoff = max_backoff
+        self._local = threading.local()
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+
+        conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS jobs ('
+            'id TEXT PRIMARY KEY, kind TEXT NOT NULL, user_id INTEGER, '
+            'payload TEXT NOT NULL, status TEXT NOT NULL, result TEXT, error TEXT, '
+            'attempts INTEGER NOT NULL DEFAULT 0, lease_expires_at REAL, '
+            'created_at REAL NOT NULL, started_at REAL, finished_at REAL, run_after REAL)'
+        )
+        # Queue files created before run_after existed
+        if 'run_after' not in {row['name'] for row in conn.execute('PRAGMA table_info(jobs)')}:
+            try:
+                conn.execute('ALTER TABLE jobs ADD COLUMN run_after REAL')
+            except sqlite3.OperationalError:
+                # Another process added it first
+                pass
+        conn.execute('CREATE INDEX IF NOT EXISTS ix_jobs_status_created ON jobs (status, created_at)')
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    def submit(self, kind, payload, user_id=None):
+        job_id = uuid.uuid4().hex
+        self._connect().execute(
+            'INSERT INTO jobs (id, kind, user_id, payload, status, created_at) VALUES (?, ?, ?, ?, ?, ?)',
+            (job_id, kind, user_id, json.dumps(payload), self.QUEUED, time.time())
+        )
+        return job_id
+
+    def get(self, job_id):
+        row = self._connect().execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        if row is None:
+            return None
+
+        return {
+            'id': row['id'],
+            'kind': row['kind'],
+            'user_id': row['user_id'],
+            'status': row['status'],
+            'result': json.loads(row['result']) if row['result'] else None,
+            'error': row['error'],
+            'attempts': row['attempts'],
+            'created_at': row['created_at'],
+            'started_at': row['started_at'],
+            'finished_at': row['finished_at']
+        }
+
+    def claim(self):
+        """Atomically take the oldest runnable job, or return None"""
+        conn = self._connect()
+        now = time.time()
+
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            # A job that took its worker down on every attempt is not handed out again
+            conn.execute(
+                'UPDATE jobs SET status = ?, error = ?, finished_at = ?, lease_expires_at = NULL '
+                'WHERE status = ? AND lease_expires_at < ? AND attempts >= ?',
+                (self.FAILED, 'Lease expired on every attempt', now, self.RUNNING, now, self.max_attempts)
+            )
+            row = conn.execute(
+                'SELECT id, kind, payload, attempts, user_id FROM jobs '
+                'WHERE (status = ? AND (run_after IS NULL OR run_after <= ?)) '
+                'OR (status = ? AND lease_expires_at < ? AND attempts < ?) '
+                'ORDER BY created_at LIMIT 1',
+                (self.QUEUED, now, self.RUNNING, now, self.max_attempts)
+            ).fetchone()
+
+            if row is None:
+                conn.execute('COMMIT')
+                return None
+
+            conn.execute(
+                'UPDATE jobs SET status = ?, attempts = attempts + 1, lease_expires_at = ?, started_at = ? WHERE id = ?',
+                (self.RUNNING, now + self.lease_seconds, now, row['id'])
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+        return {
+            'id': row['id'],
+            'kind': row['kind'],
+            'payload': json.loads(row['payload']),
+            'attempts': row['attempts'] + 1,
+            'user_id': row['user_id']
+        }
+
+    def complete(self, job_id, result):
+        self._connect().execute(
+            'UPDATE jobs SET status = ?, result = ?, finished_at = ?, lease_expires_at = NULL WHERE id = ?',
+            (self.DONE, json.dumps(result), time.time(), job_id)
+        )
+
+    def fail(self, job_id, error, attempts):
+        # Requeue until max_attempts so a crashed handler gets another try, after a backoff
+        now = time.time()
+        status = self.FAILED if attempts >= self.max_attempts else self.QUEUED
+        run_after = now + min(self.retry_backoff * 2 ** (attempts - 1), self.max_backoff)
+        self._connect().execute(
+            'UPDATE jobs SET status = ?, error = ?, finished_at = ?, lease_expires_at = NULL, run_after = ? WHERE id = ?',
+            (status, error, now, run_after, job_id)
+        )
+
+    def purge_finished(self, older_than):
+        cursor = self._connect().execute(
+            'DELETE FROM jobs WHERE status IN (?, ?) AND finished_at < ?',
+            (self.DONE, self.FAILED, time.time() - older_than)
+        )
+        return cursor.rowcount
+
+    def counts(self):
+        rows = self._connect().execute('SELECT status, COUNT(*) FROM jobs GROUP BY status').fetchall()
+        return {status: count for status, count in rows}
+
+class JobWorkerPool:
+    """Background threads that drain a JobQueue using registered handlers"""
+
+    def __init__(self, queue, handlers, workers=2, poll_interval=0.5):
+        self.queue = queue
+        self.handlers = handlers
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._threads = []
+        self._lock = threading.Lock()
+        self._pid = None
+
+    def ensure_started(self):
+        # Threads do not survive fork, so each worker process starts its own
+        if self._pid == os.getpid() and self._threads:
+            return
+        with self._lock:
+            if self._pid == os.getpid() and self._threads:
+                return
+            self._pid = os.getpid()
+            self._stop.clear()
+            self._threads = [
+                threading.Thread(target=self._run, name=f'job-worker-{i}', daemon=True)
+                for i in range(self.workers)
+            ]
+            for thread in self._threads:
+                thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout=5)
+        self._threads = []
+
+    def notify(self):
+        self._wakeup.set()
+
+    def run_once(self):
+        """Process a single job; return False when the queue is empty"""
+        job = self.queue.claim()
+        if job is None:
+            return False
+
+        handler = self.handlers.get(job['kind'])
+        try:
+            if handler is None:
+                raise ValueError(f"No handler for job kind {job['kind']}")
+            with attribute_usage(job['user_id']):
+                result = handler(job['payload'])
+        except Exception as e:
+            self.queue.fail(job['id'], str(e), job['attempts'])
+        else:
+            # Services report Gemini errors as {'success': False}; retry those like exceptions
+            if isinstance(result, dict) and result.get('success') is False:
+                self.queue.fail(job['id'], str(result.get('error', 'Job failed')), job['attempts'])
+            else:
+                self.queue.complete(job['id'], result)
+        return True
+
+    def _run(self):
+        last_purge = 0
+        while not self._stop.is_set():
+            try:
+                if self.run_once():
+                    continue
+                if time.time() - last_purge > 3600:
+                    self.queue.purge_finished(Config.JOB_RETENTION_SECONDS)
+                    last_purge = time.time()
+            except sqlite3.Error:
+                pass
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+
+def _run_ocr(payload):
+    from backend.services.ocr_service import OCRService
+    return OCRService.extract_text(payload['image'])
+
+def _run_frame_ocr(payload):
+    from backend.services.ocr_service import OCRService
+    return OCRService.extract_frame_text(payload['tab'], payload['image'])
+
+def _run_text_analysis(payload):
+    from backend.services.ai_service import AIService
+    return AIService.analyze_text(payload['text'])
+
+def _run_screenshot_analysis(payload):
+    from backend.services.ai_service import AIService
+    return AIService.analyze_screenshot(payload['image'], mode=payload.get('mode'))
+
+JOB_HANDLERS = {
+    'ocr': _run_ocr,
+    'ocr_frame': _run_frame_ocr,
+    'analyze_text': _run_text_analysis,
+    'analyze_screenshot': _run_screenshot_analysis
+}
+
+_job_queue = None
+_worker_pool = None
+_init_lock = threading.Lock()
+
+def get_job_queue():
+    global _job_queue
+    if _job_queue is None:
+        with _init_lock:
+            if _job_queue is None:
+                _job_queue = JobQueue(
+                    Config.JOB_QUEUE_PATH,
+                    lease_seconds=Config.JOB_LEASE_SECONDS,
+                    max_attempts=Config.JOB_MAX_ATTEMPTS,
+                    retry_backoff=Config.JOB_RETRY_BACKOFF
+                )
+    return _job_queue
+
+def get_worker_pool():
+    global _worker_pool
+    if _worker_pool is None:
+        with _init_lock:
+            if _worker_pool is None:
+                _worker_pool = JobWorkerPool(get_job_queue(), JOB_HANDLERS, workers=Config.JOB_WORKERS)
+    return _worker_pool
+
+def submit_job(kind, payload, user_id=None):
+    """Queue a job and wake this process's workers; create_app starts them on the first request"""
+    job_id = get_job_queue().submit(kind, payload, user_id=user_id)
+
+    pool = get_worker_pool()
+    if pool.workers > 0:
+        pool.ensure_started()
+        pool.notify()
+
+    return job_id
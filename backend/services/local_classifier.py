@@ -0,0 +1,190 @@
+import json
+import os
+import threading
+import time
+import zlib
+import numpy as np
+from backend.config import Config
+from backend.utils.text import tokenize
+
+NONE_LABEL = 'none'
+
+def hash_features(texts, bits=16):
+    """Hashed word unigram and bigram counts as sparse COO arrays.
+
+    Returns (rows, cols, values) sorted by row. Every row gets a constant
+    bias feature in column 2 ** bits, so no row is empty. Values are log
+    term frequencies scaled to unit L2 norm per row. CRC32 is used rather
+    than hash() so feature indices are stable across processes.
+    """
+    mask = (1 << bits) - 1
+    bias = 1 << bits
+    rows, cols, values = [], [], []
+
+    for row, text in enumerate(texts):
+        tokens = tokenize(text)
+        grams = tokens + [f'{a} {b}' for a, b in zip(tokens, tokens[1:])]
+
+        counts = {}
+        for gram in grams:
+            index = zlib.crc32(gram.encode('utf-8')) & mask
+            counts[index] = counts.get(index, 0) + 1
+
+        rows.extend([row] * (len(counts) + 1))
+        cols.extend(counts)
+        cols.append(bias)
+        values.extend(counts.values())
+        values.append(0)
+
+    rows = np.asarray(rows, dtype=np.int64)
+    cols = np.asarray(cols, dtype=np.int64)
+    values = np.log1p(np.asarray(values, dtype=np.float32))
+
+    # Normalise the n-gram part of each row; the bias feature stays at 1
+    norms = np.sqrt(np.bincount(rows, weights=values * values, minlength=len(texts)))
+    values = values / np.maximum(norms[rows], 1e-12)
+    values[cols == bias] = 1.0
+
+    return rows, cols, values.astype(np.float32)
+
+def _row_starts(rows, count):
+    return np.searchsorted(rows, np.arange(count))
+
+def _softmax(scores):
+    scores = scores - scores.max(axis=1, keepdims=True)
+    np.exp(scores, out=scores)
+    scores /= scores.sum(axis=1, keepdims=True)
+    return scores
+
+class LocalClassifier:
+    """Multinomial logistic regression over hashed n-grams.
+
+    One of the labels is NONE_LABEL; the probability of any other label is
+    the detection confidence, and the most likely other label is the
+    pattern type.
+    """
+
+    def __init__(self, weights, labels, bits=16, metadata=None):
+        self.weights = weights
+        self.labels = list(labels)
+        self.bits = bits
+        self.metadata = metadata or {}
+        self._none = self.labels.index(NONE_LABEL) if NONE_LABEL in self.labels else None
+
+    @classmethod
+    def train(cls, texts, labels, bits=16, epochs=200, learning_rate=0.1, l2=1e-4):
+        """Fit by full-batch Adam on the softmax cross-entropy"""
+        classes = sorted(set(labels))
+        if len(classes) < 2:
+            raise ValueError('Training needs at least two distinct labels')
+
+        rows, cols, values = hash_features(texts, bits)
+        count = len(texts)
+        starts = _row_starts(rows, count)
+        targets = np.zeros((count, len(classes)), dtype=np.float32)
+        targets[np.arange(count), [classes.index(label) for label in labels]] = 1.0
+
+        weights = np.zeros(((1 << bits) + 1, len(classes)), dtype=np.float32)
+        first = np.zeros_like(weights)
+        second = np.zeros_like(weights)
+        touched = np.unique(cols)
+
+        for step in range(1, epochs + 1):
+            scores = np.add.reduceat(weights[cols] * values[:, None], starts, axis=0)
+            error = (_softmax(scores) - targets) / count
+
+            gradient = np.zeros_like(weights)
+            contributions = error[rows] * values[:, None]
+            for k in range(len(classes)):
+                gradient[:, k] = np.bincount(cols, weights=contributions[:, k], minlength=len(weights))
+            gradient[touched] += l2 * weights[touched]
+
+            # Adam, restricted to features that occur so unseen ones stay zero
+            first[touched] = 0.9 * first[touched] + 0.1 * gradient[touched]
+            second[touched] = 0.999 * second[touched] + 0.001 * gradient[touched] ** 2
+            corrected_first = first[touched] / (1 - 0.9 ** step)
+            corrected_second = second[touched] / (1 - 0.999 ** step)
+            weights[touched] -= learning_rate * corrected_first / (np.sqrt(corrected_second) + 1e-8)
+
+        metadata = {
+            'trained_at': time.time(),
+            'examples': count,
+            'class_counts': {label: labels.count(label) for label in classes},
+            'epochs': epochs
+        }
+        return cls(weights, classes, bits=bits, metadata=metadata)
+
+    def predict_proba(self, texts):
+        """Class probabilities for a batch of texts, shape (len(texts), len(labels))"""
+        texts = list(texts)
+        if not texts:
+            return np.zeros((0, len(self.labels)), dtype=np.float32)
+
+        rows, cols, values = hash_features(texts, self.bits)
+        scores = np.add.reduceat(self.weights[cols] * values[:, None], _row_starts(rows, len(texts)), axis=0)
+        return _softmax(scores)
+
+    def classify(self, texts):
+        """Verdicts shaped like AIService results, minus description and elements"""
+        probabilities = self.predict_proba(texts)
+
+        if self._none is None:
+            detection = probabilities.max(axis=1)
+            pattern = probabilities.argmax(axis=1)
+        else:
+            detection = 1.0 - probabilities[:, self._none]
+            others = probabilities.copy()
+            others[:, self._none] = -1.0
+            pattern = others.argmax(axis=1)
+
+        return [{
+            'detected': bool(confidence >= 0.5),
+            'pattern_type': self.labels[index],
+            'confidence_score': round(float(confidence), 4)
+        } for confidence, index in zip(detection, pattern)]
+
+    def save(self, path):
+        """Write the non-zero weight rows as float16 to a compressed .npz"""
+        nonzero = np.flatnonzero(np.any(self.weights != 0, axis=1))
+        with open(path, 'wb') as f:
+            np.savez_compressed(
+                f,
+                index=nonzero.astype(np.int32),
+                weights=self.weights[nonzero].astype(np.float16),
+                labels=np.array(self.labels),
+                bits=np.array(self.bits),
+                metadata=np.array(json.dumps(self.metadata))
+            )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as artifact:
+            bits = int(artifact['bits'])
+            labels = [str(label) for label in artifact['labels']]
+            weights = np.zeros(((1 << bits) + 1, len(labels)), dtype=np.float32)
+            weights[artifact['index']] = artifact['weights']
+            metadata = json.loads(str(artifact['metadata']))
+        return cls(weights, labels, bits=bits, metadata=metadata)
+
+_classifier = None
+_classifier_version = None
+_classifier_lock = threading.Lock()
+
+def get_local_classifier():
+    """Return the model at LOCAL_MODEL_PATH, reloading it when the file changes.
+
+    Returns None when no model has been trained yet.
+    """
+    global _classifier, _classifier_version
+    path = Config.LOCAL_MODEL_PATH
+    try:
+        version = (path, os.path.getmtime(path))
+    except OSError:
+        return None
+
+    if _classifier is None or _classifier_version != version:
+        with _classifier_lock:
+            if _classifier is None or _classifier_version != version:
+                _classifier = LocalClassifier.load(path)
+                _classifier_version = version
+    return _classifier
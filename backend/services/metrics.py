@@ -0,0 +1,56 @@
+import bisect
+
+def _default_bounds():
+    # 0.1 ms to ~2 minutes in x1.5 steps
+    return [0.0001 * 1.5 ** i for i in range(36)]
+
+class Histogram:
+    """Fixed-bucket histogram of durations in seconds.
+
+    Buckets grow geometrically, so percentiles are reported as the upper
+    bound of the bucket they fall in: accurate to within one x1.5 step
+    whatever the scale. Not thread-safe; callers hold their own lock.
+    """
+
+    def __init__(self, bounds=None):
+        self.bounds = bounds or _default_bounds()
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def percentile(self, fraction):
+        if not self.count:
+            return 0.0
+
+        rank = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return self.bounds[index] if index < len(self.bounds) else self.max
+        return self.max
+
+    def snapshot(self):
+        """Summary in milliseconds"""
+        return {
+            'count': self.count,
+            'mean_ms': round(self.total / self.count * 1000, 3) if self.count else 0.0,
+            'p50_ms': round(self.percentile(0.5) * 1000, 3),
+            'p95_ms': round(self.percentile(0.95) * 1000, 3),
+            'p99_ms': round(self.percentile(0.99) * 1000, 3),
+            'max_ms': round(self.max * 1000, 3)
+        }
+
+    def merge(self, other):
+        """Add another histogram with the same bounds into this one"""
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
@@ -0,0 +1,142 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+HASH_BITS = 64
+
+def hamming_distance(a, b):
+    return bin(a ^ b).count('1')
+
+def _segments(max_distance, bits=HASH_BITS):
+    # Pigeonhole: with max_distance + 1 disjoint segments, two hashes within
+    # max_distance bits of each other agree exactly on at least one segment
+    count = max_distance + 1
+    size, extra = divmod(bits, count)
+    segments = []
+    shift = bits
+    for i in range(count):
+        width = size + (1 if i < extra else 0)
+        shift -= width
+        segments.append((shift, (1 << width) - 1))
+    return segments
+
+class OCRCache:
+    """Bounded OCR text cache with exact and perceptual-hash lookup.
+
+    Exact hits are keyed by SHA-256 of the image bytes. Near-duplicate frames
+    are found by dHash within max_distance bits using multi-index hashing:
+    each hash is split into max_distance + 1 segments and indexed per
+    segment, so a lookup only compares against entries sharing a segment.
+
+    Perceptual matches are only made within a scope (the user the frame
+    came from), so one user's screenshot text is never served for another
+    user's similar-looking frame. Exact hits need identical bytes and are
+    shared.
+    """
+
+    def __init__(self, maxsize=2048, max_bytes=32 * 1024 * 1024, ttl=3600, max_distance=4):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.max_distance = max_distance
+        self._segments = _segments(max_distance)
+        self._entries = OrderedDict()
+        self._index = [{} for _ in self._segments]
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {'exact_hits': 0, 'perceptual_hits': 0, 'misses': 0, 'evictions': 0}
+
+    @staticmethod
+    def content_hash(data):
+        return hashlib.sha256(data).hexdigest()
+
+    def _segment_keys(self, phash):
+        return [(phash >> shift) & mask for shift, mask in self._segments]
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self._bytes -= entry['size']
+        if entry['phash'] is not None:
+            for index, segment in zip(self._index, self._segment_keys(entry['phash'])):
+                bucket = index.get((entry['scope'], segment))
+                if bucket is not None:
+                    bucket.discard(key)
+                    if not bucket:
+                        del index[(entry['scope'], segment)]
+
+    def _expired(self, entry, now):
+        return entry['expires_at'] < now
+
+    def get_exact(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or self._expired(entry, time.time()):
+                if entry is not None:
+                    self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            self._stats['exact_hits'] += 1
+            return entry['text']
+
+    def get_similar(self, phash, scope=None):
+        """Return (text, distance) of the closest cached frame stored under scope, or None"""
+        if phash is None:
+            return None
+
+        with self._lock:
+            now = time.time()
+            best = None
+            seen = set()
+            for index, segment in zip(self._index, self._segment_keys(phash)):
+                for key in index.get((scope, segment), ()):
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    distance = hamming_distance(phash, self._entries[key]['phash'])
+                    if distance <= self.max_distance and (best is None or distance < best[1]):
+                        best = (key, distance)
+
+            if best is None:
+                return None
+
+            key, distance = best
+            entry = self._entries[key]
+            if self._expired(entry, now):
+                self._remove(key)
+                return None
+
+            self._entries.move_to_end(key)
+            self._stats['perceptual_hits'] += 1
+            return entry['text'], distance
+
+    def record_miss(self):
+        with self._lock:
+            self._stats['misses'] += 1
+
+    def set(self, key, phash, text, scope=None):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            size = len(text.encode('utf-8'))
+            self._entries[key] = {'phash': phash, 'scope': scope, 'text': text, 'size': size,
+                                  'expires_at': time.time() + self.ttl}
+            self._bytes += size
+            if phash is not None:
+                for index, segment in zip(self._index, self._segment_keys(phash)):
+                    index.setdefault((scope, segment), set()).add(key)
+
+            while self._entries and (len(self._entries) > self.maxsize or self._bytes > self.max_bytes):
+                self._remove(next(iter(self._entries)))
+                self._stats['evictions'] += 1
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+            stats['text_bytes'] = self._bytes
+
+        lookups = stats['exact_hits'] + stats['perceptual_hits'] + stats['misses']
+        stats['hit_rate'] = (stats['exact_hits'] + stats['perceptual_hits']) / lookups if lookups else 0.0
+        return stats
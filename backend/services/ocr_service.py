@@ -1,87 +1,167 @@
-import requests
-import time
 import base64
-import json
+import functools
+import threading
+import time
 from backend.config import Config
+from backend.services.gemini_transport import get_transport
+from backend.services.ocr_cache import OCRCache
+from backend.services.frame_diff import FrameDiffOCR
+from backend.services.usage_service import attributed_user
+from backend.utils.image_preprocessing import preprocess_image, decode_image_data, compute_dhash
+
+_ocr_cache = None
+_ocr_cache_lock = threading.Lock()
+
+def get_ocr_cache():
+    """Return the process-wide OCR result cache, or None when disabled"""
+    global _ocr_cache
+    if not Config.OCR_CACHE_ENABLED:
+        return None
+    if _ocr_cache is None:
+        with _ocr_cache_lock:
+            if _ocr_cache is None:
+                _ocr_cache = OCRCache(
+                    maxsize=Config.OCR_CACHE_SIZE,
+                    max_bytes=Config.OCR_CACHE_MAX_BYTES,
+                    ttl=Config.OCR_CACHE_TTL,
+                    max_distance=Config.OCR_CACHE_MAX_DISTANCE
+                )
+    return _ocr_cache
+
+_frame_diff = None
+
+def get_frame_diff():
+    """Return the process-wide per-tab frame differ"""
+    global _frame_diff
+    if _frame_diff is None:
+        with _ocr_cache_lock:
+            if _frame_diff is None:
+                _frame_diff = FrameDiffOCR(
+                    # Band crops are small and alike, so a perceptual match would often be another band's text
+                    functools.partial(OCRService.extract_text, perceptual=False),
+                    width=Config.OCR_FRAME_DIFF_WIDTH,
+                    band_height=Config.OCR_FRAME_DIFF_BAND_HEIGHT,
+                    tolerance=Config.OCR_FRAME_DIFF_TOLERANCE,
+                    max_tabs=Config.OCR_FRAME_DIFF_MAX_TABS,
+                    max_region_bands=Config.OCR_FRAME_DIFF_REGION_BANDS
+                )
+    return _frame_diff
 
 class OCRService:
+    OCR_PROMPT = 'Extract all visible text from this image. Return only the text content, no additional commentary.'
+    
     @staticmethod
-    def extract_text(image_data, max_retries=5):
-        url = f"{Config.GEMINI_API_URL}?key={Config.GEMINI_API_KEY}"
-        
-        if isinstance(image_data, bytes):
+    def image_part(image_data, preprocess):
+        """Build the inline_data request part for an image; returns (part, stats)"""
+        stats = None
+        if preprocess:
+            image_bytes, mime_type, stats = preprocess_image(
+                image_data,
+                max_dimension=Config.OCR_MAX_DIMENSION,
+                grayscale=Config.OCR_GRAYSCALE,
+                quality=Config.OCR_JPEG_QUALITY
+            )
+            image_base64 = base64.b64encode(image_bytes).decode()
+        elif isinstance(image_data, bytes):
             image_base64 = base64.b64encode(image_data).decode()
+            mime_type = 'image/jpeg'
         else:
             image_base64 = image_data
+            mime_type = 'image/jpeg'
         
-        payload = {
-            'contents': [{
-                'parts': [
-                    {
-                        'inline_data': {
-                            'mime_type': 'image/jpeg',
-                            'data': image_base64
-                        }
-                    },
-                    {
-                        'text': 'Extract all visible text from this image. Return only the text content, no additional commentary.'
-                    }
-                ]
-            }]
+        part = {
+            'inline_data': {
+                'mime_type': mime_type,
+                'data': image_base64
+            }
         }
+        return part, stats
+    
+    @staticmethod
+    def extract_text(image_data, max_retries=5, preprocess=None, perceptual=True):
+        """OCR an image through the Gemini transport and the OCR cache.
+        
+        perceptual=False limits the cache to exact content hits and keeps
+        the result out of the perceptual index.
+        """
+        start = time.perf_counter()
         
-        retry_count = 0
-        delay = 1
+        if preprocess is None:
+            preprocess = Config.OCR_PREPROCESS_ENABLED
         
-        while retry_count < max_retries:
+        cache = get_ocr_cache()
+        cache_key = phash = None
+        # Perceptual matches stay within one user's frames; see OCRCache
+        scope = attributed_user()
+        
+        if cache is not None:
             try:
-                response = requests.post(
-                    url,
-                    json=payload,
-                    timeout=Config.OCR_TIMEOUT
-                )
-                
-                if response.status_code == 200:
-                    result = response.json()
-                    
-                    if 'candidates' in result and len(result['candidates']) > 0:
-                        content = result['candidates'][0].get('content', {})
-                        parts = content.get('parts', [])
-                        
-                        if parts and len(parts) > 0:
-                            text = parts[0].get('text', '')
-                            return {'success': True, 'text': text}
-                    
-                    return {'success': True, 'text': ''}
-                
-                elif response.status_code in [429, 503]:
-                    retry_count += 1
-                    if retry_count < max_retries:
-                        time.sleep(delay)
-                        delay = min(delay * 2, 60)
-                        continue
-                    else:
-                        return {'success': False, 'error': 'Service unavailable after retries'}
-                
-                else:
-                    return {'success': False, 'error': f'HTTP {response.status_code}: {response.text}'}
-            
-            except requests.exceptions.Timeout:
-                retry_count += 1
-                if retry_count < max_retries:
-                    time.sleep(delay)
-                    delay = min(delay * 2, 60)
-                    continue
-                else:
-                    return {'success': False, 'error': 'Timeout after retries'}
+                image_data = decode_image_data(image_data)
+            except ValueError:
+                # Not decodable here; let Gemini judge it, uncached
+                cache = None
+        
+        if cache is not None:
+            cache_key = OCRCache.content_hash(image_data)
+            text = cache.get_exact(cache_key)
+            if text is not None:
+                return {'success': True, 'text': text, 'cache': 'exact'}
+        
+        try:
+            image_part, stats = OCRService.image_part(image_data, preprocess)
+        except ValueError as e:
+            return {'success': False, 'error': f'Invalid image: {e}'}
+        if stats is not None:
+            phash = stats['dhash']
+        
+        if cache is not None and perceptual:
+            if phash is None and not preprocess:
+                phash = compute_dhash(image_data)
             
-            except Exception as e:
-                retry_count += 1
-                if retry_count < max_retries:
-                    time.sleep(delay)
-                    delay = min(delay * 2, 60)
-                    continue
-                else:
-                    return {'success': False, 'error': str(e)}
-        
-        return {'success': False, 'error': 'Max retries exceeded'}
+            # Near-duplicate frames reuse the earlier text but are not stored
+            # themselves, so slowly drifting feeds cannot chain to stale text
+            similar = cache.get_similar(phash, scope=scope)
+            if similar is not None:
+                text, distance = similar
+                return {'success': True, 'text': text, 'cache': 'perceptual', 'distance': distance}
+        
+        if cache is not None:
+            cache.record_miss()
+        
+        parts = [
+            image_part,
+            {
+                'text': OCRService.OCR_PROMPT
+            }
+        ]
+        
+        response = get_transport().generate(
+            parts,
+            timeout=Config.OCR_TIMEOUT,
+            service='ocr',
+            max_retries=max_retries
+        )
+        
+        if not response['success']:
+            return response
+        
+        result = {'success': True, 'text': response['text']}
+        
+        if cache is not None:
+            cache.set(cache_key, phash if perceptual else None, response['text'], scope=scope)
+        
+        if stats is not None:
+            result['preprocessing'] = stats
+            result['latency_ms'] = round((time.perf_counter() - start) * 1000, 2)
+        
+        return result
+    
+    @staticmethod
+    def extract_frame_text(tab_id, image_data):
+        """OCR one frame of a tab's capture stream, uploading only changed regions"""
+        return get_frame_diff().extract_text(tab_id, image_data)
+    
+    @staticmethod
+    def cache_stats():
+        cache = get_ocr_cache()
+        return cache.stats() if cache is not None else None
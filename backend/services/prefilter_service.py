@@ -0,0 +1,87 @@
+import re
+
+# Mirrors the quickScan heuristics in chrome-extension/dark-pattern-detector.js.
+# Keep both lists in sync when adding patterns.
+PATTERN_FAMILIES = {
+    'confirm_shaming': [
+        r"no,?\s+(?:i\s+)?don'?t\s+want",
+        r'no\s+thanks,?\s+i\s+prefer',
+        r'i\s+hate\s+(?:saving|money|discounts)'
+    ],
+    'false_urgency': [
+        r'only\s+\d+\s+left',
+        r'\d+\s+people\s+viewing',
+        r'hurry',
+        r'limited\s+time',
+        r'expires\s+soon'
+    ],
+    'hidden_costs': [
+        r'\+\s*shipping',
+        r'additional\s+fees',
+        r'\*see\s+details'
+    ],
+    'sneaky_opt_in': [
+        r'newsletter',
+        r'marketing',
+        r'third.party',
+        r'partners'
+    ]
+}
+
+# Literal keywords at least one of which appears in every pattern above.
+# Plain substring checks are an order of magnitude faster than running the
+# combined regex, so text containing none of them is rejected without it.
+ANCHOR_KEYWORDS = (
+    'want', 'prefer', 'hate',
+    'left', 'viewing', 'hurry', 'limited', 'expires',
+    'shipping', 'fees', 'details',
+    'newsletter', 'marketing', 'party', 'partners'
+)
+
+SUSPICION_SCORES = {
+    'confirm_shaming': 0.8,
+    'false_urgency': 0.7,
+    'hidden_costs': 0.6,
+    'sneaky_opt_in': 0.9
+}
+
+def _compile(families):
+    # One alternation with a named group per family so a single pass over
+    # the text reports which family matched via match.lastgroup
+    groups = [
+        f'(?P<{name}>{"|".join(patterns)})'
+        for name, patterns in families.items()
+    ]
+    return re.compile('|'.join(groups), re.IGNORECASE)
+
+COMBINED_PATTERN = _compile(PATTERN_FAMILIES)
+
+def _may_match(text):
+    lowered = text.lower()
+    return any(keyword in lowered for keyword in ANCHOR_KEYWORDS)
+
+class PrefilterService:
+    @staticmethod
+    def has_match(text):
+        """Return True if any heuristic family matches the text"""
+        if not text or not _may_match(text):
+            return False
+        return COMBINED_PATTERN.search(text) is not None
+
+    @staticmethod
+    def scan(text):
+        """Return every heuristic match as a dict with family, snippet and score"""
+        if not text or not _may_match(text):
+            return []
+
+        return [{
+            'pattern': match.lastgroup,
+            'text': match.group(0),
+            'start': match.start(),
+            'suspicion_score': SUSPICION_SCORES[match.lastgroup]
+        } for match in COMBINED_PATTERN.finditer(text)]
+
+    @staticmethod
+    def families(text):
+        """Return the set of families that match the text"""
+        return {match['pattern'] for match in PrefilterService.scan(text)}
@@ -0,0 +1,143 @@
+import threading
+import time
+from collections import deque
+
+class CircuitBreaker:
+    """Process-wide breaker that fails fast while an upstream is unhealthy.
+
+    CLOSED: calls flow; outcomes are tracked over a sliding window and the
+    breaker opens once the error rate reaches error_rate (with at least
+    min_requests samples). OPEN: calls are refused until cooldown elapses.
+    HALF_OPEN: a single probe call is let through; success closes the
+    breaker, failure re-opens it for another cooldown.
+    """
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, error_rate=0.5, min_requests=10, window=30, cooldown=15, clock=time.monotonic):
+        self.error_rate = error_rate
+        self.min_requests = min_requests
+        self.window = window
+        self.cooldown = cooldown
+        self.clock = clock
+        self.state = self.CLOSED
+        self.opened_at = None
+        self.rejected = 0
+        self._outcomes = deque()
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def _trim(self, now):
+        while self._outcomes and self._outcomes[0][0] < now - self.window:
+            self._outcomes.popleft()
+
+    def _open(self, now):
+        self.state = self.OPEN
+        self.opened_at = now
+        self._probe_in_flight = False
+
+    def allow(self):
+        """Return True if a call may be attempted now"""
+        with self._lock:
+            now = self.clock()
+
+            if self.state == self.OPEN:
+                if now - self.opened_at < self.cooldown:
+                    self.rejected += 1
+                    return False
+                self.state = self.HALF_OPEN
+
+            if self.state == self.HALF_OPEN:
+                if self._probe_in_flight:
+                    self.rejected += 1
+                    return False
+                self._probe_in_flight = True
+
+            return True
+
+    def record(self, success):
+        with self._lock:
+            now = self.clock()
+
+            if self.state == self.HALF_OPEN:
+                if success:
+                    self.state = self.CLOSED
+                    self._outcomes.clear()
+                    self._probe_in_flight = False
+                else:
+                    self._open(now)
+                return
+
+            if self.state == self.OPEN:
+                return
+
+            self._outcomes.append((now, success))
+            self._trim(now)
+
+            total = len(self._outcomes)
+            failures = sum(1 for _, ok in self._outcomes if not ok)
+            if total >= self.min_requests and failures / total >= self.error_rate:
+                self._open(now)
+
+    def snapshot(self):
+        with self._lock:
+            self._trim(self.clock())
+            total = len(self._outcomes)
+            failures = sum(1 for _, ok in self._outcomes if not ok)
+            return {
+                'state': self.state,
+                'window_requests': total,
+                'window_failures': failures,
+                'rejected': self.rejected
+            }
+
+class RetryBudget:
+    """Caps retries to a fraction of recent traffic across all callers.
+
+    A retry is allowed while retries in the sliding window stay below
+    max(min_retries, ratio * requests), so concurrent requests cannot
+    multiply load on a struggling upstream with their backoff loops.
+    """
+
+    def __init__(self, ratio=0.2, min_retries=3, window=10, clock=time.monotonic):
+        self.ratio = ratio
+        self.min_retries = min_retries
+        self.window = window
+        self.clock = clock
+        self.exhausted = 0
+        self._requests = deque()
+        self._retries = deque()
+        self._lock = threading.Lock()
+
+    def _trim(self, now):
+        for events in (self._requests, self._retries):
+            while events and events[0] < now - self.window:
+                events.popleft()
+
+    def record_request(self):
+        with self._lock:
+            now = self.clock()
+            self._requests.append(now)
+            self._trim(now)
+
+    def try_acquire(self):
+        """Reserve one retry; return False if the budget is spent"""
+        with self._lock:
+            now = self.clock()
+            self._trim(now)
+            allowed = max(self.min_retries, self.ratio * len(self._requests))
+            if len(self._retries) >= allowed:
+                self.exhausted += 1
+                return False
+            self._retries.append(now)
+            return True
+
+    def snapshot(self):
+        with self._lock:
+            self._trim(self.clock())
+            return {
+                'window_requests': len(self._requests),
+                'window_retries': len(self._retries),
+                'exhausted': self.exhausted
+            }
@@ -0,0 +1,93 @@
+import numpy as np
+from backend.utils.text import tokenize
+
+# Valence per word: negative words are below zero. Tuned for the feed, news
+# and comment text the extension samples while a user is scrolling.
+LEXICON_TIERS = {
+    -1.0: '''abuse abused attack attacked catastrophe catastrophic collapse crisis dead deadly death deaths
+        destroyed devastating disaster doomed evil explosion genocide hate hated hatred hopeless horrific
+        horrible killed killing massacre murder murdered nightmare outrage panic rape shooting slaughter
+        suicide terror terrorist terrible threat tragedy tragic victims violence violent war worst''',
+    -0.6: '''afraid alarming angry anxiety anxious arrested awful bad betrayed blame broke broken chaos
+        conflict corrupt corruption crash cried crime crying damage danger dangerous depressed depression
+        desperate disgusting dying emergency enemy fail failed failing failure fear fears fight fired
+        flood fraud grief guilty harm hurt illness injured injury lies lonely lose losing loss lost mess
+        misery pain painful poor poverty protest recession riot sad scam scandal scared sick stress
+        stressed struggle struggling suffer suffering toxic trauma ugly unemployed upset warning weak
+        wildfire worried worry wrong''',
+    -0.3: '''annoying boring concern concerned confused controversial cringe decline delay difficult
+        disappointed disappointing doubt dull hard issue issues mad meh messy problem problems risk
+        risky rumor shame tired tough unfortunately unhappy unpopular waste weird''',
+    0.3: '''agree better calm clean cool decent easy fair fine fun glad good helpful improve improved
+        interesting like nice ok okay pleasant positive safe solid support thanks useful welcome''',
+    0.6: '''beautiful brave celebrate celebrating cheer cute delighted enjoy enjoyed excellent excited
+        fantastic friendly generous great happy healthy hope hopeful inspiring kind laugh laughing
+        lovely loved peaceful proud recovered relief rescued smile success successful thank
+        thrilled win winning won wonderful''',
+    1.0: '''amazing awesome best blessed brilliant breakthrough grateful heartwarming incredible joy
+        joyful love perfect triumph''',
+}
+
+NEGATORS = frozenset(
+    "not no never none nothing nobody neither nor without don't doesn't didn't isn't aren't wasn't "
+    "weren't can't couldn't won't wouldn't shouldn't hasn't haven't hadn't ain't".split()
+)
+
+# Pseudo-count of neutral evidence, so one negative word in a long sample does not read as 100% negative
+SMOOTHING = 1.0
+
+def _build_lexicon():
+    """Word -> column index, and the valence of each column"""
+    valences = {}
+    for valence, words in LEXICON_TIERS.items():
+        for word in words.split():
+            valences[word] = valence
+    return {word: index for index, word in enumerate(valences)}, np.array(list(valences.values()))
+
+WORD_INDEX, VALENCE = _build_lexicon()
+
+class SentimentService:
+    @staticmethod
+    def negativity(samples):
+        """Negativity in [0, 1] for each sample, as a NumPy array.
+
+        Every sample's lexicon hits are gathered into one flat array and
+        summed per sample with bincount, so a batch costs one tokenizing
+        pass plus a few vector operations. A word right after a negator
+        ("not bad") has its valence flipped. Samples with no lexicon words
+        score 0.
+        """
+        ids, owners, signs = [], [], []
+        for row, text in enumerate(samples):
+            negated = False
+            for token in tokenize(text):
+                index = WORD_INDEX.get(token)
+                if index is not None:
+                    ids.append(index)
+                    owners.append(row)
+                    signs.append(-1.0 if negated else 1.0)
+                negated = token in NEGATORS
+
+        count = len(samples)
+        if not ids:
+            return np.zeros(count)
+
+        valence = VALENCE[ids] * np.asarray(signs)
+        negative = np.bincount(owners, weights=np.clip(-valence, 0, None), minlength=count)
+        positive = np.bincount(owners, weights=np.clip(valence, 0, None), minlength=count)
+        return negative / (negative + positive + SMOOTHING)
+
+    @staticmethod
+    def score(samples):
+        """Per-sample negativity plus aggregates for a doomscore"""
+        scores = SentimentService.negativity(samples)
+        return {
+            'success': True,
+            'scores': [round(float(score), 4) for score in scores],
+            'aggregate': {
+                'samples': len(scores),
+                'negativity': round(float(scores.mean()), 4) if len(scores) else 0.0,
+                'max': round(float(scores.max()), 4) if len(scores) else 0.0,
+                'negative_share': round(float((scores >= 0.5).mean()), 4) if len(scores) else 0.0
+            }
+        }
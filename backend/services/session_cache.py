@@ -0,0 +1,170 @@
+import hashlib
+import os
+import threading
+import time
+from datetime import datetime
+from backend.config import Config
+from backend.services.cache_service import LRUCache
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+def token_digest(token):
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()[:32]
+
+class RevocationLog:
+    """Append-only file of revoked token digests shared by the workers on a host.
+
+    Each line is "<digest> <expires_at>". Readers remember how far into the
+    file they have read and only parse what was appended since, so checking
+    for revocations costs one stat() when nothing has changed. Once the
+    file grows past max_bytes the next writer rewrites it without entries
+    whose session has expired anyway and renames it into place; readers
+    notice the new inode and read it from the start.
+    """
+
+    def __init__(self, path, max_bytes=1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._inode = None
+        self._offset = 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _locked(self, fn):
+        fd = os.open(self.path + '.lock', os.O_CREAT | os.O_RDWR, 0o600)
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            return fn()
+        finally:
+            os.close(fd)
+
+    def append(self, digest, expires_at):
+        line = f'{digest} {expires_at:.0f}\n'.encode('ascii')
+
+        def write():
+            fd = os.open(self.path, os.O_CREAT | os.O_WRONLY | os.O_APPEND, 0o600)
+            try:
+                os.write(fd, line)
+                size = os.fstat(fd).st_size
+            finally:
+                os.close(fd)
+            if size > self.max_bytes:
+                self._compact()
+
+        self._locked(write)
+
+    def _compact(self):
+        now = time.time()
+        with open(self.path, 'rb') as f:
+            lines = [line for line in f if line.strip() and float(line.split()[1]) > now]
+        tmp = f'{self.path}.{os.getpid()}.tmp'
+        with open(tmp, 'wb') as f:
+            f.writelines(lines)
+        os.replace(tmp, self.path)
+
+    def poll(self):
+        """Return (digest, expires_at) for each revocation since the last poll"""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return []
+
+        if stat.st_ino != self._inode:
+            self._inode = stat.st_ino
+            self._offset = 0
+        if stat.st_size <= self._offset:
+            return []
+
+        with open(self.path, 'rb') as f:
+            f.seek(self._offset)
+            data = f.read(stat.st_size - self._offset)
+        # A writer may be midway through a line; leave it for the next poll
+        end = data.rfind(b'\n') + 1
+        self._offset += end
+        entries = []
+        for line in data[:end].splitlines():
+            if line.strip():
+                digest, expires_at = line.split()
+                entries.append((digest.decode('ascii'), float(expires_at)))
+        return entries
+
+class SessionCache:
+    """Token -> (user_id, expires_at) in front of the sessions table.
+
+    Entries live for ttl seconds or until the session expires, whichever
+    is sooner. Logging out on any worker appends the token digest to the
+    shared revocation log, which every worker polls before answering, so
+    a revoked token stops validating everywhere on the next request. The
+    ttl bounds how stale an entry can be for changes the log does not see,
+    such as rows deleted by hand or by another host.
+    """
+
+    def __init__(self, maxsize=10000, ttl=60, revocations=None):
+        self.ttl = ttl
+        self.revocations = revocations
+        self._cache = LRUCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'revoked': 0}
+
+    def _sync(self):
+        if self.revocations is None:
+            return
+        with self._lock:
+            entries = self.revocations.poll()
+            self._stats['revoked'] += len(entries)
+        for digest, _ in entries:
+            self._cache.delete(digest)
+
+    def get(self, token):
+        """Return (user_id, expires_at) for a cached live session, else None"""
+        self._sync()
+        entry = self._cache.get(token_digest(token))
+        with self._lock:
+            self._stats['hits' if entry is not None else 'misses'] += 1
+        return entry
+
+    def put(self, token, user_id, expires_at):
+        remaining = (expires_at - datetime.utcnow()).total_seconds()
+        if remaining > 0:
+            self._cache.set(token_digest(token), (user_id, expires_at), ttl=min(self.ttl, remaining))
+
+    def discard(self, token):
+        self._cache.delete(token_digest(token))
+
+    def revoke(self, token):
+        """Drop the token here and tell the other workers to drop it too"""
+        digest = token_digest(token)
+        self._cache.delete(digest)
+        if self.revocations is not None:
+            # No worker holds an entry longer than ttl, so the line need not outlive that
+            self.revocations.append(digest, time.time() + self.ttl)
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, size=len(self._cache))
+
+_session_cache = None
+_session_cache_pid = None
+_session_cache_lock = threading.Lock()
+
+def get_session_cache():
+    """Return this worker's session cache, or None when disabled"""
+    global _session_cache, _session_cache_pid
+    if not Config.SESSION_CACHE_ENABLED:
+        return None
+    if _session_cache is None or _session_cache_pid != os.getpid():
+        with _session_cache_lock:
+            if _session_cache is None or _session_cache_pid != os.getpid():
+                revocations = RevocationLog(Config.SESSION_REVOCATION_PATH) if Config.SESSION_REVOCATION_PATH else None
+                _session_cache = SessionCache(
+                    maxsize=Config.SESSION_CACHE_SIZE,
+                    ttl=Config.SESSION_CACHE_TTL,
+                    revocations=revocations
+                )
+                _session_cache_pid = os.getpid()
+    return _session_cache
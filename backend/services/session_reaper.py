@@ -0,0 +1,135 @@
+import os
+import random
+import threading
+import time
+from datetime import datetime
+from backend.config import Config
+from backend.models import RevokedToken, Session, db
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+class SessionReaper:
+    """Background thread that deletes expired sessions in bounded batches.
+
+    validate_session treats an expired row as invalid but leaves it in
+    place, so nothing on the request path writes; this thread removes them
+    every interval seconds, batch_size rows per transaction with a short
+    pause between batches so request writes are never blocked for long.
+    Every worker process runs one; a host-wide flock on lock_path keeps
+    them from reaping at the same time, and a worker that finds it taken
+    skips its round. Expired signed-token revocations go the same way.
+    """
+
+    def __init__(self, app, interval=300, batch_size=1000, pause=0.05, lock_path=None):
+        self.app = app
+        self.interval = interval
+        self.batch_size = batch_size
+        self.pause = pause
+        self.lock_path = lock_path
+        if lock_path and os.path.dirname(lock_path):
+            os.makedirs(os.path.dirname(lock_path), exist_ok=True)
+        self._stop = threading.Event()
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._stats = {'runs': 0, 'skipped': 0, 'batches': 0, 'deleted': 0, 'last_run_at': None}
+
+    def ensure_started(self):
+        # Threads do not survive fork, so each worker process starts its own
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='session-reaper', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self._pid = None
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats)
+
+    def reap_once(self, now=None):
+        """Delete every session and revocation that expired before now; return how many were deleted"""
+        now = now or datetime.utcnow()
+        deleted = 0
+        batches = 0
+        for model in (Session, RevokedToken):
+            while not self._stop.is_set():
+                ids = [row.id for row in db.session.query(model.id).filter(model.expires_at < now).limit(self.batch_size)]
+                if not ids:
+                    break
+                model.query.filter(model.id.in_(ids)).delete(synchronize_session=False)
+                db.session.commit()
+                deleted += len(ids)
+                batches += 1
+                if len(ids) < self.batch_size:
+                    break
+                time.sleep(self.pause)
+
+        with self._lock:
+            self._stats['runs'] += 1
+            self._stats['batches'] += batches
+            self._stats['deleted'] += deleted
+            self._stats['last_run_at'] = now.isoformat()
+        return deleted
+
+    def _try_lock(self):
+        """Return an fd holding the host-wide reaper lock, None if another worker has it"""
+        if not self.lock_path or fcntl is None:
+            return -1
+        fd = os.open(self.lock_path, os.O_CREAT | os.O_RDWR, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return None
+        return fd
+
+    def _run(self):
+        with self.app.app_context():
+            # Spread the first round so workers forked together do not all wake at once
+            self._stop.wait(random.uniform(0, min(self.interval, 30)))
+            while not self._stop.is_set():
+                fd = self._try_lock()
+                if fd is None:
+                    with self._lock:
+                        self._stats['skipped'] += 1
+                else:
+                    try:
+                        self.reap_once()
+                    except Exception:
+                        db.session.rollback()
+                    finally:
+                        if fd >= 0:
+                            os.close(fd)
+                        db.session.remove()
+                self._stop.wait(self.interval)
+
+_session_reaper = None
+_session_reaper_lock = threading.Lock()
+
+def get_session_reaper(app):
+    global _session_reaper
+    if _session_reaper is None:
+        with _session_reaper_lock:
+            if _session_reaper is None:
+                _session_reaper = SessionReaper(
+                    app,
+                    interval=Config.SESSION_REAPER_INTERVAL,
+                    batch_size=Config.SESSION_REAPER_BATCH,
+                    pause=Config.SESSION_REAPER_PAUSE,
+                    lock_path=Config.SESSION_REAPER_LOCK_PATH
+                )
+    return _session_reaper
@@ -0,0 +1,193 @@
+import base64
+import calendar
+import hashlib
+import heapq
+import hmac
+import os
+import secrets
+import threading
+import time
+from datetime import datetime
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from backend.config import Config
+from backend.models import RevokedToken, db
+from backend.services.session_cache import RevocationLog, token_digest
+
+TOKEN_VERSION = 's1'
+
+def _b64(data):
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+
+def is_signed_token(token):
+    return token.startswith(TOKEN_VERSION + '.')
+
+def signing_key_configured():
+    """False while SECRET_KEY is the development default, which anyone could use to forge tokens"""
+    return Config.SECRET_KEY != Config.DEV_SECRET_KEY
+
+class RevokedTokenStore:
+    """Revocations in the revoked_tokens table, so they reach every host and outlive restarts.
+
+    poll() reads rows added since the last call at most once per interval
+    seconds; a new process starts from the first row. Rows are re-read a
+    little behind the highest id seen, since ids can commit out of order,
+    and the SessionReaper deletes them once they expire. Needs an app context.
+    """
+
+    OVERLAP = 64
+
+    def __init__(self, interval=2.0):
+        self.interval = interval
+        self._last_id = 0
+        self._next_poll = 0.0
+        self._lock = threading.Lock()
+
+    def append(self, digest, expires_at):
+        try:
+            db.session.add(RevokedToken(digest=digest, expires_at=datetime.utcfromtimestamp(expires_at)))
+            db.session.commit()
+        except IntegrityError:
+            # Already revoked by another worker
+            db.session.rollback()
+
+    def poll(self):
+        with self._lock:
+            if time.monotonic() < self._next_poll:
+                return []
+            self._next_poll = time.monotonic() + self.interval
+            since = max(self._last_id - self.OVERLAP, 0)
+
+        try:
+            rows = db.session.query(RevokedToken.id, RevokedToken.digest, RevokedToken.expires_at).filter(
+                RevokedToken.id > since, RevokedToken.expires_at > datetime.utcnow()
+            ).order_by(RevokedToken.id).all()
+        except SQLAlchemyError:
+            db.session.rollback()
+            with self._lock:
+                self._next_poll = 0.0
+            return []
+
+        with self._lock:
+            if rows:
+                self._last_id = max(self._last_id, rows[-1].id)
+        return [(row.digest, calendar.timegm(row.expires_at.timetuple())) for row in rows]
+
+class SignedSessionTokens:
+    """Session tokens that carry their own user id and expiry.
+
+    A token is "s1.<user_id>.<expires_at>.<nonce>.<mac>", where mac is a
+    truncated HMAC-SHA256 of everything before it under a key derived from
+    the app secret, so checking one takes a single HMAC and no I/O. Opaque
+    tokens from secrets.token_urlsafe never contain a dot, which is how
+    the two formats are told apart.
+
+    Logging out cannot delete anything, so the token digest is recorded
+    with the token's own expiry in the revoked_tokens table (store), which
+    every worker on every host polls, and in the host's revocation log,
+    which other workers on the same host see on their next check. Both
+    feed a dict of digest -> expiry and a heap ordered by expiry, and
+    entries are dropped once the token they name could no longer validate
+    anyway. The set only ever holds tokens revoked early, which keeps it
+    small; with nothing revoked a check skips hashing entirely.
+    """
+
+    def __init__(self, secret, revocations=None, store=None):
+        key = hashlib.sha256(b'shieldui-session-token:' + secret.encode('utf-8')).digest()
+        self._hmac = hmac.new(key, digestmod=hashlib.sha256)
+        self.revocations = revocations
+        self.store = store
+        self._revoked = {}
+        self._expiries = []
+        self._lock = threading.Lock()
+
+    def _mac(self, payload):
+        mac = self._hmac.copy()
+        mac.update(payload.encode('ascii'))
+        return _b64(mac.digest()[:16])
+
+    def issue(self, user_id, expires_at):
+        """Return a token for user_id valid until expires_at (Unix seconds)"""
+        payload = f'{TOKEN_VERSION}.{int(user_id)}.{int(expires_at)}.{secrets.token_urlsafe(8)}'
+        return f'{payload}.{self._mac(payload)}'
+
+    def verify(self, token):
+        """Return (user_id, expires_at, error); error is None for a live token"""
+        if not token.isascii():
+            return None, None, 'Invalid session'
+        payload, _, mac = token.rpartition('.')
+        parts = payload.split('.')
+        if len(parts) != 4 or parts[0] != TOKEN_VERSION or not hmac.compare_digest(mac, self._mac(payload)):
+            return None, None, 'Invalid session'
+
+        try:
+            user_id, expires_at = int(parts[1]), int(parts[2])
+        except ValueError:
+            return None, None, 'Invalid session'
+        if expires_at < time.time():
+            return None, None, 'Session expired'
+        if self.is_revoked(token):
+            return None, None, 'Invalid session'
+        return user_id, expires_at, None
+
+    def _add(self, digest, expires_at):
+        if expires_at > self._revoked.get(digest, 0):
+            self._revoked[digest] = expires_at
+            heapq.heappush(self._expiries, (expires_at, digest))
+
+    def _sync(self):
+        # The store queries the database, so it is read outside the lock
+        shared = self.store.poll() if self.store is not None else []
+        now = time.time()
+        with self._lock:
+            for digest, expires_at in shared:
+                if expires_at > now:
+                    self._add(digest, expires_at)
+            if self.revocations is not None:
+                for digest, expires_at in self.revocations.poll():
+                    if expires_at > now:
+                        self._add(digest, expires_at)
+            while self._expiries and self._expiries[0][0] <= now:
+                expires_at, digest = heapq.heappop(self._expiries)
+                if self._revoked.get(digest) == expires_at:
+                    del self._revoked[digest]
+
+    def is_revoked(self, token):
+        self._sync()
+        return bool(self._revoked) and token_digest(token) in self._revoked
+
+    def revoke(self, token):
+        """Revoke a token that verifies; return False for anything else"""
+        user_id, expires_at, error = self.verify(token)
+        if error:
+            return False
+
+        digest = token_digest(token)
+        with self._lock:
+            self._add(digest, expires_at)
+        if self.store is not None:
+            self.store.append(digest, expires_at)
+        if self.revocations is not None:
+            self.revocations.append(digest, expires_at)
+        return True
+
+    def revoked_count(self):
+        with self._lock:
+            return len(self._revoked)
+
+_session_tokens = None
+_session_tokens_pid = None
+_session_tokens_lock = threading.Lock()
+
+def get_session_tokens():
+    """Return this worker's signer and revocation set for signed tokens"""
+    global _session_tokens, _session_tokens_pid
+    if not signing_key_configured():
+        raise RuntimeError('Signed session tokens need SECRET_KEY set to a private value')
+    if _session_tokens is None or _session_tokens_pid != os.getpid():
+        with _session_tokens_lock:
+            if _session_tokens is None or _session_tokens_pid != os.getpid():
+                revocations = RevocationLog(Config.SESSION_REVOCATION_PATH) if Config.SESSION_REVOCATION_PATH else None
+                store = RevokedTokenStore(interval=Config.SESSION_REVOCATION_POLL_SECONDS)
+                _session_tokens = SignedSessionTokens(Config.SECRET_KEY, revocations=revocations, store=store)
+                _session_tokens_pid = os.getpid()
+    return _session_tokens
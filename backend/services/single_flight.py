@@ -0,0 +1,166 @@
+import json
+import os
+import threading
+import time
+import zlib
+from backend.config import Config
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlight:
+    """Collapse concurrent calls for the same key into one call.
+
+    Within a process, the first caller for a key runs it and later callers
+    wait on an Event for its result. Across worker processes, the leader
+    of each process takes an exclusive flock on a lease file (keys are
+    striped over a fixed number of files) and writes the result there
+    before releasing it; a process that had to wait for the lock reads the
+    result instead of calling. The kernel drops the lock when its holder
+    dies, so if the leader crashes a waiter gets the lock, finds no result
+    and makes the call itself. Waiting is bounded by wait seconds, after
+    which the caller goes ahead on its own.
+
+    Results must be JSON-serializable to be shared across processes.
+    Without fcntl (Windows) only in-process calls are coalesced.
+    """
+
+    def __init__(self, directory=None, stripes=4096, wait=30.0, poll_interval=0.01):
+        self.directory = directory
+        self.stripes = stripes
+        self.wait = wait
+        self.poll_interval = poll_interval
+        self._flights = {}
+        self._lock = threading.Lock()
+        self._stats = {'leaders': 0, 'followers': 0, 'process_followers': 0, 'takeovers': 0, 'timeouts': 0}
+        if directory and fcntl is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def _count(self, name):
+        with self._lock:
+            self._stats[name] += 1
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats)
+
+    def do(self, key, fn):
+        """Return (result, shared); shared is True when another caller made the call"""
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+
+        if not leader:
+            if not flight.done.wait(self.wait):
+                self._count('timeouts')
+                return fn(), False
+            self._count('followers')
+            if flight.error is not None:
+                raise flight.error
+            return flight.result, True
+
+        try:
+            flight.result, shared = self._across_processes(key, fn)
+            return flight.result, shared
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    def _lease_path(self, key):
+        return os.path.join(self.directory, f'{zlib.crc32(key.encode("utf-8")) % self.stripes:04x}.lease')
+
+    @staticmethod
+    def _read(fd):
+        os.lseek(fd, 0, os.SEEK_SET)
+        data = os.read(fd, os.fstat(fd).st_size)
+        try:
+            return json.loads(data) if data else None
+        except ValueError:
+            return None
+
+    @staticmethod
+    def _write(fd, record):
+        try:
+            data = json.dumps(record).encode('utf-8')
+        except (TypeError, ValueError):
+            data = json.dumps({'key': record['key']}).encode('utf-8')
+        os.ftruncate(fd, 0)
+        os.lseek(fd, 0, os.SEEK_SET)
+        os.write(fd, data)
+
+    def _across_processes(self, key, fn):
+        if fcntl is None or not self.directory:
+            self._count('leaders')
+            return fn(), False
+
+        fd = os.open(self._lease_path(key), os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            arrived = time.time()
+            deadline = time.monotonic() + self.wait
+            while True:
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:
+                    if time.monotonic() >= deadline:
+                        self._count('timeouts')
+                        return fn(), False
+                    time.sleep(self.poll_interval)
+
+            try:
+                record = self._read(fd)
+                if record is not None and record.get('key') == key:
+                    if 'result' in record and record['finished_at'] >= arrived:
+                        self._count('process_followers')
+                        return record['result'], True
+                    if 'started_at' in record and 'finished_at' not in record:
+                        # The previous holder died between taking the lease and finishing
+                        self._count('takeovers')
+
+                self._count('leaders')
+                self._write(fd, {'key': key, 'pid': os.getpid(), 'started_at': time.time()})
+                try:
+                    result = fn()
+                except Exception:
+                    self._write(fd, {'key': key, 'finished_at': time.time()})
+                    raise
+                self._write(fd, {'key': key, 'finished_at': time.time(), 'result': result})
+                return result, False
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+        finally:
+            os.close(fd)
+
+_single_flight = None
+_single_flight_pid = None
+_single_flight_lock = threading.Lock()
+
+def get_single_flight():
+    """Return this worker's single-flight table, or None when disabled"""
+    global _single_flight, _single_flight_pid
+    if not Config.SINGLE_FLIGHT_ENABLED:
+        return None
+    if _single_flight is None or _single_flight_pid != os.getpid():
+        with _single_flight_lock:
+            if _single_flight is None or _single_flight_pid != os.getpid():
+                _single_flight = SingleFlight(
+                    directory=Config.SINGLE_FLIGHT_DIR,
+                    stripes=Config.SINGLE_FLIGHT_STRIPES,
+                    wait=Config.SINGLE_FLIGHT_WAIT
+                )
+                _single_flight_pid = os.getpid()
+    return _single_flight
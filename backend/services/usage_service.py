@@ -0,0 +1,194 @@
+import contextvars
+import json
+import os
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from backend.config import Config
+from backend.services.metrics import Histogram
+
+_current_user = contextvars.ContextVar('gemini_usage_user', default=None)
+
+COUNTERS = ('calls', 'failures', 'retries', 'request_bytes', 'response_bytes', 'prompt_tokens', 'output_tokens')
+
+@contextmanager
+def attribute_usage(user_id):
+    """Attribute Gemini calls made inside the block to user_id"""
+    token = _current_user.set(user_id)
+    try:
+        yield
+    finally:
+        _current_user.reset(token)
+
+def attributed_user():
+    """The user_id set by the innermost attribute_usage block, or None"""
+    return _current_user.get()
+
+def encode_latency(histogram):
+    """Text form of a latency Histogram for the gemini_usage_daily table"""
+    return json.dumps({'counts': histogram.counts, 'total': histogram.total, 'max': histogram.max})
+
+def decode_latency(text):
+    histogram = Histogram()
+    if text:
+        data = json.loads(text)
+        histogram.counts = data['counts']
+        histogram.count = sum(data['counts'])
+        histogram.total = data['total']
+        histogram.max = data['max']
+    return histogram
+
+def estimated_cost(prompt_tokens, output_tokens):
+    return (prompt_tokens * Config.GEMINI_INPUT_COST_PER_MTOK
+            + output_tokens * Config.GEMINI_OUTPUT_COST_PER_MTOK) / 1_000_000
+
+class Usage:
+    """Counters, HTTP statuses and a latency histogram for one service, user or day"""
+
+    def __init__(self):
+        self.counts = dict.fromkeys(COUNTERS, 0)
+        self.statuses = Counter()
+        self.latency = Histogram()
+
+    def add(self, event):
+        self.counts['calls'] += 1
+        self.counts['failures'] += 0 if event['success'] else 1
+        self.counts['retries'] += event['retries']
+        self.counts['request_bytes'] += event['request_bytes']
+        self.counts['response_bytes'] += event['response_bytes']
+        self.counts['prompt_tokens'] += event.get('prompt_tokens', 0)
+        self.counts['output_tokens'] += event.get('output_tokens', 0)
+        self.statuses[str(event['status'])] += 1
+        self.latency.record(event['latency'])
+
+    def snapshot(self):
+        return dict(
+            self.counts,
+            statuses=dict(self.statuses),
+            latency=self.latency.snapshot(),
+            estimated_cost_usd=round(estimated_cost(self.counts['prompt_tokens'], self.counts['output_tokens']), 6)
+        )
+
+class UsageMeter:
+    """Per-process accounting of every Gemini call, fed by the transport hook.
+
+    Totals are kept per service and per user (the one set with
+    attribute_usage, None when unattributed). Usage since the last flush
+    is also kept per (day, service, user) and added to the
+    gemini_usage_daily table by flush(), which needs an app context.
+    """
+
+    def __init__(self, flush_interval=60, max_users=1000):
+        self.flush_interval = flush_interval
+        self.max_users = max_users
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+        self._services = {}
+        self._users = {}
+        self._pending = {}
+        self._last_flush = time.monotonic()
+
+    def record(self, event):
+        user_id = _current_user.get()
+        key = (datetime.utcnow().date(), event['service'], user_id or 0)
+        with self._lock:
+            self._services.setdefault(event['service'], Usage()).add(event)
+            if user_id in self._users or len(self._users) < self.max_users:
+                self._users.setdefault(user_id, Usage()).add(event)
+            self._pending.setdefault(key, Usage()).add(event)
+
+    def snapshot(self, top_users=50):
+        with self._lock:
+            services = {name: usage.snapshot() for name, usage in self._services.items()}
+            users = sorted(self._users.items(), key=lambda item: -item[1].counts['calls'])[:top_users]
+            users = [dict(usage.snapshot(), user_id=user_id) for user_id, usage in users]
+        return {'since': self.started_at, 'services': services, 'top_users': users}
+
+    def maybe_flush(self):
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """Add the usage gathered since the last flush to the daily rollup.
+
+        Counters are incremented in SQL, so flushes from other workers are
+        never lost. Runs on its own connection, so it never commits or
+        rolls back the request's session.
+        """
+        from backend.models import db, GeminiUsageDaily
+
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = time.monotonic()
+
+        table = GeminiUsageDaily.__table__
+        try:
+            with db.engine.begin() as conn:
+                for (day, service, user_id), usage in pending.items():
+                    match = (table.c.day == day) & (table.c.service == service) & (table.c.user_id == user_id)
+                    increments = {name: table.c[name] + amount for name, amount in usage.counts.items()}
+                    if not conn.execute(table.update().where(match).values(increments)).rowcount:
+                        try:
+                            with conn.begin_nested():
+                                conn.execute(table.insert().values(
+                                    day=day, service=service, user_id=user_id, statuses=json.dumps(dict(usage.statuses)),
+                                    latency=encode_latency(usage.latency), **usage.counts
+                                ))
+                            continue
+                        except IntegrityError:
+                            # Another worker created the row first
+                            conn.execute(table.update().where(match).values(increments))
+
+                    # The update above holds the row lock, so this read-modify-write cannot race
+                    row = conn.execute(select(table.c.statuses, table.c.latency).where(match)).one()
+                    statuses = Counter(json.loads(row.statuses or '{}'))
+                    statuses.update(usage.statuses)
+                    latency = decode_latency(row.latency)
+                    latency.merge(usage.latency)
+                    conn.execute(table.update().where(match).values(
+                        statuses=json.dumps(statuses), latency=encode_latency(latency)
+                    ))
+        except SQLAlchemyError:
+            # Put the usage back so the next flush retries it
+            with self._lock:
+                for key, usage in pending.items():
+                    merged = self._pending.setdefault(key, Usage())
+                    for name in COUNTERS:
+                        merged.counts[name] += usage.counts[name]
+                    merged.statuses.update(usage.statuses)
+                    merged.latency.merge(usage.latency)
+
+def daily_rollup(days=14):
+    """Per-day, per-service totals across workers and users; needs an app context"""
+    from backend.models import GeminiUsageDaily
+
+    since = datetime.utcnow().date() - timedelta(days=days - 1)
+    totals = {}
+    for row in GeminiUsageDaily.query.filter(GeminiUsageDaily.day >= since):
+        key = (row.day, row.service)
+        usage = totals.setdefault(key, Usage())
+        for name in COUNTERS:
+            usage.counts[name] += getattr(row, name) or 0
+        usage.statuses.update(json.loads(row.statuses or '{}'))
+        usage.latency.merge(decode_latency(row.latency))
+
+    return [dict(usage.snapshot(), day=day.isoformat(), service=service)
+            for (day, service), usage in sorted(totals.items())]
+
+_meter = None
+_meter_pid = None
+_meter_lock = threading.Lock()
+
+def get_usage_meter():
+    """Return this worker's usage meter"""
+    global _meter, _meter_pid
+    if _meter is None or _meter_pid != os.getpid():
+        with _meter_lock:
+            if _meter is None or _meter_pid != os.getpid():
+                _meter = UsageMeter(flush_interval=Config.GEMINI_USAGE_FLUSH_SECONDS)
+                _meter_pid = os.getpid()
+    return _meter
@@ -0,0 +1,215 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from backend.config import Config
+from backend.models import db, SharedVerdict, SharedVerdictDaily
+from backend.services.cache_service import content_key, normalize_text
+
+# Query parameters that identify the visitor or campaign, not the page
+TRACKING_PARAMS = frozenset({
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'yclid', 'mc_cid', 'mc_eid', 'igshid', 'ref', 'ref_',
+    'referrer', 'source', 'sessionid', 'session_id', 'sid', '_ga', '_gl', 'spm', 'cmpid'
+})
+
+def normalize_url(url):
+    """Canonical form of a page URL for sharing verdicts between visitors.
+
+    Scheme and host are lower-cased, default ports, fragments, trailing
+    slashes and tracking parameters (utm_* and TRACKING_PARAMS) are
+    dropped, and the remaining query parameters are sorted.
+    """
+    parts = urlsplit((url or '').strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    if parts.port and (scheme, parts.port) not in (('http', 80), ('https', 443)):
+        host = f'{host}:{parts.port}'
+
+    query = sorted(
+        (name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not name.lower().startswith('utm_') and name.lower() not in TRACKING_PARAMS
+    )
+    return urlunsplit((scheme, host, parts.path.rstrip('/') or '/', urlencode(query), ''))
+
+def canonical_flow_step(step):
+    """A flow step without what differs per visitor: its timestamp, and tracking parameters in its URL"""
+    if not isinstance(step, dict):
+        return step
+    canonical = {'action': step.get('action'), 'details': step.get('details')}
+    if isinstance(step.get('url'), str):
+        canonical['url'] = normalize_url(step['url'])
+    return canonical
+
+def element_fingerprint(elements, context=None, flow_data=None):
+    """Hash of what the element prompt is built from.
+
+    That is the pattern, role and text of each element, the page context
+    other than its URL (the store key holds the normalized URL) and the
+    last flow steps in canonical form, so requests that would get a
+    materially different prompt never share a verdict.
+    """
+    canonical = [
+        [str(item.get('pattern', '')), str(item.get('role', '')),
+         normalize_text(str(item.get('text', '')), Config.AI_BATCH_ELEMENT_CHARS)]
+        for item in elements
+    ]
+    page = {key: value for key, value in (context or {}).items() if key != 'url'}
+    # analyze_elements only shows the model the last five flow steps
+    canonical = [canonical, page, [canonical_flow_step(step) for step in (flow_data or [])[-5:]]]
+    return content_key(json.dumps(canonical, separators=(',', ':'), sort_keys=True))
+
+class SharedVerdictStore:
+    """Verdicts in the application database, reused across users until they expire.
+
+    Lookups are counted in memory and added to the per-day table at most
+    every flush_interval seconds, so a hit costs one primary-key read.
+    Must be used inside an app context.
+    """
+
+    COUNTERS = ('lookups', 'hits', 'stores', 'calls_saved')
+    PURGE_BATCH = 1000
+
+    def __init__(self, ttl=86400, flush_interval=60):
+        self.ttl = ttl
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._totals = dict.fromkeys(self.COUNTERS + ('errors',), 0)
+        self._pending = {}
+        self._last_flush = time.monotonic()
+
+    @staticmethod
+    def key(url, fingerprint):
+        return hashlib.sha256(f'{normalize_url(url)}\n{fingerprint}'.encode('utf-8')).hexdigest()
+
+    def _count(self, **amounts):
+        day = datetime.utcnow().date()
+        with self._lock:
+            pending = self._pending.setdefault(day, dict.fromkeys(self.COUNTERS, 0))
+            for name, amount in amounts.items():
+                self._totals[name] += amount
+                if name in pending:
+                    pending[name] += amount
+            due = time.monotonic() - self._last_flush >= self.flush_interval
+
+        if due:
+            self.flush()
+
+    def get(self, url, fingerprint):
+        """Return the stored verdict for this page content, or None"""
+        try:
+            row = db.session.get(SharedVerdict, self.key(url, fingerprint))
+        except SQLAlchemyError:
+            db.session.rollback()
+            self._count(lookups=1, errors=1)
+            return None
+
+        if row is None or row.expires_at <= datetime.utcnow():
+            self._count(lookups=1)
+            return None
+
+        self._count(lookups=1, hits=1, calls_saved=row.gemini_calls)
+        return row.get_verdict()
+
+    def put(self, url, fingerprint, verdict, gemini_calls=1):
+        now = datetime.utcnow()
+        row = SharedVerdict(
+            key=self.key(url, fingerprint),
+            gemini_calls=gemini_calls,
+            created_at=now,
+            expires_at=now + timedelta(seconds=self.ttl)
+        )
+        row.set_verdict(verdict)
+
+        try:
+            db.session.merge(row)
+            db.session.commit()
+        except SQLAlchemyError:
+            db.session.rollback()
+            self._count(errors=1)
+            return
+        self._count(stores=1)
+
+    def flush(self):
+        """Add the counts gathered since the last flush to the per-day rows.
+
+        Runs on its own connection and transaction, so flushing from inside
+        a request never commits or rolls back the request's session.
+        Expired verdicts are deleted PURGE_BATCH at a time.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = time.monotonic()
+
+        daily = SharedVerdictDaily.__table__
+        verdicts = SharedVerdict.__table__
+        try:
+            with db.engine.begin() as conn:
+                for day, counts in pending.items():
+                    increments = {name: daily.c[name] + amount for name, amount in counts.items()}
+                    if not conn.execute(daily.update().where(daily.c.day == day).values(increments)).rowcount:
+                        try:
+                            with conn.begin_nested():
+                                conn.execute(daily.insert().values(day=day, **counts))
+                        except IntegrityError:
+                            # Another worker created the row first
+                            conn.execute(daily.update().where(daily.c.day == day).values(increments))
+
+                expired = conn.execute(select(verdicts.c.key).where(
+                    verdicts.c.expires_at <= datetime.utcnow()).limit(self.PURGE_BATCH)).scalars().all()
+                if expired:
+                    conn.execute(verdicts.delete().where(verdicts.c.key.in_(expired)))
+        except SQLAlchemyError:
+            with self._lock:
+                self._totals['errors'] += 1
+                # Put the counts back so the next flush retries them
+                for day, counts in pending.items():
+                    merged = self._pending.setdefault(day, dict.fromkeys(self.COUNTERS, 0))
+                    for name, amount in counts.items():
+                        merged[name] += amount
+
+    def stats(self, days=30):
+        """Counters for this process plus the per-day totals of every worker"""
+        self.flush()
+
+        with self._lock:
+            totals = dict(self._totals)
+        totals['hit_rate'] = totals['hits'] / totals['lookups'] if totals['lookups'] else 0.0
+
+        since = datetime.utcnow().date() - timedelta(days=days - 1)
+        rows = SharedVerdictDaily.query.filter(SharedVerdictDaily.day >= since).order_by(SharedVerdictDaily.day).all()
+        return {
+            'process': totals,
+            'entries': SharedVerdict.query.count(),
+            'daily': [{
+                'day': row.day.isoformat(),
+                'lookups': row.lookups,
+                'hits': row.hits,
+                'hit_rate': row.hits / row.lookups if row.lookups else 0.0,
+                'stores': row.stores,
+                'gemini_calls_saved': row.calls_saved
+            } for row in rows]
+        }
+
+_store = None
+_store_pid = None
+_store_lock = threading.Lock()
+
+def get_shared_verdicts():
+    """Return this worker's shared verdict store, or None when disabled"""
+    global _store, _store_pid
+    if not Config.SHARED_VERDICT_ENABLED:
+        return None
+    if _store is None or _store_pid != os.getpid():
+        with _store_lock:
+            if _store is None or _store_pid != os.getpid():
+                _store = SharedVerdictStore(
+                    ttl=Config.SHARED_VERDICT_TTL,
+                    flush_interval=Config.SHARED_VERDICT_FLUSH_SECONDS
+                )
+                _store_pid = os.getpid()
+    return _store
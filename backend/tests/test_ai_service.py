@@ -0,0 +1,121 @@
+import json
+import time
+from backend.services.ai_service import AIService
+
+def test_analyze_batch_preserves_input_order(monkeypatch):
+    def fake_analyze(text, max_retries=5):
+        # Later items finish first so ordering cannot come from completion order
+        time.sleep(0.01 * (5 - int(text)))
+        return {'success': True, 'description': text}
+
+    monkeypatch.setattr(AIService, 'analyze_text', staticmethod(fake_analyze))
+
+    results = AIService.analyze_batch([str(i) for i in range(5)], max_concurrency=5)
+
+    assert [r['description'] for r in results] == ['0', '1', '2', '3', '4']
+
+def test_analyze_batch_isolates_failures(monkeypatch):
+    def fake_analyze(text, max_retries=5):
+        if text == 'boom':
+            raise RuntimeError('upstream exploded')
+        return {'success': True, 'description': text}
+
+    monkeypatch.setattr(AIService, 'analyze_text', staticmethod(fake_analyze))
+
+    results = AIService.analyze_batch(['a', 'boom', 'c'], max_concurrency=3)
+
+    assert results[0]['success'] and results[2]['success']
+    assert results[1] == {'success': False, 'error': 'upstream exploded'}
+
+def test_analyze_text_serves_repeats_from_cache(monkeypatch, tmp_path):
+    from backend.config import Config
+    from backend.services import ai_service
+
+    monkeypatch.setattr(Config, 'ANALYSIS_CACHE_ENABLED', True)
+    monkeypatch.setattr(Config, 'ANALYSIS_CACHE_PATH', str(tmp_path / 'cache.db'))
+    monkeypatch.setattr(ai_service, '_analysis_cache', None)
+
+    calls = []
+
+    def fake_request(prompt, max_retries=5, on_verdict=None):
+        calls.append(prompt)
+        return {'success': True, 'detected': True, 'affected_elements': ['Only 3 left']}
+
+    monkeypatch.setattr(AIService, '_request_analysis', staticmethod(fake_request))
+
+    first = AIService.analyze_text('Only 3 left!')
+    first['affected_elements'].append('mutated by caller')
+    second = AIService.analyze_text('  ONLY 3   left! ')
+
+    assert len(calls) == 1
+    assert second['affected_elements'] == ['Only 3 left']
+    assert AIService.cache_stats()['memory_hits'] == 1
+
+class RecordingTransport:
+    def __init__(self, texts):
+        self.texts = list(texts)
+        self.calls = []
+
+    def generate(self, parts, timeout, service='gemini', max_retries=5, api_key=None, on_text=None):
+        self.calls.append(parts)
+        return {'success': True, 'text': self.texts.pop(0)}
+
+def test_screenshot_modes_differ_in_request_count(monkeypatch):
+    from backend.config import Config
+    from backend.services import ai_service, ocr_service
+
+    monkeypatch.setattr(Config, 'ANALYSIS_CACHE_ENABLED', False)
+    monkeypatch.setattr(Config, 'OCR_CACHE_ENABLED', False)
+    monkeypatch.setattr(Config, 'OCR_PREPROCESS_ENABLED', False)
+    monkeypatch.setattr(Config, 'AI_PREFILTER_ENABLED', False)
+    verdict = {'detected': True, 'pattern_type': 'urgency_manipulation', 'confidence_score': 0.8,
+               'description': 'Scarcity', 'affected_elements': ['Only 3 left']}
+
+    transport = RecordingTransport([
+        'Only 3 left', json.dumps(verdict),
+        json.dumps(dict(verdict, extracted_text='Only 3 left'))
+    ])
+    monkeypatch.setattr(ai_service, 'get_transport', lambda: transport)
+    monkeypatch.setattr(ocr_service, 'get_transport', lambda: transport)
+
+    two_stage = AIService.analyze_screenshot(b'\xff\xd8\xffimage', mode='two_stage')
+    assert len(transport.calls) == 2
+
+    fused = AIService.analyze_screenshot(b'\xff\xd8\xffimage', mode='fused')
+    assert len(transport.calls) == 3
+    assert 'inline_data' in transport.calls[2][0]
+
+    for result, mode in [(two_stage, 'two_stage'), (fused, 'fused')]:
+        assert result['success']
+        assert result['mode'] == mode
+        assert result['extracted_text'] == 'Only 3 left'
+        assert result['pattern_type'] == 'urgency_manipulation'
+
+def test_unknown_screenshot_mode_is_rejected():
+    result = AIService.analyze_screenshot(b'image', mode='both')
+    assert result == {'success': False, 'error': 'Unknown screenshot analysis mode: both'}
+
+def test_fused_text_is_reused_only_by_the_same_user(monkeypatch):
+    from backend.config import Config
+    from backend.services import ai_service, ocr_service
+    from backend.services.usage_service import attribute_usage
+    from backend.tests.test_ocr_cache import render
+
+    monkeypatch.setattr(ocr_service, '_ocr_cache', None)
+    monkeypatch.setattr(Config, 'ANALYSIS_CACHE_ENABLED', False)
+    monkeypatch.setattr(Config, 'AI_PREFILTER_ENABLED', False)
+    verdict = {'detected': False, 'pattern_type': 'other', 'confidence_score': 0.0}
+    analysis = RecordingTransport([json.dumps(dict(verdict, extracted_text='Only 3 left'))] + [json.dumps(verdict)] * 2)
+    ocr = RecordingTransport(['Only 4 left'])
+    monkeypatch.setattr(ai_service, 'get_transport', lambda: analysis)
+    monkeypatch.setattr(ocr_service, 'get_transport', lambda: ocr)
+
+    with attribute_usage(1):
+        AIService.analyze_screenshot(render(0), mode='fused')
+        own = AIService.analyze_screenshot(render(2), mode='two_stage')
+    with attribute_usage(2):
+        other = AIService.analyze_screenshot(render(1), mode='two_stage')
+
+    assert own['extracted_text'] == 'Only 3 left'
+    assert other['extracted_text'] == 'Only 4 left'
+    assert len(ocr.calls) == 1
@@ -0,0 +1,125 @@
+import json
+from backend.config import Config
+from backend.models import db, User
+from backend.services.ai_service import AIService
+from backend.services.auth_service import AuthService
+from backend.services.ocr_service import OCRService
+
+def test_analyze_dark_patterns_uses_single_call(client, monkeypatch):
+    prompts = []
+
+    def fake_generate(prompt, max_retries=5, api_key=None):
+        prompts.append(prompt)
+        return {'success': True, 'text': json.dumps({'results': [
+            {'index': 1, 'dark_pattern_detected': True, 'pattern_type': 'false_urgency',
+             'confidence_score': 0.9, 'severity': 'high', 'explanation': 'Fake scarcity'},
+            {'index': 0, 'dark_pattern_detected': False, 'confidence_score': 0.1}
+        ]})}
+
+    monkeypatch.setattr(AIService, '_generate', staticmethod(fake_generate))
+
+    response = client.post('/api/analyze/dark-patterns', json={
+        'elements': [
+            {'text': 'Continue', 'pattern': 'confirm_shaming', 'selector': '#a'},
+            {'text': 'Only 2 left!', 'pattern': 'false_urgency', 'selector': '#b'},
+            {'text': 'Sign up', 'pattern': 'sneaky_opt_in', 'selector': '#c'}
+        ],
+        'context': {'url': 'https://shop.example/checkout'}
+    })
+
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert len(prompts) == 1
+    assert [r['selector'] for r in data['results']] == ['#a', '#b', '#c']
+    assert [r['dark_pattern_detected'] for r in data['results']] == [False, True, False]
+    assert data['aggregated']['total_patterns_found'] == 1
+    assert data['aggregated']['pattern_types'] == {'false_urgency': 1}
+    assert data['site_score'] == round(0.9 * AIService.SEVERITY_WEIGHTS['high'])
+
+def test_analyze_dark_patterns_rejects_invalid_elements(client):
+    response = client.post('/api/analyze/dark-patterns', json={'elements': 'nope'})
+
+    assert response.status_code == 400
+
+def test_analyze_text_streams_verdict_before_result(client, monkeypatch):
+    from backend.config import Config
+    from backend.models import db, User
+    from backend.services.auth_service import AuthService
+
+    monkeypatch.setattr(Config, 'ANALYSIS_CACHE_ENABLED', False)
+    body = json.dumps({
+        'detected': True, 'pattern_type': 'urgency_manipulation', 'confidence_score': 0.9,
+        'description': 'Countdown pressure', 'affected_elements': ['Ends in 5:00']
+    })
+
+    def fake_generate(prompt, max_retries=5, api_key=None, on_text=None):
+        on_text(body[:80])
+        on_text(body[80:])
+        return {'success': True, 'text': body}
+
+    monkeypatch.setattr(AIService, '_generate', staticmethod(fake_generate))
+
+    user = User(username='streamuser', passkey_credential=b'x', totp_secret='')
+    db.session.add(user)
+    db.session.commit()
+    token, _ = AuthService.create_session(user)
+
+    response = client.post('/api/analyze/text?stream=1', json={'text': 'Hurry, offer ends soon'},
+                           headers={'Authorization': f'Bearer {token}'})
+
+    assert response.status_code == 200
+    assert response.mimetype == 'text/event-stream'
+    events = [block.split('\n') for block in response.get_data(as_text=True).strip().split('\n\n')]
+    assert [lines[0] for lines in events] == ['event: verdict', 'event: result']
+
+    verdict = json.loads(events[0][1][len('data: '):])
+    result = json.loads(events[1][1][len('data: '):])
+    assert verdict == {'detected': True, 'pattern_type': 'urgency_manipulation', 'confidence_score': 0.9}
+    assert result['description'] == 'Countdown pressure'
+
+def test_analyze_screenshot_rejects_invalid_base64(client, app, monkeypatch):
+    user = User(username='screenshots', passkey_credential=b'x', totp_secret='')
+    db.session.add(user)
+    db.session.commit()
+    token, _ = AuthService.create_session(user)
+
+    response = client.post('/api/analyze/screenshot', headers={'Authorization': f'Bearer {token}'},
+                           json={'image': 'not*valid*base64!!!x'})
+    assert response.status_code == 400
+
+    for cached in (True, False):
+        monkeypatch.setattr(Config, 'OCR_CACHE_ENABLED', cached)
+        result = OCRService.extract_text('not*valid*base64!!!x', preprocess=True)
+        assert not result['success'] and result['error'].startswith('Invalid image')
+
+def test_analyze_dark_patterns_tolerates_malformed_verdicts(client, monkeypatch):
+    def fake_generate(prompt, max_retries=5, api_key=None):
+        return {'success': True, 'text': json.dumps({'results': [
+            {'index': 0, 'dark_pattern_detected': True, 'pattern_type': ['false_urgency'],
+             'confidence_score': 0.9, 'severity': {'level': 'high'}},
+            {'index': 1, 'dark_pattern_detected': True, 'pattern_type': 7, 'confidence_score': 0.5}
+        ]})}
+
+    monkeypatch.setattr(AIService, '_generate', staticmethod(fake_generate))
+
+    response = client.post('/api/analyze/dark-patterns', json={'elements': [
+        {'text': 'Only 2 left!', 'pattern': 'false_urgency'},
+        {'text': 'No thanks', 'pattern': {'nested': True}}
+    ]})
+
+    assert response.status_code == 200
+    data = response.get_json()
+    assert [r['pattern_type'] for r in data['results']] == ['false_urgency', 'other']
+    assert data['results'][0]['severity'] == 'high'
+    assert data['aggregated']['pattern_types'] == {'false_urgency': 1, 'other': 1}
+
+def test_analyze_dark_patterns_is_rate_limited_per_address(client, monkeypatch):
+    monkeypatch.setattr(Config, 'RATE_LIMIT_DETECTION', '2 per minute')
+
+    responses = [client.post('/api/analyze/dark-patterns', json={'elements': 'nope'}) for _ in range(3)]
+    other = client.post('/api/analyze/dark-patterns', json={'elements': 'nope'},
+                        environ_base={'REMOTE_ADDR': '10.0.0.2'})
+
+    assert [response.status_code for response in responses] == [400, 400, 429]
+    assert responses[-1].get_json() == {'error': 'Rate limit exceeded'}
+    assert other.status_code == 400
@@ -0,0 +1,87 @@
+import pytest
+from sqlalchemy import event
+from backend.config import Config
+from backend.models import db, Settings, User
+from backend.services.auth_service import AuthService
+
+@pytest.fixture
+def statements(app):
+    executed = []
+    listener = lambda conn, cursor, statement, *args: executed.append(statement)
+    event.listen(db.engine, 'before_cursor_execute', listener)
+    yield executed
+    event.remove(db.engine, 'before_cursor_execute', listener)
+
+def make_user(with_settings=True):
+    user = User(username='middleware', passkey_credential=b'x', totp_secret='')
+    if with_settings:
+        user.settings = Settings(intervention_style='gentle')
+    db.session.add(user)
+    db.session.commit()
+    token, _ = AuthService.create_session(user)
+    return token
+
+def selects(statements):
+    return [s for s in statements if s.lstrip().upper().startswith('SELECT')]
+
+@pytest.mark.parametrize('cached', [False, True])
+def test_settings_read_takes_one_query(client, statements, monkeypatch, cached):
+    monkeypatch.setattr(Config, 'SESSION_CACHE_ENABLED', cached)
+    token = make_user()
+    headers = {'Authorization': f'Bearer {token}'}
+    client.get('/api/settings/sync', headers=headers)
+
+    db.session.expunge_all()
+    statements.clear()
+    response = client.get('/api/settings', headers=headers)
+
+    assert response.status_code == 200
+    assert response.get_json()['settings']['intervention_style'] == 'gentle'
+    assert len(statements) == 1
+    assert 'settings' in statements[0] and 'users' in statements[0]
+
+def test_settings_update_loads_everything_in_one_select(client, statements):
+    token = make_user()
+
+    db.session.expunge_all()
+    statements.clear()
+    response = client.put('/api/settings', headers={'Authorization': f'Bearer {token}'},
+                          json={'intervention_style': 'aggressive'})
+
+    assert response.status_code == 200
+    assert response.get_json()['settings_version'] == 1
+    assert response.get_json()['settings']['intervention_style'] == 'aggressive'
+    assert len(selects(statements)) == 1
+    assert User.query.one().settings.intervention_style == 'aggressive'
+
+def test_settings_are_created_for_users_without_them(client):
+    token = make_user(with_settings=False)
+
+    response = client.get('/api/settings', headers={'Authorization': f'Bearer {token}'})
+
+    assert response.status_code == 200
+    assert response.get_json()['settings']['intervention_style'] == 'moderate'
+    assert Settings.query.count() == 1
+
+    db.session.delete(Settings.query.one())
+    db.session.commit()
+    response = client.put('/api/settings', headers={'Authorization': f'Bearer {token}'},
+                          json={'doomscroll_time_threshold': 60})
+    assert response.get_json()['settings']['doomscroll_time_threshold'] == 60
+    assert response.get_json()['settings']['dark_pattern_sensitivity'] == 0.7
+
+def test_dashboard_cookie_authenticates_pages_but_not_the_api(app, client, statements):
+    app.secret_key = 'test'
+    token = make_user()
+    assert client.post('/api/frontend/login', json={'token': token}).status_code == 200
+
+    db.session.expunge_all()
+    statements.clear()
+    assert client.get('/settings').status_code == 200
+    assert len(selects(statements)) == 1
+
+    assert client.get('/api/frontend/check-session').get_json()['logged_in']
+    assert client.get('/api/settings/sync').status_code == 401
+    assert client.get('/api/settings/sync', headers={'Authorization': f'Bearer {token}'}).status_code == 200
+    client.get('/logout')
+    assert client.get('/settings').status_code == 302
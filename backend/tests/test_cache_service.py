@@ -0,0 +1,57 @@
+import sqlite3
+from hypothesis import given, strategies as st
+from backend.services.cache_service import LRUCache, AnalysisCache, SQLiteCache, normalize_text, content_key
+
+@given(text=st.text(max_size=200))
+def test_normalized_keys_ignore_whitespace_and_case(text):
+    variant = '  ' + text.upper().replace(' ', ' \n\t ') + '  '
+    assert content_key(normalize_text(variant)) == content_key(normalize_text(text.upper()))
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2, ttl=60)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+
+    assert cache.get('a') == 1
+    assert cache.get('b') is None
+    assert cache.get('c') == 3
+
+def test_lru_expires_entries():
+    cache = LRUCache(maxsize=2, ttl=60)
+    cache.set('a', 1, ttl=-1)
+
+    assert cache.get('a') is None
+
+def test_disk_tier_survives_new_instance(tmp_path):
+    path = str(tmp_path / 'cache.db')
+    first = AnalysisCache(maxsize=8, ttl=60, path=path)
+    first.set('key', {'detected': True}, latency=1.5)
+
+    second = AnalysisCache(maxsize=8, ttl=60, path=path)
+    assert second.get('key') == {'detected': True}
+    assert second.get('key') == {'detected': True}
+    assert second.get('missing') is None
+
+    stats = second.stats()
+    assert stats['disk_hits'] == 1
+    assert stats['memory_hits'] == 1
+    assert stats['misses'] == 1
+    assert stats['saved_seconds'] == 3.0
+
+def test_disk_tier_purges_expired_rows_on_write(tmp_path):
+    path = str(tmp_path / 'cache.db')
+    writer = SQLiteCache(path, ttl=60, purge_interval=3600)
+    for i in range(3):
+        writer.set(f'old{i}', {'i': i}, ttl=-1)
+    cache = SQLiteCache(path, ttl=60, purge_interval=0, purge_batch=2)
+
+    def rows():
+        with sqlite3.connect(path) as conn:
+            return sorted(key for key, in conn.execute('SELECT key FROM analysis_cache'))
+
+    cache.set('fresh', {})
+    assert len(rows()) == 2
+    cache.set('fresh', {})
+    assert rows() == ['fresh']
@@ -0,0 +1,94 @@
+import pytest
+from backend.config import Config
+from backend.services import local_classifier
+from backend.services.ai_service import AIService
+from backend.services.cascade_service import CascadeService
+from backend.services.metrics import Histogram
+
+class FixedScoreClassifier:
+    """Scores each text by a number looked up from a dict"""
+
+    def __init__(self, scores):
+        self.scores = scores
+
+    def classify(self, texts):
+        return [{
+            'detected': self.scores[text] >= 0.5,
+            'pattern_type': 'urgency_manipulation',
+            'confidence_score': self.scores[text]
+        } for text in texts]
+
+@pytest.fixture
+def cascade(monkeypatch):
+    monkeypatch.setattr(Config, 'ANALYSIS_CACHE_ENABLED', False)
+    monkeypatch.setattr(Config, 'AI_PREFILTER_ENABLED', False)
+    monkeypatch.setattr(Config, 'AI_CASCADE_ENABLED', True)
+    monkeypatch.setattr(Config, 'AI_CASCADE_LOW', 0.2)
+    monkeypatch.setattr(Config, 'AI_CASCADE_HIGH', 0.9)
+    monkeypatch.setattr(Config, 'AI_CASCADE_SHADOW_RATE', 0.0)
+
+    remote = []
+    def fake_request(prompt, max_retries=5, on_verdict=None):
+        remote.append(prompt)
+        return {'success': True, 'detected': True, 'pattern_type': 'urgency_manipulation',
+                'confidence_score': 0.8, 'description': 'remote', 'affected_elements': []}
+
+    monkeypatch.setattr(AIService, '_request_analysis', staticmethod(fake_request))
+    CascadeService.stats().reset()
+    yield remote
+    CascadeService.stats().reset()
+
+def test_only_the_uncertainty_band_reaches_gemini(cascade, monkeypatch):
+    scores = {'Add to cart': 0.05, 'Only 1 left, hurry!': 0.97, 'Offer ends soon': 0.55}
+    monkeypatch.setattr(local_classifier, 'get_local_classifier', lambda: FixedScoreClassifier(scores))
+
+    negative = AIService.analyze_text('Add to cart')
+    positive = AIService.analyze_text('Only 1 left, hurry!')
+    uncertain = AIService.analyze_text('Offer ends soon')
+
+    assert len(cascade) == 1 and 'Offer ends soon' in cascade[0]
+    assert negative['source'] == 'local' and not negative['detected']
+    assert positive['source'] == 'local' and positive['detected']
+    assert uncertain['description'] == 'remote'
+
+    stats = CascadeService.stats().snapshot()
+    assert stats['remote_calls'] == 1
+    assert stats['remote_calls_avoided'] == 2
+    assert stats['counters']['local_negative'] == 1
+    assert stats['counters']['local_positive'] == 1
+    assert stats['tiers']['local']['count'] == 2
+    assert stats['calibration'][5]['remote_positive'] == 1
+
+def test_everything_goes_remote_without_a_local_model(cascade, monkeypatch):
+    monkeypatch.setattr(local_classifier, 'get_local_classifier', lambda: None)
+
+    AIService.analyze_text('Add to cart')
+
+    stats = CascadeService.stats().snapshot()
+    assert len(cascade) == 1
+    assert stats['remote_calls_avoided'] == 0
+    assert all(not row['remote_positive'] for row in stats['calibration'])
+
+def test_shadow_traffic_calibrates_confident_scores(cascade, monkeypatch):
+    monkeypatch.setattr(Config, 'AI_CASCADE_SHADOW_RATE', 1.0)
+    monkeypatch.setattr(local_classifier, 'get_local_classifier', lambda: FixedScoreClassifier({'Add to cart': 0.05}))
+
+    AIService.analyze_text('Add to cart')
+
+    stats = CascadeService.stats().snapshot()
+    assert len(cascade) == 1
+    assert stats['counters']['shadow'] == 1
+    assert stats['calibration'][0]['remote_positive'] == 1
+
+def test_histogram_percentiles_are_bucket_bounds():
+    histogram = Histogram()
+    for _ in range(90):
+        histogram.record(0.010)
+    for _ in range(10):
+        histogram.record(1.0)
+
+    snapshot = histogram.snapshot()
+    assert snapshot['count'] == 100
+    assert 10 <= snapshot['p50_ms'] < 15
+    assert 1000 <= snapshot['p99_ms'] < 1500
+    assert snapshot['max_ms'] == 1000
@@ -0,0 +1,94 @@
+import threading
+from hypothesis import given, strategies as st
+from backend.config import Config
+from backend.services.ai_service import AIService
+from backend.services.chunking_service import ChunkingService
+
+words = st.text(alphabet='abcdefgh.!? ', min_size=1, max_size=40)
+pages = st.lists(st.lists(words, min_size=1, max_size=6).map('\n'.join), max_size=12).map('\n\n'.join)
+
+@given(text=pages, max_chars=st.integers(min_value=10, max_value=200))
+def test_split_keeps_every_word_within_the_limit(text, max_chars):
+    chunks = ChunkingService.split(text, max_chars)
+
+    assert all(len(chunk) <= max_chars for chunk in chunks)
+    assert ''.join(''.join(chunks).split()) == ''.join(text.split())
+
+def test_split_prefers_paragraph_boundaries():
+    text = 'Checkout\nYour cart\n\nOnly 3 left in stock\nHurry!\n\nTerms apply'
+    assert ChunkingService.split(text, 30) == ['Checkout\nYour cart', 'Only 3 left in stock\nHurry!', 'Terms apply']
+
+def test_clean_drops_repeated_boilerplate_and_whitespace():
+    text = 'Home  |  Shop\n\n\n\nOnly 3   left\nHOME | SHOP\nFooter\n\nFooter'
+    assert ChunkingService.clean(text) == 'Home | Shop\n\nOnly 3 left\nFooter'
+
+def test_select_prioritises_flagged_chunks_within_budget():
+    chunks = ['plain text ' * 20, 'also plain ' * 20, 'Only 3 left, hurry!', 'Subscribe to our newsletter']
+
+    assert ChunkingService.select(chunks, token_budget=20) == [3, 2]
+    assert ChunkingService.select(chunks, token_budget=20, unflagged_free=True) == [3, 2, 0, 1]
+
+def fake_chunk_analysis(verdicts, calls):
+    lock = threading.Lock()
+
+    def analyze(text, max_retries=5):
+        with lock:
+            calls.append(text)
+        for marker, verdict in verdicts.items():
+            if marker in text:
+                return dict(verdict, success=True)
+        return AIService.no_pattern_result()
+
+    return analyze
+
+def test_long_page_is_analyzed_past_the_fold(monkeypatch):
+    monkeypatch.setattr(Config, 'AI_CHUNK_CHARS', 200)
+    monkeypatch.setattr(Config, 'AI_PREFILTER_ENABLED', False)
+    calls = []
+    original = AIService.analyze_text
+    analyze_chunk = fake_chunk_analysis({
+        'Only 2 left': {'detected': True, 'pattern_type': 'urgency_manipulation', 'confidence_score': 0.7,
+                        'description': 'Scarcity', 'affected_elements': ['Only 2 left']},
+        'pre-checked': {'detected': True, 'pattern_type': 'misdirection', 'confidence_score': 0.6,
+                        'description': 'Opt-in', 'affected_elements': ['pre-checked box']}
+    }, calls)
+
+    def analyze_text(text, max_retries=5, on_verdict=None):
+        if len(text) > Config.AI_CHUNK_CHARS:
+            return original(text, max_retries, on_verdict)
+        return analyze_chunk(text, max_retries)
+
+    monkeypatch.setattr(AIService, 'analyze_text', staticmethod(analyze_text))
+
+    above = '\n\n'.join(f'Product {i} description with ordinary copy.' for i in range(30))
+    below = '\n\n'.join(f'Review {i} of a happy customer.' for i in range(30))
+    page = f'{above}\n\nOnly 2 left at this price\n\n{below}\n\nA pre-checked box adds insurance\nMenu\nMenu'
+    result = AIService.analyze_text(page)
+
+    assert len(page) > 2000
+    assert result['detected']
+    assert result['pattern_type'] == 'urgency_manipulation'
+    assert result['affected_elements'] == ['Only 2 left', 'pre-checked box']
+    assert result['coverage']['chunks_analyzed'] == result['coverage']['chunks_total'] == len(calls)
+    assert not result['coverage']['early_exit']
+
+def test_high_confidence_detection_exits_early(monkeypatch):
+    monkeypatch.setattr(Config, 'AI_CHUNK_CHARS', 100)
+    monkeypatch.setattr(Config, 'AI_MAX_CONCURRENCY', 1)
+    calls = []
+    monkeypatch.setattr(AIService, 'analyze_text', staticmethod(fake_chunk_analysis({
+        'hurry': {'detected': True, 'pattern_type': 'urgency_manipulation', 'confidence_score': 0.95,
+                  'description': 'Pressure', 'affected_elements': ['hurry']}
+    }, calls)))
+
+    page = '\n\n'.join(['Only 3 left, hurry!'] + [f'Paragraph {i} of ordinary text.' for i in range(40)])
+    result = AIService.analyze_page(page)
+
+    assert result['confidence_score'] == 0.95
+    assert result['coverage']['early_exit']
+    assert len(calls) < result['coverage']['chunks_total']
+
+def test_page_fails_only_when_every_chunk_fails():
+    failure = {'success': False, 'error': 'Timeout after retries'}
+    assert AIService.merge_verdicts([failure, failure]) == failure
+    assert AIService.merge_verdicts([failure, AIService.no_pattern_result()])['success']
@@ -0,0 +1,126 @@
+import io
+import random
+from PIL import Image, ImageDraw
+from backend.services.frame_diff import FrameDiffOCR, estimate_scroll_fine, row_profile
+
+WIDTH, HEIGHT = 800, 400
+
+def make_page(height=2000, seed=1):
+    rng = random.Random(seed)
+    page = Image.new('RGB', (WIDTH, height), (255, 255, 255))
+    draw = ImageDraw.Draw(page)
+    for y in range(0, height, 40):
+        words = ' '.join(rng.choice(['Only', '3', 'left', 'Hurry', 'deal', 'cart']) for _ in range(8))
+        draw.text((20 + rng.randint(0, 120), y + 10), words, fill=(0, 0, 0))
+        if rng.random() < 0.3:
+            draw.rectangle((500, y, 500 + rng.randint(40, 250), y + 30), fill=(rng.randint(0, 255), 90, 90))
+    return page
+
+def capture(page, offset):
+    buffer = io.BytesIO()
+    page.crop((0, offset, WIDTH, offset + HEIGHT)).save(buffer, format='PNG')
+    return buffer.getvalue()
+
+class FakeOCR:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, data):
+        self.calls.append(Image.open(io.BytesIO(data)).size)
+        return {'success': True, 'text': f'region{len(self.calls)}'}
+
+def test_scroll_estimate_is_pixel_exact():
+    page = make_page()
+    first = row_profile(page.crop((0, 300, WIDTH, 300 + HEIGHT)).convert('L'))
+    for dy in (-137, -1, 0, 1, 57, 190):
+        second = row_profile(page.crop((0, 300 + dy, WIDTH, 300 + dy + HEIGHT)).convert('L'))
+        assert estimate_scroll_fine(first, second) == dy
+
+def test_unchanged_frame_uploads_nothing():
+    page = make_page()
+    ocr = FakeOCR()
+    differ = FrameDiffOCR(ocr, width=200, max_region_bands=16)
+
+    first = differ.extract_text('tab', capture(page, 0))
+    second = differ.extract_text('tab', capture(page, 0))
+
+    assert first['uploaded_fraction'] == 1.0
+    assert second['uploaded_fraction'] == 0.0
+    assert second['text'] == first['text'] == 'region1'
+    assert len(ocr.calls) == 1
+
+def test_scroll_uploads_only_revealed_rows():
+    page = make_page()
+    ocr = FakeOCR()
+    differ = FrameDiffOCR(ocr, width=200, max_region_bands=16)
+
+    differ.extract_text('tab', capture(page, 0))
+    result = differ.extract_text('tab', capture(page, 100))
+
+    assert result['scroll_offset'] == 100
+    assert result['regions_uploaded'] == 1
+    # The revealed rows plus at most the band that straddled the old edge
+    assert 100 / HEIGHT <= result['uploaded_fraction'] < 0.5
+    assert result['text'] == 'region1\nregion2'
+    assert result['session']['frames'] == 2
+
+def test_changed_band_reuploads_its_group_only():
+    page = make_page()
+    ocr = FakeOCR()
+    differ = FrameDiffOCR(ocr, width=200, max_region_bands=16)
+
+    differ.extract_text('tab', capture(page, 0))
+    differ.extract_text('tab', capture(page, 150))
+
+    # Change a line inside the rows first read by the second call
+    edited = page.copy()
+    ImageDraw.Draw(edited).rectangle((40, 480, 300, 500), fill=(0, 0, 0))
+    result = differ.extract_text('tab', capture(edited, 150))
+
+    assert result['scroll_offset'] == 150
+    assert result['regions_uploaded'] == 1
+    assert 0 < result['uploaded_fraction'] < 0.5
+    assert result['text'] == 'region1\nregion3'
+
+def test_regions_are_capped_and_ocrd_separately():
+    page = make_page()
+    ocr = FakeOCR()
+    differ = FrameDiffOCR(ocr, width=200, band_height=25, max_region_bands=2)
+
+    result = differ.extract_text('tab', capture(page, 0))
+    # 100px bands at a 4x reduction, two bands per region
+    assert result['regions_uploaded'] == 2
+    assert sorted(ocr.calls) == [(WIDTH, 200), (WIDTH, 200)]
+
+def test_tabs_are_independent_and_bounded():
+    page = make_page()
+    ocr = FakeOCR()
+    differ = FrameDiffOCR(ocr, width=200, max_tabs=1)
+
+    differ.extract_text('a', capture(page, 0))
+    differ.extract_text('b', capture(page, 0))
+    assert differ.session_stats('a') is None
+    assert differ.session_stats('b')['frames'] == 1
+
+def test_ocr_failure_is_reported_without_updating_state():
+    page = make_page()
+    differ = FrameDiffOCR(lambda data: {'success': False, 'error': 'Timeout after retries'})
+
+    result = differ.extract_text('tab', capture(page, 0))
+    assert result == {'success': False, 'error': 'Timeout after retries'}
+    assert differ.session_stats('tab')['frames'] == 0
+
+def test_failed_frame_does_not_move_the_tab():
+    page = make_page()
+    ocr = FakeOCR()
+    differ = FrameDiffOCR(ocr, width=200, max_region_bands=16)
+    differ.extract_text('tab', capture(page, 0))
+
+    differ.ocr_func = lambda data: {'success': False, 'error': 'Timeout after retries'}
+    assert not differ.extract_text('tab', capture(page, 100))['success']
+
+    differ.ocr_func = ocr
+    result = differ.extract_text('tab', capture(page, 200))
+    assert result['success'] and result['scroll_offset'] == 200
+    assert differ.extract_text('tab', capture(page, 200))['uploaded_fraction'] == 0.0
+    assert differ.session_stats('tab')['frames'] == 3
@@ -0,0 +1,117 @@
+import json
+from backend.services.gemini_transport import GeminiTransport
+from backend.services.ocr_service import OCRService
+
+class FakeResponse:
+    def __init__(self, status_code, body=None):
+        self.status_code = status_code
+        self._body = body or {}
+        self.text = str(self._body)
+        self.closed = False
+
+    def json(self):
+        return self._body
+
+    def close(self):
+        self.closed = True
+
+def ok_body(text):
+    return {'candidates': [{'content': {'parts': [{'text': text}]}}]}
+
+def make_transport(monkeypatch, responses):
+    transport = GeminiTransport(pool_size=2, backoff_base=0, backoff_max=0)
+    queue = list(responses)
+    monkeypatch.setattr(transport.session, 'post', lambda *args, **kwargs: queue.pop(0))
+    return transport
+
+def test_transport_retries_then_reports_timing(monkeypatch):
+    transport = make_transport(monkeypatch, [FakeResponse(429), FakeResponse(503), FakeResponse(200, ok_body('hi'))])
+    events = []
+    transport.add_hook(events.append)
+
+    result = transport.generate([{'text': 'prompt'}], timeout=1, service='ai', max_retries=5)
+
+    assert result['success'] and result['text'] == 'hi'
+    assert len(events) == 1
+    assert events[0]['service'] == 'ai'
+    assert events[0]['retries'] == 2
+    assert events[0]['status'] == 200
+
+def test_transport_does_not_retry_client_errors(monkeypatch):
+    transport = make_transport(monkeypatch, [FakeResponse(400, {'error': 'bad'}), FakeResponse(200, ok_body('x'))])
+
+    result = transport.generate([{'text': 'prompt'}], timeout=1, max_retries=5)
+
+    assert not result['success']
+    assert result['error'].startswith('HTTP 400')
+
+def test_ocr_service_uses_shared_transport(monkeypatch):
+    transport = make_transport(monkeypatch, [FakeResponse(200, ok_body('Only 3 left'))])
+    monkeypatch.setattr('backend.services.ocr_service.get_transport', lambda: transport)
+
+    result = OCRService.extract_text(b'\x89PNG')
+
+    assert result['success'] and result['text'] == 'Only 3 left'
+
+class FakeStreamResponse:
+    status_code = 200
+    text = ''
+
+    def __init__(self, fragments, fail_after=None):
+        self.fragments = fragments
+        self.fail_after = fail_after
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+    def iter_lines(self):
+        for i, fragment in enumerate(self.fragments):
+            if i == self.fail_after:
+                raise ConnectionError('stream reset')
+            yield b'data: ' + json.dumps(ok_body(fragment)).encode()
+            yield b''
+
+def test_transport_streams_fragments_in_order(monkeypatch):
+    transport = make_transport(monkeypatch, [FakeResponse(503), FakeStreamResponse(['{"detected"', ': true}'])])
+    received = []
+
+    result = transport.generate([{'text': 'p'}], timeout=5, on_text=received.append)
+
+    assert result['success']
+    assert result['text'] == '{"detected": true}'
+    assert received == ['{"detected"', ': true}']
+
+def test_transport_does_not_retry_a_partially_delivered_stream(monkeypatch):
+    transport = make_transport(monkeypatch, [
+        FakeStreamResponse(['{"a"', ': 1}'], fail_after=1),
+        FakeStreamResponse(['{"a": 1}'])
+    ])
+    received = []
+
+    result = transport.generate([{'text': 'p'}], timeout=5, on_text=received.append)
+
+    assert not result['success']
+    assert received == ['{"a"']
+
+def test_transport_closes_every_streamed_response(monkeypatch):
+    responses = [
+        FakeResponse(503),
+        FakeStreamResponse(['{"a"', ': 1}'], fail_after=1),
+    ]
+    transport = make_transport(monkeypatch, responses)
+
+    transport.generate([{'text': 'p'}], timeout=5, on_text=lambda fragment: None)
+
+    assert all(response.closed for response in responses)
+
+def test_malformed_stream_counts_against_the_breaker(monkeypatch):
+    malformed = FakeStreamResponse([])
+    malformed.iter_lines = lambda: iter([b'data: {not json'])
+    transport = make_transport(monkeypatch, [malformed])
+
+    result = transport.generate([{'text': 'p'}], timeout=5, max_retries=1, on_text=lambda fragment: None)
+
+    assert not result['success']
+    assert transport.breaker.snapshot()['window_failures'] == 1
+    assert malformed.closed
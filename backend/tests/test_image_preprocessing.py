@@ -0,0 +1,44 @@
+import base64
+import io
+from PIL import Image, ImageDraw
+from backend.utils.image_preprocessing import preprocess_image, detect_mime_type
+
+def make_screenshot(size=(2880, 1800), margin=300):
+    image = Image.new('RGB', size, (255, 255, 255))
+    draw = ImageDraw.Draw(image)
+    for row in range(margin, size[1] - margin, 40):
+        draw.text((margin, row), 'Hurry! Only 3 left in stock - offer ends soon', fill=(20, 20, 20))
+    draw.rectangle((size[0] - margin - 10, size[1] - margin - 10, size[0] - margin, size[1] - margin), fill=(0, 0, 0))
+    buffer = io.BytesIO()
+    image.save(buffer, format='PNG')
+    return buffer.getvalue()
+
+def test_preprocess_shrinks_crops_and_relabels():
+    original = make_screenshot()
+
+    data, mime_type, stats = preprocess_image(original, max_dimension=1600)
+    processed = Image.open(io.BytesIO(data))
+
+    assert mime_type == 'image/jpeg'
+    assert processed.mode == 'L'
+    assert max(processed.size) <= 1600
+    # Uniform white margins are cropped away before scaling
+    assert processed.size[0] / processed.size[1] != 2880 / 1800
+    assert stats['preprocessed']
+    assert stats['processed_bytes'] < stats['original_bytes']
+
+def test_preprocess_accepts_base64_and_keeps_undecodable_data():
+    original = make_screenshot(size=(400, 300), margin=20)
+    data, _, stats = preprocess_image(base64.b64encode(original).decode())
+    assert stats['original_bytes'] == len(original)
+
+    garbage = b'GIF89a-not-really-an-image'
+    data, mime_type, stats = preprocess_image(garbage)
+    assert data == garbage
+    assert mime_type == 'image/gif'
+    assert not stats['preprocessed']
+
+def test_detect_mime_type_from_magic_bytes():
+    assert detect_mime_type(b'\x89PNG\r\n\x1a\nrest') == 'image/png'
+    assert detect_mime_type(b'RIFF\x00\x00\x00\x00WEBPVP8') == 'image/webp'
+    assert detect_mime_type(b'\xff\xd8\xff\xe0') == 'image/jpeg'
@@ -0,0 +1,102 @@
+import json
+import pytest
+from backend.config import Config
+from backend.models import User, db
+from backend.services import job_queue
+from backend.services.auth_service import AuthService
+from backend.services.job_queue import JobQueue, JobWorkerPool
+
+@pytest.fixture
+def queue(tmp_path):
+    return JobQueue(str(tmp_path / 'jobs.db'), lease_seconds=60, max_attempts=2, retry_backoff=0)
+
+def test_jobs_are_claimed_once_and_completed(queue):
+    job_id = queue.submit('analyze_text', {'text': 'Only 3 left'}, user_id=7)
+
+    job = queue.claim()
+    assert job['id'] == job_id and job['payload'] == {'text': 'Only 3 left'}
+    assert queue.claim() is None
+
+    queue.complete(job_id, {'detected': True})
+    stored = queue.get(job_id)
+    assert stored['status'] == JobQueue.DONE
+    assert stored['result'] == {'detected': True}
+
+def test_expired_lease_is_reclaimed(queue):
+    queue.lease_seconds = -1
+    job_id = queue.submit('ocr', {'image': 'abc'})
+    queue.claim()
+
+    reclaimed = queue.claim()
+    assert reclaimed['id'] == job_id
+    assert reclaimed['attempts'] == 2
+
+def test_job_that_keeps_losing_its_lease_is_failed(queue):
+    queue.lease_seconds = -1
+    job_id = queue.submit('ocr', {'image': 'abc'})
+    assert queue.claim()['attempts'] == 1
+    assert queue.claim()['attempts'] == 2
+
+    assert queue.claim() is None
+    assert queue.get(job_id)['status'] == JobQueue.FAILED
+    assert queue.get(job_id)['error'] == 'Lease expired on every attempt'
+
+def test_failed_jobs_back_off_before_retrying(tmp_path):
+    queue = JobQueue(str(tmp_path / 'jobs.db'), max_attempts=3, retry_backoff=60)
+    job_id = queue.submit('ocr', {'image': 'abc'})
+    queue.fail(queue.claim()['id'], 'gemini down', 1)
+
+    assert queue.get(job_id)['status'] == JobQueue.QUEUED
+    assert queue.claim() is None
+
+def test_failing_handler_is_retried_then_marked_failed(queue):
+    def explode(payload):
+        raise RuntimeError('gemini down')
+
+    pool = JobWorkerPool(queue, {'ocr': explode}, workers=0)
+    job_id = queue.submit('ocr', {'image': 'abc'})
+
+    assert pool.run_once()
+    assert queue.get(job_id)['status'] == JobQueue.QUEUED
+    assert pool.run_once()
+    assert queue.get(job_id)['status'] == JobQueue.FAILED
+    assert queue.get(job_id)['error'] == 'gemini down'
+    assert not pool.run_once()
+
+def test_error_results_are_retried(queue):
+    results = iter([{'success': False, 'error': 'Gemini API error: 503'}, {'success': True, 'text': 'Only 3 left'}])
+    pool = JobWorkerPool(queue, {'ocr': lambda payload: next(results)}, workers=0)
+    job_id = queue.submit('ocr', {'image': 'abc'})
+
+    assert pool.run_once()
+    assert queue.get(job_id)['status'] == JobQueue.QUEUED
+    assert queue.get(job_id)['error'] == 'Gemini API error: 503'
+    assert pool.run_once()
+    assert queue.get(job_id)['status'] == JobQueue.DONE
+    assert queue.get(job_id)['result']['text'] == 'Only 3 left'
+
+def test_job_endpoints_round_trip(client, monkeypatch, tmp_path):
+    monkeypatch.setattr(Config, 'JOB_QUEUE_PATH', str(tmp_path / 'jobs.db'))
+    monkeypatch.setattr(Config, 'JOB_WORKERS', 0)
+    monkeypatch.setattr(job_queue, '_job_queue', None)
+    monkeypatch.setattr(job_queue, '_worker_pool', None)
+    monkeypatch.setitem(job_queue.JOB_HANDLERS, 'analyze_text', lambda payload: {'echo': payload['text']})
+
+    user = User(username='jobuser', passkey_credential=b'x', totp_secret='')
+    db.session.add(user)
+    db.session.commit()
+    token, _ = AuthService.create_session(user)
+    headers = {'Authorization': f'Bearer {token}'}
+
+    response = client.post('/api/jobs', json={'type': 'text', 'text': 'Hurry!'}, headers=headers)
+    assert response.status_code == 202
+    job_id = json.loads(response.data)['job_id']
+
+    pending = json.loads(client.get(f'/api/jobs/{job_id}', headers=headers).data)
+    assert pending['status'] == JobQueue.QUEUED
+
+    job_queue.get_worker_pool().run_once()
+
+    done = json.loads(client.get(f'/api/jobs/{job_id}?wait=1', headers=headers).data)
+    assert done['status'] == JobQueue.DONE
+    assert done['result'] == {'echo': 'Hurry!'}
@@ -0,0 +1,38 @@
+import json
+from hypothesis import given, strategies as st
+from backend.utils.json_stream import IncrementalJSONParser
+
+json_values = st.recursive(
+    st.none() | st.booleans() | st.integers() | st.floats(allow_nan=False, allow_infinity=False) | st.text(),
+    lambda children: st.lists(children, max_size=3) | st.dictionaries(st.text(), children, max_size=3),
+    max_leaves=8
+)
+
+@given(
+    document=st.dictionaries(st.text(), json_values, max_size=6),
+    sizes=st.lists(st.integers(min_value=1, max_value=7), min_size=1),
+    indent=st.sampled_from([None, 2])
+)
+def test_fragmented_stream_matches_json_loads(document, sizes, indent):
+    text = 'Sure, here it is:\n```json\n' + json.dumps(document, indent=indent) + '\n```'
+    parser = IncrementalJSONParser()
+
+    emitted = []
+    offset, i = 0, 0
+    while offset < len(text):
+        size = sizes[i % len(sizes)]
+        emitted.extend(parser.feed(text[offset:offset + size]))
+        offset += size
+        i += 1
+
+    assert parser.done
+    assert dict(emitted) == document
+    assert [key for key, _ in emitted] == list(document)
+
+def test_fields_are_emitted_before_the_object_closes():
+    parser = IncrementalJSONParser()
+
+    assert parser.feed('{"detected": true, "pattern_type": "urg') == [('detected', True)]
+    assert parser.feed('ency_manipulation", "confidence_score": 0.8') == [('pattern_type', 'urgency_manipulation')]
+    assert parser.feed('5, "description": "Only 3 left') == [('confidence_score', 0.85)]
+    assert not parser.done
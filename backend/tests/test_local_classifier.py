@@ -0,0 +1,97 @@
+import numpy as np
+import pytest
+from backend.config import Config
+from backend.models import db, DetectionLog, User
+from backend.services.ai_service import AIService
+from backend.services.local_classifier import NONE_LABEL, LocalClassifier, hash_features
+from backend.train_classifier import collect_training_data
+
+EXAMPLES = {
+    'urgency_manipulation': ['Only 3 left in stock', 'Hurry, offer ends in 5 minutes', '12 people are viewing this'],
+    'confirm_shaming': ["No thanks, I don't want to save", 'I prefer paying full price', 'No, I hate discounts'],
+    NONE_LABEL: ['Add to cart', 'Free returns within 30 days', 'Contact support', 'Choose a size']
+}
+
+@pytest.fixture(scope='module')
+def model():
+    texts, labels = [], []
+    for label, examples in EXAMPLES.items():
+        for text in examples:
+            for suffix in ('', ' now', ' today'):
+                texts.append(text + suffix)
+                labels.append(label)
+    return LocalClassifier.train(texts, labels, bits=12, epochs=150)
+
+def test_hashed_features_are_stable_and_normalised():
+    rows, cols, values = hash_features(['Only 3 left', ''], bits=16)
+
+    assert list(rows) == [0, 0, 0, 0, 0, 0, 1]
+    assert cols[-1] == 1 << 16
+    ngram_norm = np.sqrt(np.sum(values[:5] ** 2))
+    assert ngram_norm == pytest.approx(1.0, rel=1e-5)
+    assert list(hash_features(['Only 3 left'], bits=16)[1]) == list(cols[:6])
+
+def test_classifies_training_patterns(model):
+    verdicts = model.classify(['Only 2 left in stock', 'No thanks, I prefer paying full price', 'Add to cart'])
+
+    assert [v['detected'] for v in verdicts] == [True, True, False]
+    assert [v['pattern_type'] for v in verdicts[:2]] == ['urgency_manipulation', 'confirm_shaming']
+
+def test_batch_scoring_matches_single_texts(model):
+    texts = ['Hurry, only 1 left', 'Contact support', '', 'I hate discounts']
+    batch = model.predict_proba(texts)
+    singles = np.vstack([model.predict_proba([text]) for text in texts])
+
+    assert np.allclose(batch, singles, atol=1e-6)
+
+def test_artifact_round_trip(model, tmp_path):
+    path = tmp_path / 'model.npz'
+    model.save(path)
+    loaded = LocalClassifier.load(path)
+
+    texts = ['Only 3 left in stock', 'Choose a size']
+    assert loaded.labels == model.labels
+    assert loaded.metadata['examples'] == model.metadata['examples']
+    assert np.allclose(loaded.predict_proba(texts), model.predict_proba(texts), atol=1e-2)
+
+def test_training_data_comes_from_detection_logs(app):
+    user = User(username='trainer', passkey_credential=b'x', totp_secret='')
+    db.session.add(user)
+    db.session.commit()
+
+    for pattern_type, confidence, elements in [
+        ('urgency_manipulation', 0.9, ['Only 3 left', {'text': 'Hurry!'}]),
+        ('misdirection', 0.1, ['Learn more']),
+        ('obstruction', 0.45, ['Call to cancel'])
+    ]:
+        detection = DetectionLog(user_id=user.id, url='https://shop.example', pattern_type=pattern_type,
+                                 confidence_score=confidence)
+        detection.set_page_elements(elements)
+        db.session.add(detection)
+    db.session.commit()
+
+    texts, labels = collect_training_data(min_confidence=0.6, negative_confidence=0.3)
+    assert sorted(zip(texts, labels)) == [
+        ('Hurry!', 'urgency_manipulation'),
+        ('Learn more', NONE_LABEL),
+        ('Only 3 left', 'urgency_manipulation')
+    ]
+
+def test_unreachable_gemini_falls_back_to_local_model(model, tmp_path, monkeypatch):
+    path = tmp_path / 'model.npz'
+    model.save(path)
+    monkeypatch.setattr(Config, 'LOCAL_MODEL_PATH', str(path))
+    monkeypatch.setattr(Config, 'ANALYSIS_CACHE_ENABLED', False)
+    monkeypatch.setattr(Config, 'AI_CASCADE_ENABLED', False)
+
+    error = {'success': False, 'error': 'Gemini circuit open, failing fast'}
+    monkeypatch.setattr(AIService, '_request_analysis', staticmethod(lambda *args, **kwargs: dict(error)))
+
+    result = AIService.analyze_text('Only 3 left in stock, hurry!')
+    assert result['success']
+    assert result['source'] == 'local'
+    assert result['pattern_type'] == 'urgency_manipulation'
+    assert result['fallback_reason'] == error['error']
+
+    error['error'] = 'HTTP 400: bad request'
+    assert AIService.analyze_text('Only 3 left in stock, hurry!') == error
@@ -0,0 +1,72 @@
+import json
+import random
+import pytest
+from backend.benchmarks.mock_gemini import DEFAULT_VERDICT, parse_latency, start_mock_server
+from backend.config import Config
+from backend.services.gemini_transport import GeminiTransport
+
+@pytest.fixture
+def mock(monkeypatch):
+    servers = []
+
+    def start(**kwargs):
+        server, url = start_mock_server(latency=0, seed=0, **kwargs)
+        servers.append(server)
+        return server, url
+
+    yield start
+    for server in servers:
+        server.shutdown()
+
+def generate(url, monkeypatch, prompt='Only 3 left', max_retries=3):
+    monkeypatch.setattr(Config, 'GEMINI_API_URL', url)
+    transport = GeminiTransport(pool_size=2, backoff_base=0, backoff_max=0)
+    events = []
+    transport.add_hook(events.append)
+    return transport.generate([{'text': prompt}], timeout=5, max_retries=max_retries), events
+
+def test_injected_rate_limits_are_retried(mock, monkeypatch):
+    server, url = mock(rate_limit_rate=1.0)
+
+    result, events = generate(url, monkeypatch)
+
+    assert result == {'success': False, 'error': 'Service unavailable after retries'}
+    assert events[0]['retries'] == 2
+    assert server.status_counts == {429: 3}
+
+def test_malformed_body_is_retried_and_text_is_cut(mock, monkeypatch):
+    server, url = mock(malformed_rate=1.0, malformed_kind='body')
+    result, events = generate(url, monkeypatch)
+    assert not result['success'] and events[0]['attempts'] == 3
+
+    server, url = mock(malformed_rate=1.0)
+    result, _ = generate(url, monkeypatch)
+    assert result['success']
+    assert result['text'] == json.dumps(DEFAULT_VERDICT)[:len(json.dumps(DEFAULT_VERDICT)) // 2]
+
+def test_recorded_responses_are_replayed(mock, monkeypatch, tmp_path):
+    recording = tmp_path / 'captured.jsonl'
+    real_verdict = dict(DEFAULT_VERDICT, pattern_type='hidden_costs')
+    _, real_url = mock(verdict=real_verdict)
+    _, proxy_url = mock(upstream=real_url, record=str(recording))
+
+    recorded, _ = generate(proxy_url, monkeypatch)
+    assert json.loads(recorded['text'])['pattern_type'] == 'hidden_costs'
+
+    replay, replay_url = mock(replay=str(recording))
+    replayed, _ = generate(replay_url, monkeypatch)
+    missed, _ = generate(replay_url, monkeypatch, prompt='Something else')
+
+    assert replayed['text'] == recorded['text']
+    assert json.loads(missed['text'])['pattern_type'] == DEFAULT_VERDICT['pattern_type']
+    assert replay.replay_misses == 1
+
+def test_latency_specs():
+    rng = random.Random(0)
+
+    assert parse_latency('0.25')(rng) == 0.25
+    assert 0.1 <= parse_latency('uniform:0.1,0.2')(rng) <= 0.2
+    samples = sorted(parse_latency('lognormal:0.2,0.5')(rng) for _ in range(2000))
+    assert samples[1000] == pytest.approx(0.2, rel=0.1)
+    with pytest.raises(ValueError):
+        parse_latency('gamma:1')
@@ -0,0 +1,109 @@
+import io
+from hypothesis import given, strategies as st
+from PIL import Image, ImageDraw
+from backend.services import ocr_service
+from backend.services.ocr_cache import OCRCache, hamming_distance
+from backend.services.ocr_service import OCRService
+from backend.services.usage_service import attribute_usage
+
+@given(
+    phash=st.integers(min_value=0, max_value=2 ** 64 - 1),
+    flips=st.sets(st.integers(min_value=0, max_value=63), max_size=6)
+)
+def test_similar_lookup_matches_brute_force(phash, flips):
+    cache = OCRCache(max_distance=4)
+    cache.set('a', phash, 'cached text')
+
+    probe = phash
+    for bit in flips:
+        probe ^= 1 << bit
+
+    found = cache.get_similar(probe)
+    if hamming_distance(phash, probe) <= 4:
+        assert found == ('cached text', len(flips))
+    else:
+        assert found is None
+
+def test_cache_is_bounded_by_entries_and_bytes():
+    cache = OCRCache(maxsize=2, max_bytes=10)
+    cache.set('a', 0, 'aaaa')
+    cache.set('b', 2 ** 64 - 1, 'bbbb')
+    cache.set('c', 0x00FF00FF00FF00FF, 'cccc')
+    assert cache.get_exact('a') is None
+
+    cache.set('d', 0xFF00FF00FF00FF00, 'dddddddddd')
+    stats = cache.stats()
+    assert stats['entries'] == 1
+    assert stats['text_bytes'] == 10
+    assert cache.get_similar(2 ** 64 - 1) is None
+
+def render(offset):
+    image = Image.new('RGB', (640, 400), (255, 255, 255))
+    draw = ImageDraw.Draw(image)
+    draw.rectangle((40, 40, 600, 120), fill=(30, 80, 200))
+    draw.rectangle((40, 200, 300, 360), fill=(200, 60, 60))
+    draw.text((320, 220 + offset), 'Only 3 left', fill=(0, 0, 0))
+    buffer = io.BytesIO()
+    image.save(buffer, format='PNG')
+    return buffer.getvalue()
+
+def test_ocr_service_reuses_text_for_near_duplicate_frames(monkeypatch):
+    monkeypatch.setattr(ocr_service, '_ocr_cache', None)
+    calls = []
+
+    class FakeTransport:
+        def generate(self, parts, **kwargs):
+            calls.append(parts)
+            return {'success': True, 'text': 'Only 3 left'}
+
+    monkeypatch.setattr(ocr_service, 'get_transport', lambda: FakeTransport())
+
+    first = OCRService.extract_text(render(0))
+    again = OCRService.extract_text(render(0))
+    shifted = OCRService.extract_text(render(2))
+
+    assert len(calls) == 1
+    assert first['text'] == again['text'] == shifted['text'] == 'Only 3 left'
+    assert again['cache'] == 'exact'
+    assert shifted['cache'] == 'perceptual'
+    assert OCRService.cache_stats()['hit_rate'] == 2 / 3
+
+def test_near_duplicate_frames_are_not_shared_between_users(monkeypatch):
+    monkeypatch.setattr(ocr_service, '_ocr_cache', None)
+    calls = []
+
+    class FakeTransport:
+        def generate(self, parts, **kwargs):
+            calls.append(parts)
+            return {'success': True, 'text': f'frame {len(calls)}'}
+
+    monkeypatch.setattr(ocr_service, 'get_transport', lambda: FakeTransport())
+
+    with attribute_usage(1):
+        assert OCRService.extract_text(render(0))['text'] == 'frame 1'
+    with attribute_usage(2):
+        other = OCRService.extract_text(render(2))
+        assert OCRService.extract_text(render(0))['cache'] == 'exact'
+    with attribute_usage(1):
+        own = OCRService.extract_text(render(1))
+
+    assert other['text'] == 'frame 2' and 'cache' not in other
+    assert own['cache'] == 'perceptual' and own['text'] == 'frame 1'
+
+def test_frame_diff_crops_skip_the_perceptual_lookup(monkeypatch):
+    monkeypatch.setattr(ocr_service, '_ocr_cache', None)
+    calls = []
+
+    class FakeTransport:
+        def generate(self, parts, **kwargs):
+            calls.append(parts)
+            return {'success': True, 'text': f'band {len(calls)}'}
+
+    monkeypatch.setattr(ocr_service, 'get_transport', lambda: FakeTransport())
+
+    OCRService.extract_text(render(0))
+    crop = OCRService.extract_text(render(2), perceptual=False)
+    assert crop['text'] == 'band 2' and 'cache' not in crop
+    assert OCRService.extract_text(render(2), perceptual=False)['cache'] == 'exact'
+    assert OCRService.extract_text(render(1))['text'] == 'band 1'
+    assert ocr_service.get_frame_diff().ocr_func.keywords == {'perceptual': False}
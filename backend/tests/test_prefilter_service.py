@@ -0,0 +1,31 @@
+import pytest
+from backend.services.prefilter_service import PrefilterService
+from backend.services.ai_service import AIService
+
+@pytest.mark.parametrize('text,family', [
+    ("No, I don't want to save money", 'confirm_shaming'),
+    ('No thanks, I prefer paying more', 'confirm_shaming'),
+    ('Only 2 left in stock!', 'false_urgency'),
+    ('15 people viewing this item', 'false_urgency'),
+    ('LIMITED TIME offer', 'false_urgency'),
+    ('$19.99 + shipping', 'hidden_costs'),
+    ('*See details for additional fees', 'hidden_costs'),
+    ('Share my data with third-party partners', 'sneaky_opt_in'),
+])
+def test_prefilter_detects_quickscan_families(text, family):
+    assert PrefilterService.has_match(text)
+    assert family in PrefilterService.families(text)
+
+def test_prefilter_ignores_clean_text():
+    assert not PrefilterService.has_match('Free returns within 30 days. Add to cart.')
+    assert PrefilterService.scan('') == []
+
+def test_analyze_text_skips_gemini_without_prefilter_match(monkeypatch):
+    def fail_request(prompt, max_retries=5):
+        raise AssertionError('Gemini should not be called')
+
+    monkeypatch.setattr(AIService, '_request_analysis', staticmethod(fail_request))
+
+    result = AIService.analyze_text('Free returns within 30 days. Add to cart.')
+
+    assert result['success'] and not result['detected']
@@ -0,0 +1,68 @@
+from backend.services.resilience import CircuitBreaker, RetryBudget
+from backend.services.gemini_transport import GeminiTransport
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def test_breaker_opens_half_opens_and_closes():
+    clock = FakeClock()
+    breaker = CircuitBreaker(error_rate=0.5, min_requests=4, window=30, cooldown=10, clock=clock)
+
+    for success in (True, False, False, True):
+        assert breaker.allow()
+        breaker.record(success)
+
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+    clock.now = 11
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    # Only one probe at a time while half-open
+    assert not breaker.allow()
+
+    breaker.record(True)
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow()
+
+def test_failed_probe_reopens_breaker():
+    clock = FakeClock()
+    breaker = CircuitBreaker(error_rate=0.5, min_requests=1, cooldown=10, clock=clock)
+    breaker.record(False)
+
+    clock.now = 11
+    assert breaker.allow()
+    breaker.record(False)
+
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+def test_retry_budget_scales_with_traffic():
+    clock = FakeClock()
+    budget = RetryBudget(ratio=0.1, min_retries=1, window=10, clock=clock)
+
+    for _ in range(30):
+        budget.record_request()
+
+    assert [budget.try_acquire() for _ in range(4)] == [True, True, True, False]
+
+    clock.now = 11
+    assert budget.try_acquire()
+
+def test_open_breaker_fails_fast_without_network(monkeypatch):
+    breaker = CircuitBreaker(min_requests=1)
+    breaker.record(False)
+    transport = GeminiTransport(breaker=breaker)
+
+    def no_network(*args, **kwargs):
+        raise AssertionError('request should not be sent')
+
+    monkeypatch.setattr(transport.session, 'post', no_network)
+
+    result = transport.generate([{'text': 'prompt'}], timeout=1)
+
+    assert result == {'success': False, 'error': 'Gemini circuit open, failing fast'}
@@ -0,0 +1,44 @@
+import json
+import numpy as np
+import pytest
+from backend.config import Config
+from backend.services.sentiment_service import SentimentService
+
+def test_negative_text_scores_higher_than_positive():
+    scores = SentimentService.negativity([
+        'Another deadly attack, the victims are still missing',
+        'What a lovely, inspiring story, so grateful',
+        'Click here to read more'
+    ])
+
+    assert scores[0] > 0.5
+    assert scores[1] == 0.0
+    assert scores[2] == 0.0
+
+def test_negators_flip_the_next_word():
+    plain, negated = SentimentService.negativity(['this is bad', 'this is not bad'])
+
+    assert plain > 0
+    assert negated == 0.0
+
+def test_batch_matches_single_samples():
+    samples = ['terrible news today', '', 'great win for the team', 'not happy, worried and tired']
+    batch = SentimentService.negativity(samples)
+    singles = np.array([SentimentService.negativity([sample])[0] for sample in samples])
+
+    assert np.allclose(batch, singles)
+
+def test_sentiment_endpoint_scores_a_batch(client):
+    response = client.post('/api/analyze/sentiment', json={'samples': ['awful crash, many injured', 'nice day']})
+
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert len(data['scores']) == 2
+    assert data['aggregate']['samples'] == 2
+    assert data['aggregate']['negativity'] == pytest.approx(sum(data['scores']) / 2, abs=1e-3)
+
+def test_sentiment_endpoint_validates_samples(client, monkeypatch):
+    assert client.post('/api/analyze/sentiment', json={'samples': 'one'}).status_code == 400
+
+    monkeypatch.setattr(Config, 'SENTIMENT_MAX_SAMPLES', 2)
+    assert client.post('/api/analyze/sentiment', json={'samples': ['a', 'b', 'c']}).status_code == 413
@@ -0,0 +1,92 @@
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import event
+from backend.config import Config
+from backend.models import db, Session, User
+from backend.services import session_cache
+from backend.services.auth_service import AuthService
+from backend.services.session_cache import RevocationLog, SessionCache
+
+@pytest.fixture
+def cache(monkeypatch, tmp_path):
+    monkeypatch.setattr(Config, 'SESSION_REVOCATION_PATH', str(tmp_path / 'revoked.log'))
+    monkeypatch.setattr(session_cache, '_session_cache', None)
+    return session_cache.get_session_cache()
+
+def make_user(name='reader'):
+    user = User(username=name, passkey_credential=b'x', totp_secret='')
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+def count_queries():
+    statements = []
+    event.listen(db.engine, 'before_cursor_execute', lambda *args: statements.append(args[2]))
+    return statements
+
+def test_cached_validation_skips_the_sessions_table(app, cache):
+    user = make_user()
+    token, _ = AuthService.create_session(user)
+    assert AuthService.validate_session(token) == (user, None)
+
+    db.session.expunge_all()
+    statements = count_queries()
+    validated, error = AuthService.validate_session(token)
+
+    assert error is None and validated.id == user.id
+    assert len(statements) == 1 and 'sessions' not in statements[0]
+    assert cache.stats()['hits'] == 1
+
+def test_logout_on_one_worker_revokes_on_the_others(app, cache, tmp_path):
+    user = make_user()
+    token, expires_at = AuthService.create_session(user)
+    other = SessionCache(revocations=RevocationLog(str(tmp_path / 'revoked.log')))
+    other.put(token, user.id, expires_at)
+    assert other.get(token) == (user.id, expires_at)
+
+    assert AuthService.invalidate_session(token)
+
+    assert other.get(token) is None
+    assert other.stats()['revoked'] == 1
+    assert AuthService.validate_session(token) == (None, 'Invalid session')
+
+def test_logout_revokes_only_after_the_row_is_deleted(app, cache, monkeypatch):
+    user = make_user()
+    token, _ = AuthService.create_session(user)
+    rows_at_revoke = []
+    revoke = cache.revoke
+    monkeypatch.setattr(cache, 'revoke', lambda t: rows_at_revoke.append(Session.query.count()) or revoke(t))
+
+    assert AuthService.invalidate_session(token)
+    assert rows_at_revoke == [0]
+
+def test_expired_session_is_not_served_from_cache(app, cache):
+    user = make_user()
+    token, _ = AuthService.create_session(user)
+    AuthService.validate_session(token)
+
+    expired = datetime.utcnow() - timedelta(seconds=1)
+    cache._cache.set(session_cache.token_digest(token), (user.id, expired))
+    Session.query.filter_by(token=token).update({'expires_at': expired})
+    db.session.commit()
+
+    assert AuthService.validate_session(token) == (None, 'Session expired')
+    assert cache.get(token) is None
+
+def test_unknown_tokens_are_not_logged(app, cache, tmp_path):
+    assert not AuthService.invalidate_session('not-a-token')
+    assert not (tmp_path / 'revoked.log').exists()
+
+def test_revocation_log_compacts_expired_lines(tmp_path):
+    path = str(tmp_path / 'revoked.log')
+    writer = RevocationLog(path, max_bytes=40)
+    reader = RevocationLog(path)
+
+    for i in range(5):
+        writer.append(f'old{i}', 0)
+    assert [digest for digest, _ in reader.poll()] == [f'old{i}' for i in range(5)]
+
+    writer.append('live', 4102444800)
+    assert reader.poll() == [('live', 4102444800.0)]
+    with open(path) as f:
+        assert f.read().split() == ['live', '4102444800']
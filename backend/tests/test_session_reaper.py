@@ -0,0 +1,64 @@
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import event
+from backend.config import Config
+from backend.models import db, RevokedToken, Session, User
+from backend.services import session_reaper
+from backend.services.auth_service import AuthService
+from backend.services.session_reaper import SessionReaper
+
+@pytest.fixture
+def user(app, monkeypatch):
+    monkeypatch.setattr(Config, 'SESSION_CACHE_ENABLED', False)
+    user = User(username='reaped', passkey_credential=b'x', totp_secret='')
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+def add_sessions(user, count, expires_at):
+    db.session.add_all([Session(user_id=user.id, token=f'{expires_at.timestamp()}-{i}', expires_at=expires_at)
+                        for i in range(count)])
+    db.session.commit()
+
+def test_validating_an_expired_session_does_not_write(user):
+    token, _ = AuthService.create_session(user)
+    Session.query.filter_by(token=token).update({'expires_at': datetime.utcnow() - timedelta(seconds=1)})
+    db.session.commit()
+
+    statements = []
+    event.listen(db.engine, 'before_cursor_execute', lambda conn, cursor, statement, *args: statements.append(statement))
+    assert AuthService.validate_session(token) == (None, 'Session expired')
+
+    assert all(s.lstrip().upper().startswith('SELECT') for s in statements)
+    assert Session.query.count() == 1
+
+def test_reaper_deletes_expired_sessions_in_batches(app, user, tmp_path):
+    now = datetime.utcnow()
+    add_sessions(user, 10, now - timedelta(hours=1))
+    add_sessions(user, 2, now + timedelta(hours=1))
+    reaper = SessionReaper(app, batch_size=3, pause=0, lock_path=str(tmp_path / 'reaper.lock'))
+
+    assert reaper.reap_once(now) == 10
+    assert Session.query.count() == 2
+    assert reaper.stats()['batches'] == 4
+    assert reaper.reap_once(now) == 0
+
+@pytest.mark.skipif(session_reaper.fcntl is None, reason='needs fcntl')
+def test_one_reaper_per_host_holds_the_lock(app, tmp_path):
+    path = str(tmp_path / 'reaper.lock')
+    first, second = SessionReaper(app, lock_path=path), SessionReaper(app, lock_path=path)
+
+    fd = first._try_lock()
+    assert fd is not None and second._try_lock() is None
+    session_reaper.os.close(fd)
+    assert second._try_lock() is not None
+
+def test_reaper_deletes_expired_revocations(app, user, tmp_path):
+    now = datetime.utcnow()
+    db.session.add_all([RevokedToken(digest='old', expires_at=now - timedelta(hours=1)),
+                        RevokedToken(digest='live', expires_at=now + timedelta(hours=1))])
+    db.session.commit()
+    reaper = SessionReaper(app, pause=0, lock_path=str(tmp_path / 'reaper.lock'))
+
+    assert reaper.reap_once(now) == 1
+    assert [row.digest for row in RevokedToken.query] == ['live']
@@ -0,0 +1,116 @@
+import time
+import pytest
+from backend.app import create_app
+from backend.config import Config
+from backend.models import db, RevokedToken, Session, User
+from backend.services import session_tokens
+from backend.services.auth_service import AuthService
+from backend.services.session_cache import RevocationLog
+from backend.services.session_tokens import RevokedTokenStore, SignedSessionTokens
+
+@pytest.fixture
+def signed(monkeypatch, tmp_path):
+    monkeypatch.setattr(Config, 'SESSION_TOKEN_MODE', 'signed')
+    monkeypatch.setattr(Config, 'SECRET_KEY', 'private-test-key')
+    monkeypatch.setattr(Config, 'SESSION_REVOCATION_PATH', str(tmp_path / 'revoked.log'))
+    monkeypatch.setattr(Config, 'SESSION_REVOCATION_POLL_SECONDS', 0)
+    monkeypatch.setattr(session_tokens, '_session_tokens', None)
+    return session_tokens.get_session_tokens()
+
+def make_user(name='signer'):
+    user = User(username=name, passkey_credential=b'x', totp_secret='')
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+def test_tokens_verify_without_the_database():
+    tokens = SignedSessionTokens('secret')
+    expires_at = int(time.time()) + 60
+    token = tokens.issue(42, expires_at)
+
+    assert tokens.verify(token) == (42, expires_at, None)
+    assert SignedSessionTokens('other').verify(token)[2] == 'Invalid session'
+
+    version, user_id, expiry, nonce, mac = token.split('.')
+    forged = '.'.join([version, '1', expiry, nonce, mac])
+    assert tokens.verify(forged)[2] == 'Invalid session'
+    assert tokens.verify(tokens.issue(42, time.time() - 1))[2] == 'Session expired'
+    assert tokens.verify('not.a.token')[2] == 'Invalid session'
+
+def test_signed_mode_issues_tokens_without_session_rows(client, signed):
+    user = make_user()
+    token, _ = AuthService.create_session(user)
+
+    assert token.startswith('s1.')
+    assert Session.query.count() == 0
+    response = client.get('/api/auth/session', headers={'Authorization': f'Bearer {token}'})
+    assert response.status_code == 200
+    assert response.get_json()['user_id'] == user.id
+
+def test_logout_revokes_on_every_worker(client, signed, tmp_path):
+    user = make_user()
+    token, _ = AuthService.create_session(user)
+    other = SignedSessionTokens(Config.SECRET_KEY, revocations=RevocationLog(str(tmp_path / 'revoked.log')))
+    assert other.verify(token)[2] is None
+
+    response = client.post('/api/auth/logout', headers={'Authorization': f'Bearer {token}'})
+
+    assert response.status_code == 200
+    assert other.verify(token)[2] == 'Invalid session'
+    assert AuthService.validate_session(token) == (None, 'Invalid session')
+    assert client.post('/api/auth/logout', headers={'Authorization': f'Bearer {token}'}).status_code == 400
+
+def test_revocations_are_dropped_once_the_token_expires(tmp_path):
+    tokens = SignedSessionTokens('secret', revocations=RevocationLog(str(tmp_path / 'revoked.log')))
+    short = tokens.issue(1, time.time() + 1)
+    long = tokens.issue(1, time.time() + 3600)
+    assert tokens.revoke(short) and tokens.revoke(long)
+    assert tokens.revoked_count() == 2
+
+    time.sleep(1.1)
+    assert tokens.is_revoked(long)
+    assert tokens.revoked_count() == 1
+
+def test_opaque_tokens_keep_working_after_switching_modes(app, monkeypatch, signed):
+    user = make_user()
+    monkeypatch.setattr(Config, 'SESSION_TOKEN_MODE', 'opaque')
+    token, _ = AuthService.create_session(user)
+    monkeypatch.setattr(Config, 'SESSION_TOKEN_MODE', 'signed')
+
+    assert AuthService.validate_session(token) == (user, None)
+    assert AuthService.invalidate_session(token)
+    assert AuthService.validate_session(token) == (None, 'Invalid session')
+
+def test_non_ascii_tokens_are_rejected(client):
+    tokens = SignedSessionTokens('secret')
+    assert tokens.verify('s1.1.2.é.abc')[2] == 'Invalid session'
+    assert tokens.verify(tokens.issue(1, time.time() + 60)[:-1] + 'é')[2] == 'Invalid session'
+
+    response = client.get('/api/settings', headers={'Authorization': 'Bearer s1.1.2.é.abc'})
+    assert response.status_code == 401
+    assert response.get_json()['error'] == 'Invalid session'
+
+def test_revocations_reach_workers_on_other_hosts(client, signed):
+    user = make_user()
+    token, _ = AuthService.create_session(user)
+    assert client.post('/api/auth/logout', headers={'Authorization': f'Bearer {token}'}).status_code == 200
+
+    # A fresh process elsewhere shares only the database, not the host's revocation log
+    elsewhere = SignedSessionTokens(Config.SECRET_KEY, store=RevokedTokenStore(interval=0))
+    assert RevokedToken.query.count() == 1
+    assert elsewhere.verify(token)[2] == 'Invalid session'
+    assert elsewhere.revoke(token) is False
+    assert RevokedToken.query.count() == 1
+
+def test_signed_mode_refuses_the_development_secret_key(client, signed, monkeypatch):
+    user = make_user()
+    token, _ = AuthService.create_session(user)
+    monkeypatch.setattr(Config, 'SECRET_KEY', Config.DEV_SECRET_KEY)
+    monkeypatch.setattr(session_tokens, '_session_tokens', None)
+
+    with pytest.raises(RuntimeError):
+        create_app('testing')
+    with pytest.raises(RuntimeError):
+        session_tokens.get_session_tokens()
+    assert AuthService.validate_session(token) == (None, 'Invalid session')
+    assert not AuthService.invalidate_session(token)
@@ -0,0 +1,98 @@
+import multiprocessing
+import os
+import threading
+import time
+import pytest
+from backend.config import Config
+from backend.services import single_flight
+from backend.services.ai_service import AIService
+from backend.services.single_flight import SingleFlight
+
+pytestmark = pytest.mark.skipif(single_flight.fcntl is None, reason='needs fcntl')
+fork = multiprocessing.get_context('fork')
+
+def slow_call(calls_path, seconds=0.3):
+    def call():
+        with open(calls_path, 'a') as f:
+            f.write(f'{os.getpid()}\n')
+        time.sleep(seconds)
+        return {'leader': os.getpid()}
+    return call
+
+def test_burst_of_identical_texts_makes_one_call(monkeypatch, tmp_path):
+    monkeypatch.setattr(Config, 'ANALYSIS_CACHE_ENABLED', False)
+    monkeypatch.setattr(Config, 'AI_PREFILTER_ENABLED', False)
+    monkeypatch.setattr(Config, 'AI_CASCADE_ENABLED', False)
+    monkeypatch.setattr(Config, 'SINGLE_FLIGHT_DIR', str(tmp_path))
+    monkeypatch.setattr(single_flight, '_single_flight', None)
+
+    calls = []
+    def fake_request(prompt, max_retries=5, on_verdict=None):
+        calls.append(prompt)
+        time.sleep(0.2)
+        return {'success': True, 'detected': True, 'pattern_type': 'urgency_manipulation',
+                'confidence_score': 0.9, 'description': 'x', 'affected_elements': []}
+
+    monkeypatch.setattr(AIService, '_request_analysis', staticmethod(fake_request))
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(AIService.analyze_text('Only 1 left!')))
+               for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert len(results) == 20 and all(r['detected'] for r in results)
+    assert single_flight.get_single_flight().stats()['followers'] == 19
+
+def test_burst_across_processes_makes_one_call(tmp_path):
+    calls_path = tmp_path / 'calls'
+    barrier = fork.Barrier(4)
+    results = fork.Queue()
+
+    def worker():
+        flight = SingleFlight(directory=str(tmp_path / 'leases'))
+        barrier.wait()
+        results.put(flight.do('page-key', slow_call(calls_path)))
+
+    processes = [fork.Process(target=worker) for _ in range(4)]
+    for process in processes:
+        process.start()
+    outcomes = [results.get(timeout=10) for _ in processes]
+    for process in processes:
+        process.join()
+
+    assert len(calls_path.read_text().split()) == 1
+    assert len({outcome[0]['leader'] for outcome in outcomes}) == 1
+    assert sorted(shared for _, shared in outcomes) == [False, True, True, True]
+
+def test_waiter_takes_over_when_leader_dies(tmp_path):
+    leases = str(tmp_path / 'leases')
+    started = fork.Event()
+
+    def crashing_leader():
+        def call():
+            started.set()
+            time.sleep(0.3)
+            os._exit(1)
+        SingleFlight(directory=leases).do('page-key', call)
+
+    process = fork.Process(target=crashing_leader)
+    process.start()
+    assert started.wait(5)
+
+    flight = SingleFlight(directory=leases)
+    result, shared = flight.do('page-key', lambda: {'leader': 'waiter'})
+    process.join()
+
+    assert result == {'leader': 'waiter'} and not shared
+    assert process.exitcode == 1
+    assert flight.stats()['takeovers'] == 1
+
+def test_stale_results_are_not_reused(tmp_path):
+    flight = SingleFlight(directory=str(tmp_path))
+
+    assert flight.do('key', lambda: 1) == (1, False)
+    assert flight.do('key', lambda: 2) == (2, False)
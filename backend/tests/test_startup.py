@@ -0,0 +1,52 @@
+from sqlalchemy import event, inspect
+from sqlalchemy.exc import IntegrityError
+from backend.app import create_app
+from backend.models import db, ensure_schema, SchemaVersion, SCHEMA_VERSION, Session
+
+def test_current_schema_is_checked_with_one_query(app):
+    ensure_schema()
+    statements = []
+    event.listen(db.engine, 'before_cursor_execute', lambda conn, cursor, statement, *args: statements.append(statement))
+
+    assert not ensure_schema()
+    assert len(statements) == 1 and 'schema_version' in statements[0]
+
+def test_outdated_schema_gets_missing_indexes(app):
+    ensure_schema()
+    index = next(i for i in Session.__table__.indexes if i.name == 'ix_sessions_expires_at')
+    index.drop(bind=db.engine)
+    SchemaVersion.query.delete()
+    db.session.commit()
+
+    assert ensure_schema()
+    assert 'ix_sessions_expires_at' in {i['name'] for i in inspect(db.engine).get_indexes('sessions')}
+    assert db.session.get(SchemaVersion, 1).version == SCHEMA_VERSION
+
+def test_newer_schema_is_left_alone(app):
+    ensure_schema()
+    db.session.get(SchemaVersion, 1).version = SCHEMA_VERSION + 1
+    db.session.commit()
+
+    assert not ensure_schema()
+    assert db.session.get(SchemaVersion, 1).version == SCHEMA_VERSION + 1
+
+def test_losing_the_schema_race_to_another_worker(app, monkeypatch):
+    ensure_schema()
+    SchemaVersion.query.delete()
+    db.session.commit()
+
+    def racing_create_all():
+        # Another worker stamps the version first and our insert collides with it
+        db.session.add(SchemaVersion(id=1, version=SCHEMA_VERSION))
+        db.session.commit()
+        raise IntegrityError('INSERT INTO schema_version', {}, Exception('UNIQUE constraint failed'))
+
+    monkeypatch.setattr(db, 'create_all', racing_create_all)
+    assert not ensure_schema(retry_delay=0)
+    assert db.session.get(SchemaVersion, 1).version == SCHEMA_VERSION
+
+def test_startup_phases_are_recorded():
+    phases = create_app('testing').extensions['startup_phases']
+
+    assert {'flask_and_db', 'blueprints', 'schema', 'total'} <= set(phases)
+    assert phases['total'] >= phases['schema']
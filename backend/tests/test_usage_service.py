@@ -0,0 +1,96 @@
+import json
+import os
+from backend.config import Config
+from backend.models import db, User
+from backend.services import usage_service
+from backend.services.auth_service import AuthService
+from backend.services.gemini_transport import GeminiTransport
+from backend.services.usage_service import UsageMeter, attribute_usage, daily_rollup
+from backend.utils.concurrency import ContextThreadPoolExecutor
+
+class FakeResponse:
+    status_code = 200
+
+    def json(self):
+        return {
+            'candidates': [{'content': {'parts': [{'text': '{"detected": false}'}]}}],
+            'usageMetadata': {'promptTokenCount': 120, 'candidatesTokenCount': 8, 'totalTokenCount': 128}
+        }
+
+    def close(self):
+        pass
+
+def metered_transport(monkeypatch):
+    meter = UsageMeter(flush_interval=3600)
+    transport = GeminiTransport(pool_size=2, backoff_base=0, backoff_max=0)
+    transport.add_hook(meter.record)
+    monkeypatch.setattr(transport.session, 'post', lambda *args, **kwargs: FakeResponse())
+    return meter, transport
+
+def test_calls_are_metered_per_service_and_user(monkeypatch):
+    meter, transport = metered_transport(monkeypatch)
+
+    with attribute_usage(7):
+        transport.generate([{'text': 'prompt'}], timeout=1, service='ai')
+        with ContextThreadPoolExecutor(max_workers=2) as executor:
+            list(executor.map(lambda _: transport.generate([{'text': 'p'}], timeout=1, service='ocr'), range(2)))
+    transport.generate([{'text': 'prompt'}], timeout=1, service='ai')
+
+    snapshot = meter.snapshot()
+    ai = snapshot['services']['ai']
+    assert ai['calls'] == 2
+    assert ai['prompt_tokens'] == 240 and ai['output_tokens'] == 16
+    assert ai['statuses'] == {'200': 2}
+    assert ai['latency']['count'] == 2
+    assert ai['estimated_cost_usd'] > 0
+    assert snapshot['services']['ocr']['calls'] == 2
+
+    users = {entry['user_id']: entry['calls'] for entry in snapshot['top_users']}
+    assert users == {7: 3, None: 1}
+
+def test_daily_rollup_and_admin_endpoint(app, client, monkeypatch):
+    meter, transport = metered_transport(monkeypatch)
+    monkeypatch.setattr(usage_service, '_meter', meter)
+    monkeypatch.setattr(usage_service, '_meter_pid', os.getpid())
+
+    for _ in range(3):
+        transport.generate([{'text': 'prompt'}], timeout=1, service='ai')
+    meter.flush()
+    transport.generate([{'text': 'prompt'}], timeout=1, service='ai')
+    meter.flush()
+
+    rows = daily_rollup(days=1)
+    assert len(rows) == 1
+    assert rows[0]['calls'] == 4 and rows[0]['latency']['count'] == 4
+
+    users = []
+    for name in ('viewer', 'root'):
+        user = User(username=name, passkey_credential=b'x', totp_secret='')
+        db.session.add(user)
+        db.session.commit()
+        users.append(AuthService.create_session(user)[0])
+    monkeypatch.setattr(Config, 'ADMIN_USERNAMES', ['root'])
+
+    assert client.get('/api/admin/usage', headers={'Authorization': f'Bearer {users[0]}'}).status_code == 403
+
+    response = client.get('/api/admin/usage', headers={'Authorization': f'Bearer {users[1]}'})
+    data = json.loads(response.data)
+    assert response.status_code == 200
+    assert data['process']['services']['ai']['calls'] == 4
+    assert data['daily'][0]['prompt_tokens'] == 480
+
+def test_flushes_from_several_workers_add_up_without_touching_the_session(app, monkeypatch):
+    meters = [metered_transport(monkeypatch) for _ in range(2)]
+    for meter, transport in meters:
+        transport.generate([{'text': 'prompt'}], timeout=1, service='ai')
+    meters[0][0].flush()
+
+    pending = User(username='unsaved', passkey_credential=b'x', totp_secret='')
+    db.session.add(pending)
+    meters[1][0].flush()
+    db.session.rollback()
+
+    rows = daily_rollup(days=1)
+    assert rows[0]['calls'] == 2 and rows[0]['statuses'] == {'200': 2}
+    assert rows[0]['latency']['count'] == 2
+    assert User.query.filter_by(username='unsaved').count() == 0
@@ -0,0 +1,130 @@
+import json
+from datetime import datetime, timedelta
+import pytest
+from backend.config import Config
+from backend.models import db, SharedVerdict, User
+from backend.services import verdict_store
+from backend.services.ai_service import AIService
+from backend.services.auth_service import AuthService
+from backend.services.verdict_store import normalize_url
+
+ELEMENTS = [
+    {'text': 'Only 2 left!', 'pattern': 'false_urgency', 'role': 'span', 'selector': '#stock'},
+    {'text': 'No thanks', 'pattern': 'confirm_shaming', 'role': 'button', 'selector': '#decline'}
+]
+
+@pytest.fixture
+def gemini(monkeypatch):
+    monkeypatch.setattr(Config, 'SHARED_VERDICT_ENABLED', True)
+    monkeypatch.setattr(Config, 'SHARED_VERDICT_FLUSH_SECONDS', 0)
+    monkeypatch.setattr(verdict_store, '_store', None)
+
+    prompts = []
+    def fake_generate(prompt, max_retries=5, api_key=None):
+        prompts.append(prompt)
+        return {'success': True, 'text': json.dumps({'results': [
+            {'index': 0, 'dark_pattern_detected': True, 'pattern_type': 'false_urgency',
+             'confidence_score': 0.9, 'severity': 'high', 'explanation': 'Fake scarcity'},
+            {'index': 1, 'dark_pattern_detected': False, 'confidence_score': 0.2}
+        ]})}
+
+    monkeypatch.setattr(AIService, '_generate', staticmethod(fake_generate))
+    return prompts
+
+def analyze(client, url, elements=ELEMENTS):
+    response = client.post('/api/analyze/dark-patterns', json={'elements': elements, 'context': {'url': url}})
+    assert response.status_code == 200
+    return json.loads(response.data)
+
+def test_normalize_url_drops_tracking_and_noise():
+    assert normalize_url('HTTPS://Shop.Example:443/item/42/?utm_source=x&b=2&a=1#reviews') == \
+        'https://shop.example/item/42?a=1&b=2'
+    assert normalize_url('http://shop.example:8080/?fbclid=abc') == 'http://shop.example:8080/'
+
+def test_verdict_is_shared_between_visitors(client, gemini):
+    first = analyze(client, 'https://shop.example/item/42?utm_campaign=mail')
+    moved = [dict(ELEMENTS[0], selector='div > span'), ELEMENTS[1]]
+    second = analyze(client, 'https://shop.example/item/42', moved)
+
+    assert len(gemini) == 1
+    assert not first['shared_verdict'] and second['shared_verdict']
+    assert second['results'][0]['selector'] == 'div > span'
+    assert second['results'][0]['explanation'] == 'Fake scarcity'
+
+    changed = [dict(ELEMENTS[0], text='Only 1 left!'), ELEMENTS[1]]
+    assert not analyze(client, 'https://shop.example/item/42', changed)['shared_verdict']
+    assert len(gemini) == 2
+
+def test_flow_and_page_context_are_part_of_the_key(client, gemini):
+    url = 'https://shop.example/checkout'
+    analyze(client, url)
+    steps = [{'action': 'add_to_cart'}, {'action': 'checkout'}]
+    payloads = [
+        {'elements': ELEMENTS, 'context': {'url': url}, 'flow_data': steps},
+        {'elements': ELEMENTS, 'context': {'url': url, 'title': 'Checkout'}}
+    ]
+    for payload in payloads:
+        response = client.post('/api/analyze/dark-patterns', json=payload)
+        assert not response.get_json()['shared_verdict']
+    assert len(gemini) == 3
+
+    response = client.post('/api/analyze/dark-patterns', json={'elements': ELEMENTS, 'context': {'url': 42}})
+    assert response.status_code == 400
+
+def test_flows_differing_only_in_timestamps_and_tracking_share_a_verdict(client, gemini):
+    def flow(timestamp, query):
+        return [{'timestamp': timestamp, 'action': 'click', 'url': f'https://shop.example/cart{query}',
+                 'details': {'element': '#checkout', 'text': 'Checkout'}}]
+
+    payloads = [
+        {'elements': ELEMENTS, 'context': {'url': 'https://shop.example/checkout'},
+         'flow_data': flow(1700000000000, '?utm_source=mail&sessionid=abc')},
+        {'elements': ELEMENTS, 'context': {'url': 'https://shop.example/checkout'},
+         'flow_data': flow(1700000123456, '?sessionid=xyz')}
+    ]
+    first, second = [client.post('/api/analyze/dark-patterns', json=p).get_json() for p in payloads]
+
+    assert not first['shared_verdict'] and second['shared_verdict']
+    assert len(gemini) == 1
+
+def test_store_keeps_no_url_and_expires(client, gemini):
+    analyze(client, 'https://shop.example/item/7')
+    row = SharedVerdict.query.one()
+    assert 'shop.example' not in row.key + row.verdict
+
+    row.expires_at = datetime.utcnow() - timedelta(seconds=1)
+    db.session.commit()
+
+    analyze(client, 'https://shop.example/item/7')
+    assert len(gemini) == 2
+
+def test_stats_report_daily_calls_saved(client, gemini):
+    for _ in range(3):
+        analyze(client, 'https://shop.example/item/9')
+
+    user = User(username='admin', passkey_credential=b'x', totp_secret='')
+    db.session.add(user)
+    db.session.commit()
+    token, _ = AuthService.create_session(user)
+
+    response = client.get('/api/analysis/shared/stats', headers={'Authorization': f'Bearer {token}'})
+    stats = json.loads(response.data)['stats']
+
+    assert stats['process']['hit_rate'] == pytest.approx(2 / 3)
+    assert stats['daily'][-1]['lookups'] == 3
+    assert stats['daily'][-1]['gemini_calls_saved'] == 2
+
+def test_flush_stays_off_the_request_session(app, gemini):
+    store = verdict_store.get_shared_verdicts()
+    db.session.add(SharedVerdict(key='expired', verdict='[]', expires_at=datetime.utcnow() - timedelta(seconds=1)))
+    db.session.commit()
+    store.get('https://shop.example/item/5', 'fingerprint')
+
+    pending = User(username='unsaved', passkey_credential=b'x', totp_secret='')
+    db.session.add(pending)
+    store.flush()
+    db.session.rollback()
+
+    assert User.query.filter_by(username='unsaved').count() == 0
+    assert SharedVerdict.query.count() == 0
+    assert store.stats()['daily'][-1]['lookups'] == 1
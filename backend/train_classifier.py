@@ -0,0 +1,100 @@
+"""Train the local dark-pattern classifier from DetectionLog history.
+
+Run from the repository root:
+
+    python -m backend.train_classifier --negatives benign.txt
+
+Page elements of detections at or above --min-confidence become examples
+of their pattern_type; those below --negative-confidence, plus every line
+of the --negatives files, become examples of "none".
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import random
+import time
+
+from backend.config import Config
+from backend.services.local_classifier import NONE_LABEL, LocalClassifier
+
+def element_texts(elements):
+    """Pull the text out of page_elements entries, which are strings or dicts"""
+    texts = []
+    for element in elements:
+        if isinstance(element, dict):
+            element = element.get('text') or element.get('textContent') or ''
+        if isinstance(element, str) and element.strip():
+            texts.append(element.strip()[:Config.AI_BATCH_ELEMENT_CHARS])
+    return texts
+
+def collect_training_data(min_confidence=0.6, negative_confidence=0.3):
+    """Return (texts, labels) from DetectionLog; needs an app context"""
+    from backend.models import DetectionLog
+
+    texts, labels = [], []
+    query = DetectionLog.query.filter(DetectionLog.page_elements.isnot(None))
+    for detection in query.yield_per(1000):
+        if detection.confidence_score >= min_confidence:
+            label = detection.pattern_type
+        elif detection.confidence_score < negative_confidence:
+            label = NONE_LABEL
+        else:
+            continue
+
+        for text in element_texts(detection.get_page_elements()):
+            texts.append(text)
+            labels.append(label)
+
+    return texts, labels
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--output', default=Config.LOCAL_MODEL_PATH)
+    parser.add_argument('--negatives', action='append', default=[],
+                        help='file of benign page text, one example per line')
+    parser.add_argument('--min-confidence', type=float, default=0.6)
+    parser.add_argument('--negative-confidence', type=float, default=0.3)
+    parser.add_argument('--bits', type=int, default=16, help='log2 of the hashed feature space')
+    parser.add_argument('--epochs', type=int, default=200)
+    parser.add_argument('--holdout', type=float, default=0.1)
+    args = parser.parse_args()
+
+    from backend.app import create_app
+
+    with create_app().app_context():
+        texts, labels = collect_training_data(args.min_confidence, args.negative_confidence)
+
+    for path in args.negatives:
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    texts.append(line.strip())
+                    labels.append(NONE_LABEL)
+
+    if NONE_LABEL not in labels:
+        parser.error('no negative examples: pass --negatives or log low-confidence detections')
+
+    examples = list(zip(texts, labels))
+    random.Random(0).shuffle(examples)
+    split = int(len(examples) * (1 - args.holdout))
+    train, test = examples[:split], examples[split:]
+
+    start = time.perf_counter()
+    model = LocalClassifier.train([t for t, _ in train], [l for _, l in train], bits=args.bits, epochs=args.epochs)
+    print(f'trained on {len(train)} examples, {len(model.labels)} labels in {time.perf_counter() - start:.1f}s')
+
+    if test:
+        predictions = model.predict_proba([t for t, _ in test]).argmax(axis=1)
+        correct = sum(model.labels[p] == label for p, (_, label) in zip(predictions, test))
+        print(f'holdout accuracy: {correct / len(test):.1%} on {len(test)} examples')
+
+    model.save(args.output)
+    start = time.perf_counter()
+    LocalClassifier.load(args.output)
+    print(f'wrote {args.output}: {os.path.getsize(args.output) / 1024:.0f} KB, '
+          f'loads in {(time.perf_counter() - start) * 1000:.1f} ms')
+
+if __name__ == '__main__':
+    main()
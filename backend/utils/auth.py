@@ -0,0 +1,60 @@
+from functools import wraps
+from flask import g, jsonify, redirect, request, session, url_for
+from backend.services.auth_service import AuthService
+from backend.services.usage_service import attribute_usage
+
+def request_token():
+    """Bearer token from the Authorization header.
+
+    Only the dashboard's own routes also accept its session cookie; the
+    JSON API never does, so a cross-site form post cannot act as the user.
+    """
+    token = request.headers.get('Authorization', '').replace('Bearer ', '')
+    if not token and request.blueprint == 'frontend':
+        token = session.get('token')
+    return token
+
+def current_user():
+    """Return (user, error) for this request, validating the token at most once.
+
+    The user comes with their Settings row already loaded; both are kept
+    on flask.g as g.user and g.settings (None when the user has none yet).
+    """
+    # Kept on the request rather than g, since an app context can outlive one request
+    auth = getattr(request, 'auth_result', None)
+    if auth is None:
+        token = request_token()
+        auth = request.auth_result = AuthService.validate_session(token) if token else (None, 'Authentication required')
+        g.auth = auth
+        g.user = auth[0]
+        g.settings = g.user.settings if g.user is not None else None
+    return auth
+
+def require_auth(f):
+    """Decorator to require authentication"""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        user, error = current_user()
+
+        if error:
+            return jsonify({'error': error}), 401
+
+        # Pass user to the wrapped function; Gemini calls it makes are billed to them
+        with attribute_usage(user.id):
+            return f(user, *args, **kwargs)
+
+    return decorated_function
+
+def login_required(f):
+    """Decorator to require login"""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        user, error = current_user()
+
+        if error:
+            session.clear()
+            return redirect(url_for('frontend.login'))
+
+        return f(user, *args, **kwargs)
+
+    return decorated_function
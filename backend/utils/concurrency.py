@@ -0,0 +1,12 @@
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+class ContextThreadPoolExecutor(ThreadPoolExecutor):
+    """ThreadPoolExecutor whose tasks run in a copy of the submitter's contextvars.
+
+    Plain pools run tasks in the worker thread's own context, so values
+    such as the user a Gemini call is attributed to would be lost.
+    """
+
+    def submit(self, fn, /, *args, **kwargs):
+        return super().submit(contextvars.copy_context().run, fn, *args, **kwargs)
@@ -4,6 +4,7 @@ from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 from cryptography.hazmat.backends import default_backend
 import base64
 import os
+import threading
 
 def get_encryption_key():
     password = os.environ.get('ENCRYPTION_KEY', 'dev-encryption-key-32-bytes-long').encode()
@@ -21,11 +22,15 @@ def get_encryption_key():
     return key
 
 _fernet = None
+_fernet_lock = threading.Lock()
 
 def get_fernet():
+    # Derived once per process; create_app derives it before fork under PRELOAD_WARMUP so workers inherit it
     global _fernet
     if _fernet is None:
-        _fernet = Fernet(get_encryption_key())
+        with _fernet_lock:
+            if _fernet is None:
+                _fernet = Fernet(get_encryption_key())
     return _fernet
 
 def encrypt_data(data):
@@ -0,0 +1,144 @@
+import base64
+import io
+import time
+
+MAGIC_MIME_TYPES = [
+    (b'\x89PNG\r\n\x1a\n', 'image/png'),
+    (b'\xff\xd8\xff', 'image/jpeg'),
+    (b'GIF87a', 'image/gif'),
+    (b'GIF89a', 'image/gif'),
+    (b'RIFF', 'image/webp'),
+    (b'BM', 'image/bmp'),
+]
+
+PIL_MIME_TYPES = {
+    'PNG': 'image/png',
+    'JPEG': 'image/jpeg',
+    'GIF': 'image/gif',
+    'WEBP': 'image/webp',
+    'BMP': 'image/bmp',
+}
+
+def decode_image_data(image_data):
+    """Accept raw bytes, base64 text or a data: URL and return raw bytes"""
+    if isinstance(image_data, bytes):
+        return image_data
+
+    if image_data.startswith('data:') and ',' in image_data:
+        image_data = image_data.split(',', 1)[1]
+
+    return base64.b64decode(image_data)
+
+def detect_mime_type(data):
+    for magic, mime_type in MAGIC_MIME_TYPES:
+        if data.startswith(magic):
+            if mime_type == 'image/webp' and data[8:12] != b'WEBP':
+                continue
+            return mime_type
+    return 'image/jpeg'
+
+def image_dhash(image, hash_size=8):
+    """64-bit difference hash: one bit per horizontally adjacent pixel pair"""
+    from PIL import Image
+
+    gray = image if image.mode == 'L' else image.convert('L')
+    small = gray.resize((hash_size + 1, hash_size), Image.BOX)
+    pixels = list(small.getdata())
+
+    value = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return value
+
+def compute_dhash(image_data):
+    """dHash of encoded image data, or None if it cannot be decoded"""
+    try:
+        from PIL import Image
+
+        image = Image.open(io.BytesIO(decode_image_data(image_data)))
+        image.draft('L', (256, 256))
+        return image_dhash(image)
+    except Exception:
+        return None
+
+def _crop_uniform_margins(image, tolerance):
+    from PIL import Image, ImageChops
+
+    gray = image if image.mode == 'L' else image.convert('L')
+    background = gray.getpixel((0, 0))
+    diff = ImageChops.difference(gray, Image.new('L', gray.size, background))
+    bbox = diff.point([0] * (tolerance + 1) + [255] * (255 - tolerance)).getbbox()
+
+    if bbox and bbox != (0, 0) + image.size:
+        return image.crop(bbox)
+    return image
+
+def preprocess_image(image_data, max_dimension=1600, grayscale=True, crop_margins=True,
+                     quality=80, margin_tolerance=12):
+    """Shrink a screenshot for OCR upload.
+
+    Returns (data, mime_type, stats). When the image cannot be decoded or
+    the re-encoded image is not smaller, the original bytes are returned
+    with their detected MIME type.
+    """
+    start = time.perf_counter()
+    original = decode_image_data(image_data)
+    stats = {
+        'original_bytes': len(original),
+        'processed_bytes': len(original),
+        'original_size': None,
+        'processed_size': None,
+        'preprocessed': False,
+        'dhash': None,
+    }
+
+    try:
+        from PIL import Image
+
+        image = Image.open(io.BytesIO(original))
+        image.load()
+    except Exception:
+        stats['preprocess_ms'] = round((time.perf_counter() - start) * 1000, 2)
+        return original, detect_mime_type(original), stats
+
+    mime_type = PIL_MIME_TYPES.get(image.format, detect_mime_type(original))
+    stats['original_size'] = image.size
+
+    if image.mode not in ('RGB', 'L'):
+        # Flatten transparency onto white so margins and text stay visible
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        rgba = image.convert('RGBA')
+        background.paste(rgba, mask=rgba.split()[-1])
+        image = background
+
+    if grayscale:
+        image = image.convert('L')
+
+    # Hash the full frame before cropping so repeated captures line up
+    stats['dhash'] = image_dhash(image)
+
+    if crop_margins:
+        image = _crop_uniform_margins(image, margin_tolerance)
+
+    if max(image.size) > max_dimension:
+        # Area averaging keeps glyph edges legible and is several times
+        # cheaper than LANCZOS at the 1.5-2.5x ratios retina captures need
+        image.thumbnail((max_dimension, max_dimension), Image.BOX)
+
+    buffer = io.BytesIO()
+    image.save(buffer, format='JPEG', quality=quality, optimize=True)
+    processed = buffer.getvalue()
+    stats['preprocess_ms'] = round((time.perf_counter() - start) * 1000, 2)
+
+    if len(processed) >= len(original):
+        stats['processed_size'] = stats['original_size']
+        return original, mime_type, stats
+
+    stats.update({
+        'processed_bytes': len(processed),
+        'processed_size': image.size,
+        'preprocessed': True,
+    })
+    return processed, 'image/jpeg', stats
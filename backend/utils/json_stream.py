@@ -0,0 +1,105 @@
+import json
+
+WHITESPACE = ' \t\r\n'
+
+class IncrementalJSONParser:
+    """Emit the top-level members of a streamed JSON object as they complete.
+
+    Feed text fragments in arrival order; feed() returns the (key, value)
+    pairs finished by that fragment. Anything before the first '{' (prose,
+    a ```json fence) is skipped, and parsing stops at the matching '}'.
+    Members whose value is not valid JSON are dropped.
+    """
+
+    def __init__(self):
+        self.fields = {}
+        self.started = False
+        self.done = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._expect = 'key'
+        self._key = None
+        self._token = []
+
+    def _finish_value(self, completed):
+        raw = ''.join(self._token).strip()
+        self._token = []
+        self._expect = 'after'
+        try:
+            value = json.loads(raw)
+        except ValueError:
+            return
+        self.fields[self._key] = value
+        completed.append((self._key, value))
+
+    def feed(self, fragment):
+        completed = []
+        for char in fragment:
+            if self.done:
+                break
+
+            if not self.started:
+                if char == '{':
+                    self.started = True
+                    self._depth = 1
+                continue
+
+            if self._in_string:
+                self._token.append(char)
+                if self._escape:
+                    self._escape = False
+                elif char == '\\':
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        if self._expect == 'key':
+                            self._key = json.loads(''.join(self._token))
+                            self._token = []
+                            self._expect = 'colon'
+                        else:
+                            self._finish_value(completed)
+                continue
+
+            if self._depth > 1:
+                self._token.append(char)
+                if char == '"':
+                    self._in_string = True
+                elif char in '{[':
+                    self._depth += 1
+                elif char in '}]':
+                    self._depth -= 1
+                    if self._depth == 1:
+                        self._finish_value(completed)
+                continue
+
+            if self._expect == 'key':
+                if char == '"':
+                    self._in_string = True
+                    self._token = [char]
+                elif char == '}':
+                    self.done = True
+            elif self._expect == 'colon':
+                if char == ':':
+                    self._expect = 'value'
+            elif self._expect == 'value':
+                if char in ',}':
+                    if ''.join(self._token).strip():
+                        self._finish_value(completed)
+                    self._expect = 'key'
+                    self.done = char == '}'
+                elif char == '"' and not self._token:
+                    self._in_string = True
+                    self._token.append(char)
+                elif char in '{[' and not self._token:
+                    self._depth += 1
+                    self._token.append(char)
+                elif char not in WHITESPACE or self._token:
+                    self._token.append(char)
+            elif char == ',':
+                self._expect = 'key'
+            elif char == '}':
+                self.done = True
+
+        return completed
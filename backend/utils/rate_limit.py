@@ -0,0 +1,6 @@
+from flask_limiter import Limiter
+from flask_limiter.util import get_remote_address
+from backend.config import Config
+
+# Keyed by client address, for endpoints that spend the server's Gemini key without a session
+limiter = Limiter(key_func=get_remote_address, storage_uri=Config.RATE_LIMIT_STORAGE_URI)
@@ -0,0 +1,7 @@
+import re
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9$%£€']+")
+
+def tokenize(text):
+    """Lower-cased word tokens, keeping currency and percent signs and apostrophes"""
+    return TOKEN_PATTERN.findall((text or '').lower())
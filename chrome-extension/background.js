@@ -15,6 +15,7 @@ const apiClient = {
 const CHECK_INTERVAL = 30000; // 30 seconds
 const RESET_HOUR = 4; // 4am daily reset
 const SYNC_INTERVAL = 300000; // 5 minutes
+const SENTIMENT_BATCH_LIMIT = 1000; // Backend SENTIMENT_MAX_SAMPLES
 
 // Track active sessions
 let activeSessions = new Map();
@@ -212,6 +213,7 @@ async function handleTabChange(tab) {
       tabId: tab.id,
       scrollEvents: [],
       contentSamples: [],
+      sampleScores: [],
       doomscore: 0,
       timeSpent: 0
     });
@@ -244,9 +246,7 @@ async function calculateDoomscore(session) {
   const timeFactor = Math.min(timeMinutes / 30, 1); // Caps at 30 minutes
   
   // Negativity score (0-1): Average from sentiment analysis
-  const negativityScores = await Promise.all(
-    session.contentSamples.map(sample => analyzeSentiment(sample))
-  );
+  const negativityScores = await scoreContentSamples(session);
   const avgNegativity = negativityScores.length > 0 
     ? negativityScores.reduce((a, b) => a + b, 0) / negativityScores.length 
     : 0;
@@ -294,24 +294,45 @@ function calculateCompulsionFactor(scrollEvents) {
   return Math.min((avgVelocity * 0.3 + rapidScrollRatio * 0.7), 1);
 }
 
-// Analyze sentiment via Flask backend
-async function analyzeSentiment(text) {
+// Score samples not yet scored in one batched request; scores already
+// fetched are kept on the session, so each sample is sent only once
+async function scoreContentSamples(session) {
+  session.scoring = (session.scoring || Promise.resolve()).then(async () => {
+    const scored = session.sampleScores.length;
+    const pending = session.contentSamples.slice(scored, scored + SENTIMENT_BATCH_LIMIT);
+    if (pending.length === 0) {
+      return;
+    }
+    
+    const scores = await analyzeSentimentBatch(pending);
+    // Failed batches are left unscored and retried with the next sample
+    if (scores) {
+      session.sampleScores.push(...scores);
+    }
+  });
+  
+  await session.scoring;
+  return session.contentSamples.map((_, i) => session.sampleScores[i] || 0);
+}
+
+// Analyze sentiment of many samples via one request to the Flask backend
+async function analyzeSentimentBatch(samples) {
   try {
-    const response = await fetch(`${BACKEND_URL}/analyze_sentiment`, {
+    const response = await fetch(`${BACKEND_URL}/api/analyze/sentiment`, {
       method: 'POST',
       headers: { 'Content-Type': 'application/json' },
-      body: JSON.stringify({ text })
+      body: JSON.stringify({ samples })
     });
     
     if (!response.ok) {
-      return 0;
+      return null;
     }
     
     const data = await response.json();
-    return data.negativity_score || 0;
+    return Array.isArray(data.scores) ? data.scores : null;
   } catch (error) {
     console.error('Sentiment analysis error:', error);
-    return 0;
+    return null;
   }
 }
 
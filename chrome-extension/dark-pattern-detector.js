@@ -11,6 +11,7 @@ class DarkPatternDetector {
     }
 
     // Quick local scan for obviously suspicious patterns
+    // (mirrored server-side in backend/services/prefilter_service.py)
     quickScan() {
         const suspicious = [];
 